@@ -0,0 +1,250 @@
+"""
+Measures the startup cost of graphene-django-cud: the import time of the package, the time to create the mutation
+classes of a synthetic project with N models and M mutations per model, the time to build the schema, and the peak
+memory allocated while doing so.
+
+    python benchmarks/schema_build.py --models 50 --mutations 6
+    python benchmarks/schema_build.py --models 50 --lazy-input-types --json
+    python benchmarks/schema_build.py --importtime 20
+
+Each model has a foreign key to the previous one, and the mutations add nested "auto" types for the foreign key and
+the reverse relation, so the nested type machinery is exercised as well.
+
+With --importtime, the package is imported in a subprocess with ``python -X importtime``, and the modules with the
+largest cumulative import times are listed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_LABEL = "graphene_django_cud"
+IMPORTED_MODULES = ("graphene_django_cud.mutations", "graphene_django_cud.subscriptions")
+
+
+def setup_django(lazy_input_types=False, reuse_input_types=False):
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "graphene_django",
+            "graphene_django_cud",
+        ],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        GRAPHENE_DJANGO_CUD_LAZY_INPUT_TYPES=lazy_input_types,
+        GRAPHENE_DJANGO_CUD_REUSE_INPUT_TYPES=reuse_input_types,
+    )
+    django.setup()
+
+
+def import_package():
+    start = time.perf_counter()
+    for module in IMPORTED_MODULES:
+        __import__(module)
+
+    return time.perf_counter() - start
+
+
+def create_models(num_models):
+    """Creates the synthetic models, and a `DjangoObjectType` for each of them."""
+    from django.db import models
+    from graphene_django import DjangoObjectType
+
+    created = []
+    for i in range(num_models):
+        attrs = {
+            "__module__": __name__,
+            "Meta": type("Meta", (), {"app_label": APP_LABEL}),
+            "name": models.CharField(max_length=64),
+            "description": models.TextField(blank=True, default=""),
+            "count": models.IntegerField(default=0),
+            "kind": models.CharField(max_length=8, choices=(("A", "A"), ("B", "B")), default="A"),
+            "created_at": models.DateTimeField(auto_now_add=True),
+        }
+        if created:
+            attrs["parent"] = models.ForeignKey(
+                created[-1], null=True, on_delete=models.CASCADE, related_name="children"
+            )
+
+        model = type(f"BenchmarkModel{i}", (models.Model,), attrs)
+        node_meta = type("Meta", (), {"model": model, "fields": "__all__"})
+        type(f"BenchmarkModel{i}Node", (DjangoObjectType,), {"Meta": node_meta})
+        created.append(model)
+
+    return created
+
+
+def get_mutation_bases():
+    from graphene_django_cud.mutations import (
+        DjangoBatchCreateMutation,
+        DjangoBatchDeleteMutation,
+        DjangoBatchPatchMutation,
+        DjangoBatchUpdateMutation,
+        DjangoCreateMutation,
+        DjangoDeleteMutation,
+        DjangoPatchMutation,
+        DjangoUpdateMutation,
+    )
+
+    return (
+        DjangoCreateMutation,
+        DjangoUpdateMutation,
+        DjangoPatchMutation,
+        DjangoBatchCreateMutation,
+        DjangoBatchUpdateMutation,
+        DjangoBatchPatchMutation,
+        DjangoDeleteMutation,
+        DjangoBatchDeleteMutation,
+    )
+
+
+def create_mutations(benchmark_models, mutations_per_model):
+    from graphene_django_cud.mutations import DjangoBatchDeleteMutation, DjangoDeleteMutation
+
+    bases = get_mutation_bases()
+    fields = {}
+
+    for model in benchmark_models:
+        has_parent = any(field.name == "parent" for field in model._meta.get_fields())
+        has_children = any(field.name == "children" for field in model._meta.get_fields())
+
+        for i in range(mutations_per_model):
+            base = bases[i % len(bases)]
+            meta = {"model": model}
+
+            name = f"{base.__name__.replace('Django', '', 1)}{model.__name__}{i}"
+            if base not in (DjangoDeleteMutation, DjangoBatchDeleteMutation):
+                meta["type_name"] = f"{name}Input"
+
+                if has_parent:
+                    meta["foreign_key_extras"] = {"parent": {"type": "auto"}}
+                if has_children:
+                    meta["many_to_one_extras"] = {"children": {"add": {"type": "auto"}}}
+            mutation = type(name, (base,), {"Meta": type("Meta", (), meta)})
+            fields[name[0].lower() + name[1:]] = mutation.Field()
+
+    return fields
+
+
+def build_schema(mutation_fields):
+    import graphene
+
+    class Query(graphene.ObjectType):
+        ok = graphene.Boolean()
+
+    Mutation = type("Mutation", (graphene.ObjectType,), mutation_fields)
+    return graphene.Schema(query=Query, mutation=Mutation)
+
+
+def run_benchmark(num_models, mutations_per_model, lazy_input_types=False, reuse_input_types=False):
+    setup_django(lazy_input_types, reuse_input_types)
+    import_seconds = import_package()
+
+    benchmark_models = create_models(num_models)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    mutation_fields = create_mutations(benchmark_models, mutations_per_model)
+    class_creation_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schema = build_schema(mutation_fields)
+    schema_build_seconds = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "models": num_models,
+        "mutations_per_model": mutations_per_model,
+        "mutation_classes": len(mutation_fields),
+        "types": len(schema.graphql_schema.type_map),
+        "lazy_input_types": lazy_input_types,
+        "reuse_input_types": reuse_input_types,
+        "import_seconds": import_seconds,
+        "class_creation_seconds": class_creation_seconds,
+        "schema_build_seconds": schema_build_seconds,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def parse_importtime(output):
+    """Parses the output of ``python -X importtime``, returning (module, self seconds, cumulative seconds) tuples."""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, module = line.replace("import time:", "", 1).split("|")
+        entries.append((module.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+
+    return entries
+
+
+def run_importtime():
+    code = (
+        "import schema_build as benchmark; benchmark.setup_django(); "
+        "[__import__(module) for module in benchmark.IMPORTED_MODULES]"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((os.path.dirname(os.path.abspath(__file__)), ROOT_PATH)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", type=int, default=20, help="Number of synthetic models.")
+    parser.add_argument("--mutations", type=int, default=6, help="Number of mutation classes per model.")
+    parser.add_argument("--lazy-input-types", action="store_true", help="Enable lazy input types.")
+    parser.add_argument("--reuse-input-types", action="store_true", help="Enable reuse of identical input types.")
+    parser.add_argument("--importtime", type=int, metavar="N", help="List the N slowest imports and exit.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.importtime:
+        entries = run_importtime()
+        package_seconds = sum(entry[1] for entry in entries if entry[0].startswith("graphene_django_cud"))
+
+        if args.json:
+            print(json.dumps({"package_self_seconds": package_seconds, "imports": entries[: args.importtime]}))
+            return
+
+        print(f"{'cumulative':>12} {'self':>10}  module")
+        slowest = sorted(entries, key=lambda entry: -entry[2])[: args.importtime]
+        for module, self_seconds, cumulative_seconds in slowest:
+            print(f"{cumulative_seconds * 1000:10.1f}ms {self_seconds * 1000:8.1f}ms  {module}")
+        print(f"\ngraphene_django_cud modules (self): {package_seconds * 1000:.1f}ms")
+        return
+
+    results = run_benchmark(args.models, args.mutations, args.lazy_input_types, args.reuse_input_types)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(
+        f"{results['models']} models x {results['mutations_per_model']} mutations "
+        f"({results['mutation_classes']} classes, {results['types']} schema types), "
+        f"lazy input types: {results['lazy_input_types']}, reuse input types: {results['reuse_input_types']}"
+    )
+    print(f"  import:          {results['import_seconds'] * 1000:10.1f}ms")
+    print(f"  class creation:  {results['class_creation_seconds'] * 1000:10.1f}ms")
+    print(f"  schema build:    {results['schema_build_seconds'] * 1000:10.1f}ms")
+    print(f"  peak memory:     {results['peak_memory_bytes'] / 2**20:10.1f}MiB")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT_PATH)
+    main()
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+from graphene_django_cud.consts import WARM_UP_ON_READY_SETTINGS_KEY
+
+
+class GrapheneDjangoCudConfig(AppConfig):
+    name = "graphene_django_cud"
+
+    def ready(self):
+        # Registers the system checks.
+        from graphene_django_cud import checks  # noqa: F401
+
+        if getattr(settings, WARM_UP_ON_READY_SETTINGS_KEY, False):
+            from graphene_django_cud.util.lazy import warm_up
+
+            warm_up()
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+
+from graphene_django_cud.util.lazy import get_unresolved_input_type_references
+
+
+@register("graphene_django_cud")
+def check_input_type_references(app_configs=None, **kwargs):
+    """
+    Imports the schema of the `GRAPHENE["SCHEMA"]` setting, and reports every input type referenced by the nested
+    fields of a mutation which does not exist, e.g. a misspelled `type` in `foreign_key_extras`. Otherwise, only the
+    first of them is reported, when the schema is built.
+    """
+    errors = []
+
+    schema = getattr(settings, "GRAPHENE", {}).get("SCHEMA")
+    if schema:
+        try:
+            import_string(schema)
+        except Exception as e:
+            # Building the schema fails on the first missing input type. The mutations created before are still
+            # checked below, so that all missing input types are reported.
+            errors.append(
+                Error(
+                    f"The schema {schema} could not be imported: {e}",
+                    obj=schema,
+                    id="graphene_django_cud.E002",
+                )
+            )
+
+    for name in get_unresolved_input_type_references():
+        errors.append(
+            Error(
+                f"The input type {name} does not exist.",
+                hint=(
+                    "Check the `type` of the nested extras (e.g. `many_to_many_extras` or `foreign_key_extras`) "
+                    f"referencing {name}, and that the mutation creating it is imported."
+                ),
+                obj=name,
+                id="graphene_django_cud.E001",
+            )
+        )
+
+    return errors
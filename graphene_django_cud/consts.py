@@ -9,3 +9,29 @@ USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_USE_ID_SUFFIXES_FOR_F
 USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_USE_ID_SUFFIXES_FOR_M2M"
 
 USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS_KEY = "GRAPHENE_DJANGO_CUD_USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS"
+
+TRANSACTION_MAX_ATTEMPTS_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_TRANSACTION_MAX_ATTEMPTS"
+TRANSACTION_RETRY_BASE_DELAY_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_TRANSACTION_RETRY_BASE_DELAY"
+TRANSACTION_RETRY_MAX_DELAY_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_TRANSACTION_RETRY_MAX_DELAY"
+
+MAX_QUERIES_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_MAX_QUERIES"
+
+MAX_ESTIMATED_STATEMENTS_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_MAX_ESTIMATED_STATEMENTS"
+MAX_ESTIMATED_ROWS_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_MAX_ESTIMATED_ROWS"
+
+LAZY_INPUT_TYPES_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_LAZY_INPUT_TYPES"
+REUSE_INPUT_TYPES_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_REUSE_INPUT_TYPES"
+WARM_UP_ON_READY_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_WARM_UP_ON_READY"
+
+DEFER_SIGNALS_UNTIL_COMMIT_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_DEFER_SIGNALS_UNTIL_COMMIT"
+
+SUBSCRIPTION_MAX_QUEUE_SIZE_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_MAX_QUEUE_SIZE"
+SUBSCRIPTION_QUEUE_OVERFLOW_POLICY_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_QUEUE_OVERFLOW_POLICY"
+
+SUBSCRIPTION_SHARE_PAYLOADS_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_SHARE_PAYLOADS"
+SUBSCRIPTION_REPLAY_BUFFER_SIZE_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_REPLAY_BUFFER_SIZE"
+SUBSCRIPTION_REPLAY_MAX_AGE_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_REPLAY_MAX_AGE"
+SUBSCRIPTION_PERMISSION_CACHE_TTL_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_PERMISSION_CACHE_TTL"
+
+SUBSCRIPTION_BROADCAST_BACKEND_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_BACKEND"
+SUBSCRIPTION_BROADCAST_OPTIONS_SETTINGS_KEY = "GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_OPTIONS"
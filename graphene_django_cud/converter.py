@@ -7,6 +7,9 @@
 #     they are explicitly required or not required.
 #
 # From the last point, users of this module are expected to discard any field returning None
+import copy
+import functools
+import threading
 from functools import singledispatch
 
 import graphql
@@ -31,6 +34,8 @@ from graphene import (
     Decimal,
 )
 from graphene.types.json import JSONString
+from graphene.types.structures import Structure
+from graphene.types.unmountedtype import UnmountedType
 from graphene_django.compat import ArrayField, HStoreField, RangeField
 from graphene_file_upload.scalars import Upload
 
@@ -40,6 +45,7 @@ else:
     from graphql import GraphQLError, assert_valid_name as assert_name
 
 from graphene_django_cud.types import TimeDelta
+from graphene_django_cud.util.lazy import get_input_type, register_input_type_reference
 from graphene_django_cud.util.string import to_camel_case, to_const
 
 
@@ -96,11 +102,8 @@ def get_choices(choices):
             yield name, value, description
 
 
-def convert_choices_field(field, choices, required=None):
-    meta = field.model._meta
-    name = to_camel_case("{}_{}".format(meta.object_name, field.name))
-
-    choices = list(get_choices(choices))
+def create_choices_enum(name, choices):
+    """Creates the enum `name` from `(name, value, description)` tuples."""
     named_choices = [(c[0], c[1]) for c in choices]
     named_choices_descriptions = {c[0]: c[2] for c in choices}
 
@@ -109,11 +112,30 @@ def convert_choices_field(field, choices, required=None):
         def description(self):
             return named_choices_descriptions[self.name]
 
-    enum = Enum(name, list(named_choices), type=EnumWithDescriptionsType)
+    return Enum(name, list(named_choices), type=EnumWithDescriptionsType)
+
+
+def convert_choices_field(field, choices, required=None):
+    meta = field.model._meta
+    name = to_camel_case("{}_{}".format(meta.object_name, field.name))
 
     # Note that we do not instantiate the field here, so we can store it un-instantiated in the registry.
     # This is the allow different parameters (e.g. `required`) to be passed to the field.
-    return enum
+    return create_choices_enum(name, list(get_choices(choices)))
+
+
+# Fields and the factories of their conversions, by field identity, registry, requirement and extras type names. See
+# `convert_django_field_with_choices`. The oldest conversions are evicted beyond the maximum size. Choice enums are
+# looked up in the registry by name when converted again, so evicting a conversion never creates a second enum.
+CONVERSION_CACHE_MAX_SIZE = 4096
+_conversion_cache = {}
+_conversion_cache_lock = threading.RLock()
+_MISSING = object()
+_MISSING_ENTRY = (None, _MISSING)
+
+
+def _get_extras_type_name(extras):
+    return extras.get("type", "ID") if extras else "ID"
 
 
 def convert_django_field_with_choices(
@@ -123,6 +145,97 @@ def convert_django_field_with_choices(
     field_many_to_many_extras=None,
     field_foreign_key_extras=None,
     field_one_to_one_extras=None,
+):
+    """
+    Converts a model field to a graphene input type, with enums for fields with choices.
+
+    Conversions are cached, as the mutations of a model convert the same fields over and over. The conversion only
+    depends on the field (i.e. the model and field name), the registry, the requirement, and the type names of the
+    extras, which make up the cache key. Fields are keyed by identity, as hashing a reverse relation costs more than
+    converting it, and are kept in the cache so their identity is not reused. Each call returns a new instance with its
+    own kwargs and creation counter, as graphene orders the fields of an input type by their creation counters, and
+    callers may modify the returned field.
+    """
+    key = (
+        id(field),
+        registry,
+        required,
+        _get_extras_type_name(field_many_to_many_extras),
+        _get_extras_type_name(field_foreign_key_extras),
+        _get_extras_type_name(field_one_to_one_extras),
+    )
+
+    _, factory = _conversion_cache.get(key, _MISSING_ENTRY)
+    if factory is _MISSING:
+        # Converting under the lock ensures each choice enum is only created and registered once.
+        with _conversion_cache_lock:
+            _, factory = _conversion_cache.get(key, _MISSING_ENTRY)
+            if factory is _MISSING:
+                converted = _convert_django_field_with_choices(
+                    field,
+                    registry,
+                    required,
+                    field_many_to_many_extras,
+                    field_foreign_key_extras,
+                    field_one_to_one_extras,
+                )
+
+                while len(_conversion_cache) >= CONVERSION_CACHE_MAX_SIZE:
+                    del _conversion_cache[next(iter(_conversion_cache))]
+
+                _conversion_cache[key] = (field, _get_conversion_factory(converted))
+                return converted
+
+    return factory() if factory is not None else None
+
+
+def _get_conversion_factory(converted):
+    """
+    Returns a function creating new instances of the conversion `converted`, from its type class, arguments and
+    kwargs, or None if there is no conversion. Copying the conversion would cost more than converting the field again.
+    """
+    if converted is None:
+        return None
+
+    if isinstance(converted, Structure):
+        # The wrapped structures (e.g. `List(NonNull(...))`) are created anew too. Types are shared.
+        of_type = converted.of_type
+        if isinstance(of_type, Structure):
+            of_type_factory = _get_conversion_factory(of_type)
+            cls, args, kwargs = type(converted), converted.args, dict(converted.kwargs)
+            return lambda: cls(of_type_factory(), *args, **kwargs)
+
+        return functools.partial(type(converted), of_type, *converted.args, **converted.kwargs)
+
+    if isinstance(converted, UnmountedType):
+        return functools.partial(type(converted), *converted.args, **converted.kwargs)
+
+    reference = getattr(converted, "reference", None)
+    if reference is not None:
+        return functools.partial(create_dynamic_reference, *reference)
+
+    template = copy.deepcopy(converted)
+
+    def copy_conversion():
+        conversion = copy.deepcopy(template)
+        conversion.reset_counter()
+        return conversion
+
+    return copy_conversion
+
+
+def clear_conversion_cache():
+    with _conversion_cache_lock:
+        _conversion_cache.clear()
+
+
+def _convert_django_field_with_choices(
+    field,
+    registry=None,
+    required=None,
+    field_many_to_many_extras=None,
+    field_foreign_key_extras=None,
+    field_one_to_one_extras=None,
 ):
     choices = getattr(field, "choices", None)
 
@@ -146,6 +259,11 @@ def convert_django_field_with_choices(
         # In graphene-django 2.0, it is a regular `enum` type.
         existing_conversion_in_registry = registry.get_converted_field(field)
 
+        # The enum may also have been created by an earlier conversion of ours, registered by name.
+        existing_enum_in_registry = registry.get_converted_field(registry_name)
+        if isinstance(existing_enum_in_registry, type) and issubclass(existing_enum_in_registry, Enum):
+            return existing_enum_in_registry(description=field.help_text, required=is_required(field, required))
+
         if existing_conversion_in_registry:
             # This is the graphene-django 2.0 case
             if hasattr(existing_conversion_in_registry, "kwargs"):
@@ -176,6 +294,31 @@ def convert_django_field_with_choices(
     return EnumCls(description=field.help_text, required=is_required(field, required))  # noqa
 
 
+def create_dynamic_reference(type_name, description, required, many=False):
+    """
+    Returns a `Dynamic` for a field referencing the input type `type_name` (a list of them if `many`), which is looked
+    up when the schema is built. The arguments are kept on the `Dynamic`, for fingerprints and cached conversions.
+    """
+
+    def dynamic_type():
+        _type = get_input_type(type_name)
+
+        if not _type:
+            raise GraphQLError(f"The type {type_name} does not exist.")
+
+        if many:
+            return List(_type, description=description, required=required)
+
+        return InputField(_type, description=description, required=required)
+
+    register_input_type_reference(type_name)
+
+    dynamic = Dynamic(dynamic_type)
+    dynamic.referenced_type_name = type_name
+    dynamic.reference = (type_name, description, required, many)
+    return dynamic
+
+
 @singledispatch
 def convert_django_field_to_input(
     field,
@@ -223,19 +366,7 @@ def convert_one_to_one_field(
             required=is_required(field, required),
         )
 
-    def dynamic_type():
-        _type = registry.get_converted_field(type_name)
-
-        if not _type:
-            raise GraphQLError(f"The type {type_name} does not exist.")
-
-        return InputField(
-            _type,
-            description=getattr(field, "help_text", ""),
-            required=is_required(field, required),
-        )
-
-    return Dynamic(dynamic_type)
+    return create_dynamic_reference(type_name, getattr(field, "help_text", ""), is_required(field, required))
 
 
 @convert_django_field_to_input.register(models.AutoField)
@@ -259,15 +390,7 @@ def convert_field_to_id(
 
     # Use the Input type node from registry in a dynamic type, and create a union with that
     # and the ID
-    def dynamic_type():
-        _type = registry.get_converted_field(_type_name)
-
-        if not _type:
-            raise GraphQLError(f"The type {_type_name} does not exist.")
-
-        return InputField(_type, description=field.help_text, required=is_required(field, required))
-
-    return Dynamic(dynamic_type)
+    return create_dynamic_reference(_type_name, field.help_text, is_required(field, required))
 
 
 @convert_django_field_to_input.register(models.UUIDField)
@@ -429,19 +552,9 @@ def convert_many_to_many_field(
 
     # Use the Input type node from registry in a dynamic type, and create a union with that
     # and the ID
-    def dynamic_type():
-        _type = registry.get_converted_field(_type_name)
-
-        if not _type:
-            raise GraphQLError(f"The type {_type_name} does not exist.")
-
-        return List(
-            _type,
-            description=getattr(field, "help_text", ""),
-            required=is_required(field, required, True),
-        )
-
-    return Dynamic(dynamic_type)
+    return create_dynamic_reference(
+        _type_name, getattr(field, "help_text", ""), is_required(field, required, True), many=True
+    )
 
 
 @convert_django_field_to_input.register(ArrayField)
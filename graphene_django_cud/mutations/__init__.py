@@ -6,6 +6,7 @@ from .filter_delete import DjangoFilterDeleteMutation
 from .filter_update import DjangoFilterUpdateMutation
 from .create import DjangoCreateMutation
 from .delete import DjangoDeleteMutation
+from .mutation_set import DjangoCudMutationSet
 from .patch import DjangoPatchMutation
 from .update import DjangoUpdateMutation
 
@@ -20,4 +21,5 @@ __all__ = (
     "DjangoBatchDeleteMutation",
     "DjangoFilterDeleteMutation",
     "DjangoFilterUpdateMutation",
+    "DjangoCudMutationSet",
 )
@@ -3,9 +3,8 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
-from graphene import InputObjectType
 from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_snake_case
 from graphene_django.registry import get_global_registry
@@ -17,6 +16,8 @@ from graphene_django_cud.mutations.core import DjangoCudBase, DjangoCudBaseOptio
 from graphene_django_cud.registry import get_type_meta_registry
 from graphene_django_cud.signals import post_batch_create_mutation
 from graphene_django_cud.util import get_input_fields_for_model, apply_field_name_mappings
+from graphene_django_cud.util.fingerprint import create_input_object_type
+from graphene_django_cud.util.lazy import create_input_type, get_input_type
 
 
 class DjangoBatchCreateMutationOptions(DjangoCudBaseOptions):
@@ -53,6 +54,8 @@ class DjangoBatchCreateMutation(DjangoCudBase):
         use_id_suffixes_for_fk=getattr(settings, USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY, None),
         use_id_suffixes_for_m2m=getattr(settings, USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY, None),
         field_name_mappings=None,
+        lazy_input_types=None,
+        reuse_input_types=None,
         **kwargs,
     ):
         registry = get_global_registry()
@@ -102,7 +105,7 @@ class DjangoBatchCreateMutation(DjangoCudBase):
 
         if use_type_name:
             input_type_name = use_type_name
-            InputType = registry.get_converted_field(input_type_name)
+            InputType = get_input_type(input_type_name)
             if not InputType:
                 raise GraphQLError(f"Could not find input type with name {input_type_name}")
         else:
@@ -112,45 +115,51 @@ class DjangoBatchCreateMutation(DjangoCudBase):
                 get_model_fields(model), use_id_suffixes_for_fk, use_id_suffixes_for_m2m, field_name_mappings
             )
 
-            input_fields = get_input_fields_for_model(
-                model,
-                fields,
-                exclude,
-                tuple(auto_context_fields.keys()) + optional_fields,
-                required_fields,
-                many_to_many_extras,
-                foreign_key_extras,
-                many_to_one_extras,
-                one_to_one_extras=one_to_one_extras,
-                parent_type_name=input_type_name,
-                field_types=field_types,
-                field_name_mappings=field_name_mappings,
-            )
+            def build_input_type():
+                input_fields = get_input_fields_for_model(
+                    model,
+                    fields,
+                    exclude,
+                    tuple(auto_context_fields.keys()) + optional_fields,
+                    required_fields,
+                    many_to_many_extras,
+                    foreign_key_extras,
+                    many_to_one_extras,
+                    one_to_one_extras=one_to_one_extras,
+                    parent_type_name=input_type_name,
+                    field_types=field_types,
+                    field_name_mappings=field_name_mappings,
+                    reuse_input_types=reuse_input_types,
+                )
 
-            for name, field in custom_fields.items():
-                input_fields[name] = field
-
-            InputType = type(input_type_name, (InputObjectType,), input_fields)
-
-            # Register meta-data
-            meta_registry.register(
-                input_type_name,
-                {
-                    "auto_context_fields": auto_context_fields or {},
-                    "optional_fields": optional_fields,
-                    "required_fields": required_fields,
-                    "many_to_many_extras": many_to_many_extras,
-                    "many_to_one_extras": many_to_one_extras,
-                    "foreign_key_extras": foreign_key_extras,
-                    "one_to_one_extras": one_to_one_extras,
-                    "field_types": field_types or {},
-                    "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
-                    "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
-                    "field_name_mappings": field_name_mappings,
-                },
-            )
+                for name, field in custom_fields.items():
+                    input_fields[name] = field
+
+                InputType = create_input_object_type(input_type_name, input_fields, reuse_input_types, model)
+
+                # Register meta-data
+                meta_registry.register(
+                    input_type_name,
+                    {
+                        "auto_context_fields": auto_context_fields or {},
+                        "optional_fields": optional_fields,
+                        "required_fields": required_fields,
+                        "many_to_many_extras": many_to_many_extras,
+                        "many_to_one_extras": many_to_one_extras,
+                        "foreign_key_extras": foreign_key_extras,
+                        "one_to_one_extras": one_to_one_extras,
+                        "field_types": field_types or {},
+                        "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
+                        "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
+                        "field_name_mappings": field_name_mappings,
+                    },
+                )
+
+                registry.register_converted_field(input_type_name, InputType)
 
-            registry.register_converted_field(input_type_name, InputType)
+                return InputType
+
+            InputType = create_input_type(input_type_name, build_input_type, lazy_input_types)
 
         arguments = OrderedDict(input=graphene.List(InputType, required=True))
 
@@ -210,6 +219,41 @@ class DjangoBatchCreateMutation(DjangoCudBase):
     def validate(cls, root, info, input, full_input):
         return super().validate(root, info, input, full_input)
 
+    @classmethod
+    def perform_batch_create(cls, root, info, input):
+        """Creates the objects. Runs inside the mutation transaction."""
+        Model = cls._meta.model
+        auto_context_fields = cls._meta.auto_context_fields or {}
+
+        created_objs = []
+
+        for data in input:
+            cls.call_hook("validate", root, info, data, input)
+            obj = cls.create_obj(
+                data,
+                info,
+                auto_context_fields,
+                cls._meta.many_to_many_extras,
+                cls._meta.foreign_key_extras,
+                cls._meta.many_to_one_extras,
+                cls._meta.one_to_one_extras,
+                cls._meta.field_name_mappings,
+                Model,
+            )
+
+            new_obj = cls.after_create_obj(root, info, data, obj, input)
+
+            if new_obj is not None:
+                obj = new_obj
+
+            created_objs.append(obj)
+
+        updated_objs = cls.call_hook("before_save", root, info, input, created_objs)
+        if updated_objs:
+            created_objs = updated_objs
+
+        return created_objs
+
     @classmethod
     def mutate(cls, root, info, input):
         updated_input = cls.before_mutate(root, info, input)
@@ -222,39 +266,35 @@ class DjangoBatchCreateMutation(DjangoCudBase):
         cls.check_permissions(root, info, input)
 
         Model = cls._meta.model
-        auto_context_fields = cls._meta.auto_context_fields or {}
+        created_objs = cls.run_in_transaction(lambda: cls.perform_batch_create(root, info, input))
 
-        created_objs = []
+        return_data = {cls._meta.return_field_name: created_objs}
+        cls.after_mutate(root, info, input, created_objs, return_data)
 
-        with transaction.atomic():
-            for data in input:
-                cls.validate(root, info, data, input)
-                obj = cls.create_obj(
-                    data,
-                    info,
-                    auto_context_fields,
-                    cls._meta.many_to_many_extras,
-                    cls._meta.foreign_key_extras,
-                    cls._meta.many_to_one_extras,
-                    cls._meta.one_to_one_extras,
-                    cls._meta.field_name_mappings,
-                    Model,
-                )
+        post_batch_create_mutation.send(sender=Model, instances=created_objs)
 
-                new_obj = cls.after_create_obj(root, info, data, obj, input)
+        return cls(**return_data)
 
-                if new_obj is not None:
-                    obj = new_obj
+    @classmethod
+    async def mutate_async(cls, root, info, input):
+        updated_input = await cls.call_hook_async("before_mutate", root, info, input)
+        if updated_input:
+            input = updated_input
+
+        await cls.check_login_required_async(info)
 
-                created_objs.append(obj)
+        await cls.call_hook_async("check_permissions", root, info, input)
 
-            updated_objs = cls.before_save(root, info, input, created_objs)
-            if updated_objs:
-                created_objs = updated_objs
+        Model = cls._meta.model
+
+        # Django transactions are bound to a thread, so the transaction runs in a single thread.
+        created_objs = await sync_to_async(cls.run_in_transaction)(
+            lambda: cls.perform_batch_create(root, info, input)
+        )
 
         return_data = {cls._meta.return_field_name: created_objs}
-        cls.after_mutate(root, info, input, created_objs, return_data)
+        await cls.call_hook_async("after_mutate", root, info, input, created_objs, return_data)
 
-        post_batch_create_mutation.send(sender=Model, instances=created_objs)
+        await post_batch_create_mutation.asend(sender=Model, instances=created_objs)
 
         return cls(**return_data)
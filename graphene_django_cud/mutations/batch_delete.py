@@ -139,3 +139,43 @@ class DjangoBatchDeleteMutation(DjangoCudBase):
             deleted_ids=deleted_ids,
             missed_ids=missed_ids,
         )
+
+    @classmethod
+    async def mutate_async(cls, root, info, ids):
+        await cls.call_hook_async("before_mutate", root, info, ids)
+
+        await cls.check_login_required_async(info)
+
+        await cls.call_hook_async("check_permissions", root, info, ids)
+
+        Model = cls._meta.model  # noqa
+        ids = cls.resolve_ids(ids)
+
+        await cls.call_hook_async("validate", root, info, ids)
+
+        qs_to_delete = cls.get_queryset(root, info, ids).filter(pk__in=ids)
+
+        updated_qs = await cls.call_hook_async("before_save", root, info, ids, qs_to_delete)
+
+        if updated_qs:
+            qs_to_delete = updated_qs
+
+        # Find out which (global) ids are deleted, and which were not found.
+        deleted_ids = [cls.get_return_id(id) async for id in qs_to_delete.values_list("id", flat=True)]
+
+        all_global_ids = [cls.get_return_id(id) for id in ids]
+
+        missed_ids = list(set(all_global_ids).difference(deleted_ids))
+
+        deletion_count, _ = await qs_to_delete.adelete()
+
+        await cls.call_hook_async("after_mutate", root, info, ids, deletion_count, deleted_ids)
+        await post_batch_delete_mutation.asend(
+            sender=Model, ids=ids, deletion_count=deletion_count, deleted_ids=deleted_ids
+        )
+
+        return cls(
+            deletion_count=deletion_count,
+            deleted_ids=deleted_ids,
+            missed_ids=missed_ids,
+        )
@@ -3,9 +3,8 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
-from graphene import InputObjectType
 from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_snake_case
 from graphene_django.registry import get_global_registry
@@ -16,12 +15,24 @@ from graphene_django_cud.consts import USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY, USE
 from graphene_django_cud.mutations.core import DjangoCudBase, DjangoCudBaseOptions
 from graphene_django_cud.registry import get_type_meta_registry
 from graphene_django_cud.signals import post_batch_update_mutation
-from graphene_django_cud.util import get_input_fields_for_model, apply_field_name_mappings
+from graphene_django_cud.util import (
+    apply_field_name_mappings,
+    get_changed_fields,
+    get_field_values,
+    get_input_fields_for_model,
+)
+from graphene_django_cud.util.fingerprint import create_input_object_type
+from graphene_django_cud.util.lazy import create_input_type, get_input_type
 
 
 class DjangoBatchUpdateMutationOptions(DjangoCudBaseOptions):
     use_type_name = None
 
+    use_select_for_update = None
+    select_for_update_of = None
+    select_for_update_nowait = None
+    select_for_update_skip_locked = None
+
 
 class DjangoBatchUpdateMutation(DjangoCudBase):
     class Meta:
@@ -52,7 +63,13 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
         use_id_suffixes_for_fk=getattr(settings, USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY, None),
         use_id_suffixes_for_m2m=getattr(settings, USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY, None),
         field_name_mappings=None,
+        lazy_input_types=None,
+        reuse_input_types=None,
         custom_fields=None,
+        use_select_for_update=None,
+        select_for_update_of=(),
+        select_for_update_nowait=False,
+        select_for_update_skip_locked=False,
         **kwargs,
     ):
         registry = get_global_registry()
@@ -100,9 +117,20 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
                 DeprecationWarning,
             )
 
+        if select_for_update_nowait and select_for_update_skip_locked:
+            raise Exception(
+                "Cannot set both `select_for_update_nowait` and `select_for_update_skip_locked` on a mutation"
+            )
+
+        if use_select_for_update is None:
+            # Locking is opt-in, and implied by the options configuring it.
+            use_select_for_update = bool(
+                select_for_update_of or select_for_update_nowait or select_for_update_skip_locked
+            )
+
         if use_type_name:
             input_type_name = use_type_name
-            InputType = registry.get_converted_field(input_type_name)
+            InputType = get_input_type(input_type_name)
             if not InputType:
                 raise GraphQLError(f"Could not find input type with name {input_type_name}")
         else:
@@ -112,52 +140,62 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
                 get_model_fields(model), use_id_suffixes_for_fk, use_id_suffixes_for_m2m, field_name_mappings
             )
 
-            input_fields = get_input_fields_for_model(
-                model,
-                fields,
-                exclude,
-                tuple(auto_context_fields.keys()) + optional_fields,
-                required_fields,
-                many_to_many_extras,
-                foreign_key_extras,
-                many_to_one_extras,
-                one_to_one_extras=one_to_one_extras,
-                parent_type_name=input_type_name,
-                field_types=field_types,
-                ignore_primary_key=False,
-                field_name_mappings=field_name_mappings,
-            )
+            def build_input_type():
+                input_fields = get_input_fields_for_model(
+                    model,
+                    fields,
+                    exclude,
+                    tuple(auto_context_fields.keys()) + optional_fields,
+                    required_fields,
+                    many_to_many_extras,
+                    foreign_key_extras,
+                    many_to_one_extras,
+                    one_to_one_extras=one_to_one_extras,
+                    parent_type_name=input_type_name,
+                    field_types=field_types,
+                    ignore_primary_key=False,
+                    field_name_mappings=field_name_mappings,
+                    reuse_input_types=reuse_input_types,
+                )
 
-            for name, field in custom_fields.items():
-                input_fields[name] = field
-
-            InputType = type(input_type_name, (InputObjectType,), input_fields)
-
-            # Register meta-data
-            meta_registry.register(
-                input_type_name,
-                {
-                    "auto_context_fields": auto_context_fields or {},
-                    "optional_fields": optional_fields,
-                    "required_fields": required_fields,
-                    "many_to_many_extras": many_to_many_extras,
-                    "many_to_one_extras": many_to_one_extras,
-                    "foreign_key_extras": foreign_key_extras,
-                    "one_to_one_extras": one_to_one_extras,
-                    "field_types": field_types or {},
-                    "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
-                    "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
-                    "field_name_mappings": field_name_mappings,
-                },
-            )
+                for name, field in custom_fields.items():
+                    input_fields[name] = field
+
+                InputType = create_input_object_type(input_type_name, input_fields, reuse_input_types, model)
+
+                # Register meta-data
+                meta_registry.register(
+                    input_type_name,
+                    {
+                        "auto_context_fields": auto_context_fields or {},
+                        "optional_fields": optional_fields,
+                        "required_fields": required_fields,
+                        "many_to_many_extras": many_to_many_extras,
+                        "many_to_one_extras": many_to_one_extras,
+                        "foreign_key_extras": foreign_key_extras,
+                        "one_to_one_extras": one_to_one_extras,
+                        "field_types": field_types or {},
+                        "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
+                        "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
+                        "field_name_mappings": field_name_mappings,
+                    },
+                )
 
-            registry.register_converted_field(input_type_name, InputType)
+                registry.register_converted_field(input_type_name, InputType)
+
+                return InputType
+
+            InputType = create_input_type(input_type_name, build_input_type, lazy_input_types)
 
         arguments = OrderedDict(input=graphene.List(InputType, required=True))
 
         output_fields = OrderedDict()
         output_fields[return_field_name] = graphene.List(model_type)
 
+        if use_select_for_update and select_for_update_skip_locked:
+            # Rows locked by other transactions are skipped, and reported back to the client.
+            output_fields["skipped_ids"] = graphene.List(graphene.ID)
+
         if _meta is None:
             _meta = DjangoBatchUpdateMutationOptions(cls)
 
@@ -180,6 +218,10 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
         _meta.InputType = InputType
         _meta.input_type_name = input_type_name
         _meta.login_required = login_required or (_meta.permissions and len(_meta.permissions) > 0)
+        _meta.use_select_for_update = use_select_for_update
+        _meta.select_for_update_of = select_for_update_of
+        _meta.select_for_update_nowait = select_for_update_nowait
+        _meta.select_for_update_skip_locked = select_for_update_skip_locked
 
         super().__init_subclass_with_meta__(arguments=arguments, _meta=_meta, **kwargs)
 
@@ -220,6 +262,97 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
     def get_object(cls, root, info, input, full_input):
         return cls.get_queryset(root, info, full_input).get(pk=cls.resolve_id(input["id"]))
 
+    @classmethod
+    def lock_objects(cls, root, info, input):
+        """
+        Locks all rows referenced by the input with a single `select_for_update` query, ordered
+        by primary key. Concurrent batches touching overlapping rows thus acquire their locks in
+        the same order, regardless of the order the rows are given in the input, and cannot
+        deadlock on each other.
+
+        Returns the set of primary keys (as strings) that were locked.
+        """
+        ids = [cls.resolve_id(data["id"]) for data in input]
+
+        queryset = (
+            cls.get_queryset(root, info, input)
+            .filter(pk__in=ids)
+            .order_by("pk")
+            .select_for_update(
+                of=cls._meta.select_for_update_of or (),
+                nowait=cls._meta.select_for_update_nowait,
+                skip_locked=cls._meta.select_for_update_skip_locked,
+            )
+        )
+
+        return {str(pk) for pk in queryset.values_list("pk", flat=True)}
+
+    @classmethod
+    def perform_batch_update(cls, root, info, input):
+        """
+        Updates and saves the objects. Runs inside the mutation transaction. Returns the objects, the ids
+        skipped, and the changed fields of each object (see `get_changed_fields`).
+        """
+        Model = cls._meta.model
+        auto_context_fields = cls._meta.auto_context_fields or {}
+
+        updated_objs = []
+        skipped_ids = []
+        old_values = {}
+
+        locked_ids = cls.lock_objects(root, info, input) if cls._meta.use_select_for_update else None
+
+        if cls._meta.select_for_update_skip_locked and locked_ids is not None:
+            # Only rows which exist but are locked by another transaction are skipped. Missing rows raise in
+            # `get_object` as usual.
+            ids = [cls.resolve_id(data["id"]) for data in input]
+            existing_pks = cls.get_queryset(root, info, input).filter(pk__in=ids).values_list("pk", flat=True)
+            locked_out_ids = {str(pk) for pk in existing_pks} - locked_ids
+        else:
+            locked_out_ids = set()
+
+        for data in input:
+            if locked_out_ids and str(cls.resolve_id(data["id"])) in locked_out_ids:
+                skipped_ids.append(data["id"])
+                continue
+
+            cls.call_hook("validate", root, info, data, input)
+            obj = cls.get_object(root, info, data, input)
+
+            # The primary key may be set from the input by `update_obj`, so the snapshots are keyed by its string value.
+            old_values[str(obj.pk)] = get_field_values(obj)
+
+            obj = cls.update_obj(
+                obj,
+                data,
+                info,
+                auto_context_fields,
+                cls._meta.many_to_many_extras,
+                cls._meta.foreign_key_extras,
+                cls._meta.many_to_one_extras,
+                cls._meta.one_to_one_extras,
+                cls._meta.field_name_mappings,
+                Model,
+            )
+
+            new_obj = cls.after_update_obj(root, info, data, obj, input)
+
+            if new_obj is not None:
+                obj = new_obj
+
+            updated_objs.append(obj)
+
+        before_save_updated_objs = cls.call_hook("before_save", root, info, input, updated_objs)
+        if before_save_updated_objs:
+            updated_objs = before_save_updated_objs
+
+        for obj in updated_objs:
+            obj.save()
+
+        changed_fields = [get_changed_fields(old_values.get(str(obj.pk), {}), obj) for obj in updated_objs]
+
+        return updated_objs, skipped_ids, changed_fields
+
     @classmethod
     def mutate(cls, root, info, input):
         updated_input = cls.before_mutate(root, info, input)
@@ -232,45 +365,45 @@ class DjangoBatchUpdateMutation(DjangoCudBase):
         cls.check_permissions(root, info, input)
 
         Model = cls._meta.model
-        auto_context_fields = cls._meta.auto_context_fields or {}
+        updated_objs, skipped_ids, changed_fields = cls.run_in_transaction(
+            lambda: cls.perform_batch_update(root, info, input)
+        )
 
-        updated_objs = []
+        return_data = {cls._meta.return_field_name: updated_objs}
+        if "skipped_ids" in cls._meta.fields:
+            return_data["skipped_ids"] = skipped_ids
 
-        with transaction.atomic():
-            for data in input:
-                cls.validate(root, info, data, input)
-                obj = cls.get_object(root, info, data, input)
-
-                obj = cls.update_obj(
-                    obj,
-                    data,
-                    info,
-                    auto_context_fields,
-                    cls._meta.many_to_many_extras,
-                    cls._meta.foreign_key_extras,
-                    cls._meta.many_to_one_extras,
-                    cls._meta.one_to_one_extras,
-                    cls._meta.field_name_mappings,
-                    Model,
-                )
+        cls.after_mutate(root, info, input, updated_objs, return_data)
 
-                new_obj = cls.after_update_obj(root, info, data, obj, input)
+        post_batch_update_mutation.send(sender=Model, instances=updated_objs, changed_fields=changed_fields)
 
-                if new_obj is not None:
-                    obj = new_obj
+        return cls(**return_data)
 
-                updated_objs.append(obj)
+    @classmethod
+    async def mutate_async(cls, root, info, input):
+        updated_input = await cls.call_hook_async("before_mutate", root, info, input)
+        if updated_input:
+            input = updated_input
 
-            before_save_updated_objs = cls.before_save(root, info, input, updated_objs)
-            if before_save_updated_objs:
-                updated_objs = before_save_updated_objs
+        await cls.check_login_required_async(info)
 
-            for obj in updated_objs:
-                obj.save()
+        await cls.call_hook_async("check_permissions", root, info, input)
+
+        Model = cls._meta.model
+
+        # Django transactions are bound to a thread, so the transaction runs in a single thread.
+        updated_objs, skipped_ids, changed_fields = await sync_to_async(cls.run_in_transaction)(
+            lambda: cls.perform_batch_update(root, info, input)
+        )
 
         return_data = {cls._meta.return_field_name: updated_objs}
-        cls.after_mutate(root, info, input, updated_objs, return_data)
+        if "skipped_ids" in cls._meta.fields:
+            return_data["skipped_ids"] = skipped_ids
+
+        await cls.call_hook_async("after_mutate", root, info, input, updated_objs, return_data)
 
-        post_batch_update_mutation.send(sender=Model, instances=updated_objs)
+        await post_batch_update_mutation.asend(
+            sender=Model, instances=updated_objs, changed_fields=changed_fields
+        )
 
         return cls(**return_data)
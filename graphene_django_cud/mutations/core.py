@@ -1,12 +1,39 @@
+import asyncio
 import enum
+import functools
+import inspect
+import math
+import warnings
+from contextlib import contextmanager
 from typing import Iterable, Union, Sized
 
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.utils.functional import LazyObject
 from graphene import Mutation
 from graphene.types.mutation import MutationOptions
 from graphql import GraphQLError
 
+from graphene_django_cud.consts import (
+    MAX_ESTIMATED_ROWS_SETTINGS_KEY,
+    MAX_ESTIMATED_STATEMENTS_SETTINGS_KEY,
+    MAX_QUERIES_SETTINGS_KEY,
+    TRANSACTION_MAX_ATTEMPTS_SETTINGS_KEY,
+)
 from graphene_django_cud.registry import get_type_meta_registry
+from graphene_django_cud.util.budget import get_current_query_budget, install_query_counters, query_budget
+from graphene_django_cud.util.cost import (
+    MutationCost,
+    MutationCostExceeded,
+    cost_estimate,
+    estimate_object_cost,
+    get_current_cost_estimate,
+)
+from graphene_django_cud.util.lazy import is_lazy_input_type
+from graphene_django_cud.util.permissions import user_has_perms
+from graphene_django_cud.util.transaction import is_retry_safe, run_in_transaction
 from graphene_django_cud.util import (
     get_likely_operation_from_name,
     disambiguate_id,
@@ -20,11 +47,349 @@ from graphene_django_cud.util import (
 
 meta_registry = get_type_meta_registry()
 
+# Hooks which are called inside the mutation transaction, and hence are re-run if the transaction is retried.
+# In addition, all `handle_<field>` and `validate_<field>` methods are re-run. `get_permissions` and
+# `check_permissions` are left out: they run before the transaction, or only check the object to update.
+TRANSACTION_HOOK_NAMES = (
+    "get_queryset",
+    "get_object",
+    "lock_objects",
+    "validate",
+    "create_obj",
+    "update_obj",
+    "upsert_obj",
+    "before_create_obj",
+    "after_create_obj",
+    "after_update_obj",
+    "before_save",
+    "perform_create",
+    "perform_update",
+    "perform_batch_create",
+    "perform_batch_update",
+)
+
+# Hooks whose default implementation does nothing, and which need not be called unless overridden.
+NOOP_HOOK_NAMES = ("before_mutate", "before_save", "after_mutate")
+
+
+def is_library_method(cls, name):
+    """Returns True if the method `name` of `cls` is not overridden outside of this library."""
+    owner = next((klass for klass in cls.__mro__ if name in klass.__dict__), None)
+    return owner is None or owner.__module__.startswith("graphene_django_cud.mutations")
+
+
+async def _await(awaitable):
+    return await awaitable
+
 
 class DjangoCudBase(Mutation):
     class Meta:
         abstract = True
 
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls,
+        _meta=None,
+        resolver=None,
+        transaction_max_attempts=None,
+        max_queries=None,
+        max_estimated_statements=None,
+        max_estimated_rows=None,
+        **kwargs,
+    ):
+        if _meta is not None:
+            _meta.transaction_max_attempts = transaction_max_attempts
+            _meta.retry_unsafe_hooks = cls.get_retry_unsafe_hooks()
+            _meta.max_queries = max_queries
+            _meta.max_estimated_statements = max_estimated_statements
+            _meta.max_estimated_rows = max_estimated_rows
+
+        super().__init_subclass_with_meta__(_meta=_meta, resolver=resolver or cls.dispatch_mutate, **kwargs)
+
+    @classmethod
+    def dispatch_mutate(cls, root, info, **kwargs):
+        """
+        The resolver of the mutation. Runs `mutate_async` if the schema is executed asynchronously,
+        and `mutate` otherwise.
+        """
+        input_type = getattr(cls._meta, "InputType", None)
+        if is_lazy_input_type(input_type):
+            # The nested input types must be registered before the mutation is run.
+            input_type()
+
+        max_queries = cls.get_max_queries()
+        estimate = functools.partial(cls.estimate_cost, root, info, **kwargs)
+        # The estimate is checked before the mutation starts, i.e. before `before_mutate` and the transaction.
+        cost = cls.check_cost_limits(estimate)
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            with cls._limit_mutation(max_queries, estimate, cost):
+                return cls.mutate(root, info, **kwargs)
+
+        if inspect.iscoroutinefunction(cls.mutate):
+            mutate = cls.mutate
+        elif not is_library_method(cls, "mutate"):
+            # A custom synchronous `mutate` must not block the event loop.
+            mutate = sync_to_async(cls.mutate)
+        else:
+            mutate = cls.mutate_async
+
+        return cls._mutate_with_limits_async(mutate, max_queries, estimate, cost, root, info, **kwargs)
+
+    @classmethod
+    async def _mutate_with_limits_async(cls, mutate, max_queries, estimate, cost, root, info, **kwargs):
+        with cls._limit_mutation(max_queries, estimate, cost):
+            return await mutate(root, info, **kwargs)
+
+    @classmethod
+    @contextmanager
+    def _limit_mutation(cls, max_queries, estimate, cost):
+        with cost_estimate(estimate, cost):
+            if max_queries is None:
+                yield
+                return
+
+            with query_budget(cls.__name__, max_queries):
+                yield
+
+    @classmethod
+    def get_max_queries(cls):
+        """Returns the maximum number of database queries of the mutation, or None if it is unlimited."""
+        max_queries = getattr(cls._meta, "max_queries", None)
+        if max_queries is None:
+            max_queries = getattr(settings, MAX_QUERIES_SETTINGS_KEY, None)
+
+        return max_queries
+
+    @classmethod
+    def get_query_count(cls):
+        """
+        Returns the number of database queries run by the mutation so far, e.g. in `after_mutate`, or None if the
+        mutation has no query budget.
+        """
+        budget = get_current_query_budget()
+        return budget.count if budget is not None else None
+
+    @classmethod
+    def get_max_estimated_statements(cls):
+        """Returns the maximum estimated number of database statements of the mutation, or None if it is unlimited."""
+        max_estimated_statements = getattr(cls._meta, "max_estimated_statements", None)
+        if max_estimated_statements is None:
+            max_estimated_statements = getattr(settings, MAX_ESTIMATED_STATEMENTS_SETTINGS_KEY, None)
+
+        return max_estimated_statements
+
+    @classmethod
+    def get_max_estimated_rows(cls):
+        """Returns the maximum estimated number of database rows of the mutation, or None if it is unlimited."""
+        max_estimated_rows = getattr(cls._meta, "max_estimated_rows", None)
+        if max_estimated_rows is None:
+            max_estimated_rows = getattr(settings, MAX_ESTIMATED_ROWS_SETTINGS_KEY, None)
+
+        return max_estimated_rows
+
+    @classmethod
+    def estimate_cost(cls, root, info, **arguments):
+        """
+        Estimates the database statements and rows of the mutation from its arguments, before it runs. Each input
+        object counts, including the ids of its relations and the nested objects of its extras. Returns a
+        `MutationCost`.
+        """
+        cost = MutationCost()
+        type_meta = get_type_meta_registry().get_meta_for_type(getattr(cls._meta, "input_type_name", None))
+
+        input = arguments.get("input")
+        if isinstance(input, (list, tuple)):
+            for item in input:
+                estimate_object_cost(item, cls._meta.model, type_meta, cost)
+        elif input is not None:
+            estimate_object_cost(input, cls._meta.model, type_meta, cost)
+        elif "ids" in arguments:
+            cost.add(1, len(arguments["ids"]))
+        elif "id" in arguments:
+            cost.add(1, 1)
+
+        return cost
+
+    @classmethod
+    def check_cost_limits(cls, estimate):
+        """
+        Raises `MutationCostExceeded` if the cost returned by `estimate` is above the limits of the mutation. Returns
+        the cost, or None if the mutation has no limits.
+        """
+        max_estimated_statements = cls.get_max_estimated_statements()
+        max_estimated_rows = cls.get_max_estimated_rows()
+        if max_estimated_statements is None and max_estimated_rows is None:
+            return None
+
+        cost = estimate()
+        if max_estimated_statements is not None and cost.statements > max_estimated_statements:
+            raise MutationCostExceeded(
+                f"The input of {cls.__name__} is estimated to run {cost.statements} database statements, "
+                f"more than the limit of {max_estimated_statements}."
+            )
+
+        if max_estimated_rows is not None and math.isinf(cost.rows):
+            raise MutationCostExceeded(
+                f"The input of {cls.__name__} may write any number of database rows, "
+                f"more than the limit of {max_estimated_rows}. Filter on ids to bound them."
+            )
+
+        if max_estimated_rows is not None and cost.rows > max_estimated_rows:
+            raise MutationCostExceeded(
+                f"The input of {cls.__name__} is estimated to write {cost.rows} database rows, "
+                f"more than the limit of {max_estimated_rows}."
+            )
+
+        return cost
+
+    @classmethod
+    def get_cost_estimate(cls):
+        """Returns the estimated cost of the running mutation, e.g. in `before_mutate`, as a `MutationCost`."""
+        return get_current_cost_estimate()
+
+    @classmethod
+    def call_hook(cls, name, *args, **kwargs):
+        """Calls the hook `name` from synchronous code. Coroutine hooks are run to completion."""
+        result = getattr(cls, name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = async_to_sync(_await)(result)
+
+        return result
+
+    @classmethod
+    async def call_hook_async(cls, name, *args, **kwargs):
+        """
+        Calls the hook `name` from asynchronous code. Coroutine hooks are awaited, other hooks are run
+        in a thread, as they may access the database.
+        """
+        if name in NOOP_HOOK_NAMES and is_library_method(cls, name):
+            return None
+
+        hook = getattr(cls, name)
+        if inspect.iscoroutinefunction(hook):
+            return await hook(*args, **kwargs)
+
+        return await sync_to_async(hook)(*args, **kwargs)
+
+    @classmethod
+    async def check_login_required_async(cls, info):
+        if not cls._meta.login_required:
+            return
+
+        user = info.context.user
+        if isinstance(user, LazyObject):
+            # Evaluating a lazy user may hit the session store.
+            is_authenticated = await sync_to_async(lambda: user.is_authenticated)()
+        else:
+            is_authenticated = user.is_authenticated
+
+        if not is_authenticated:
+            raise GraphQLError("Must be logged in to access this mutation.")
+
+    @classmethod
+    def get_retry_unsafe_hooks(cls):
+        """
+        Returns the names of the transaction hooks which are overridden outside of this library, and
+        which are not marked with `@retry_safe`.
+        """
+        names = set(TRANSACTION_HOOK_NAMES)
+        names.update(name for name in dir(cls) if name.startswith("handle_") or name.startswith("validate_"))
+
+        return [
+            name
+            for name in sorted(names)
+            if not is_library_method(cls, name) and not is_retry_safe(inspect.getattr_static(cls, name))
+        ]
+
+    @classmethod
+    def run_in_transaction(cls, func):
+        """
+        Runs `func` in a transaction, retrying it on deadlocks and serialization failures. Retries are
+        disabled if the mutation overrides a transaction hook that is not marked with `@retry_safe`.
+        """
+        max_attempts = cls._meta.transaction_max_attempts
+        if max_attempts is None:
+            max_attempts = getattr(settings, TRANSACTION_MAX_ATTEMPTS_SETTINGS_KEY, 1)
+
+        if max_attempts > 1 and cls._meta.retry_unsafe_hooks:
+            warnings.warn(
+                f"Transaction retries are disabled for {cls.__name__}, as the hooks "
+                f"{', '.join(cls._meta.retry_unsafe_hooks)} are not marked with `@retry_safe`."
+            )
+            max_attempts = 1
+
+        if get_current_query_budget() is not None:
+            # Asynchronous mutations run the transaction in another thread, with its own connections.
+            install_query_counters()
+
+        return run_in_transaction(func, max_attempts=max_attempts)
+
+    @classmethod
+    def resolve_filter_values(cls, info, filter):
+        """
+        Converts the filter input of the filter mutations into keyword arguments for `QuerySet.filter`,
+        applying `handle_<field>` methods and resolving ids of relations.
+        """
+        Model = cls._meta.model
+        model_field_values = {}
+
+        for name, value in super(type(filter), filter).items():
+            filter_field_split = name.split("__", 1)
+            field_name = filter_field_split[0]
+
+            try:
+                field = Model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                # This can happen with nested selectors. In this case we set the field to none.
+                field = None
+
+            filter_field_is_list = False
+
+            if len(filter_field_split) > 1:
+                # If we have an "__in" final part of the filter, we are now dealing with
+                # a list of things. Note that all other variants can be coerced directly
+                # on the filter-call, so we don't really have to deal with other cases.
+                filter_field_is_list = filter_field_split[-1] == "in"
+
+            new_value = value
+
+            value_handle_name = "handle_" + name
+            if hasattr(cls, value_handle_name):
+                handle_func = getattr(cls, value_handle_name)
+                assert callable(handle_func), f"Property {value_handle_name} on {cls.__name__} is not a function."
+                new_value = handle_func(value, name, info)
+
+            # On some fields we perform some default conversion, if the value was not transformed above.
+            if new_value == value and value is not None:
+                if type(field) in (models.ForeignKey, models.OneToOneField):
+                    name = getattr(field, "db_column", None) or name + "_id"
+                    new_value = cls.resolve_id(value)
+                elif (
+                    type(field)
+                    in (
+                        models.ManyToManyField,
+                        models.ManyToManyRel,
+                        models.ManyToOneRel,
+                    )
+                    or filter_field_is_list
+                ):
+                    new_value = cls.resolve_ids(value)
+
+            model_field_values[name] = new_value
+
+        return model_field_values
+
+    @classmethod
+    async def resolve_filter_values_async(cls, info, filter):
+        if any(name.startswith("handle_") for name in dir(cls)):
+            # `handle_<field>` methods may access the database.
+            return await sync_to_async(cls.resolve_filter_values)(info, filter)
+
+        return cls.resolve_filter_values(info, filter)
+
     @classmethod
     def get_or_create_foreign_obj(cls, field, value, data, info):
         field_type = data.get("type", "ID")
@@ -37,12 +402,12 @@ class DjangoCudBase(Mutation):
             related_obj = cls.create_obj(
                 value,
                 info,
-                input_type_meta.get("auto_context_fields", {}),
-                input_type_meta.get("many_to_many_extras", {}),
-                input_type_meta.get("foreign_key_extras", {}),
-                input_type_meta.get("many_to_one_extras", {}),
-                input_type_meta.get("one_to_one_extras", {}),
-                input_type_meta.get("field_name_mappings", {}),
+                input_type_meta.auto_context_fields,
+                input_type_meta.many_to_many_extras,
+                input_type_meta.foreign_key_extras,
+                input_type_meta.many_to_one_extras,
+                input_type_meta.one_to_one_extras,
+                input_type_meta.field_name_mappings,
                 field.related_model,
             )
             return related_obj.pk
@@ -58,12 +423,12 @@ class DjangoCudBase(Mutation):
             return cls.create_obj(
                 value,
                 info,
-                input_type_meta.get("auto_context_fields", {}),
-                input_type_meta.get("many_to_many_extras", {}),
-                input_type_meta.get("foreign_key_extras", {}),
-                input_type_meta.get("many_to_one_extras", {}),
-                input_type_meta.get("one_to_one_extras", {}),
-                input_type_meta.get("field_name_mappings", {}),
+                input_type_meta.auto_context_fields,
+                input_type_meta.many_to_many_extras,
+                input_type_meta.foreign_key_extras,
+                input_type_meta.many_to_one_extras,
+                input_type_meta.one_to_one_extras,
+                input_type_meta.field_name_mappings,
                 field.related_model,
             )
         else:
@@ -71,12 +436,12 @@ class DjangoCudBase(Mutation):
                 existing_value,
                 value,
                 info,
-                input_type_meta.get("auto_context_fields", {}),
-                input_type_meta.get("many_to_many_extras", {}),
-                input_type_meta.get("foreign_key_extras", {}),
-                input_type_meta.get("many_to_one_extras", {}),
-                input_type_meta.get("one_to_one_extras", {}),
-                input_type_meta.get("field_name_mappings", {}),
+                input_type_meta.auto_context_fields,
+                input_type_meta.many_to_many_extras,
+                input_type_meta.foreign_key_extras,
+                input_type_meta.many_to_one_extras,
+                input_type_meta.one_to_one_extras,
+                input_type_meta.field_name_mappings,
                 field.related_model,
             )
             obj.save()
@@ -93,41 +458,23 @@ class DjangoCudBase(Mutation):
             data = {}
 
         field_type = data.get("type", "ID")
+        if field_type != "ID":
+            input_type_meta = meta_registry.get_meta_for_type(field_type).merge(data)
 
         for value in values:
             if field_type == "ID":
                 related_obj = field.related_model.objects.get(pk=cls.resolve_id(value))
             else:
                 # This is something that we are going to create
-                input_type_meta = meta_registry.get_meta_for_type(field_type)
-                # Create new obj
                 related_obj = cls.create_obj(
                     value,
                     info,
-                    {
-                        **input_type_meta.get("auto_context_fields", {}),
-                        **data.get("auto_context_fields", {}),
-                    },
-                    {
-                        **input_type_meta.get("many_to_many_extras", {}),
-                        **data.get("many_to_many_extras", {}),
-                    },
-                    {
-                        **input_type_meta.get("foreign_key_extras", {}),
-                        **data.get("foreign_key_extras", {}),
-                    },
-                    {
-                        **input_type_meta.get("many_to_one_extras", {}),
-                        **data.get("many_to_one_extras", {}),
-                    },
-                    {
-                        **input_type_meta.get("one_to_one_extras", {}),
-                        **data.get("one_to_one_extras", {}),
-                    },
-                    {
-                        **input_type_meta.get("field_name_mappings", {}),
-                        **data.get("field_name_mappings", {}),
-                    },
+                    input_type_meta.auto_context_fields,
+                    input_type_meta.many_to_many_extras,
+                    input_type_meta.foreign_key_extras,
+                    input_type_meta.many_to_one_extras,
+                    input_type_meta.one_to_one_extras,
+                    input_type_meta.field_name_mappings,
                     field.related_model,
                 )
             results.append(related_obj)
@@ -142,37 +489,14 @@ class DjangoCudBase(Mutation):
             return results
 
         field_type = data.get("type", "auto")
+        if field_type != "ID":
+            input_type_meta = meta_registry.get_meta_for_type(field_type).merge(data)
+
         for value in values:
             if field_type == "ID":
                 related_obj = field.related_model.objects.get(pk=cls.resolve_id(value))
                 results.append(related_obj)
             else:
-                input_type_meta = meta_registry.get_meta_for_type(field_type)
-                auto_context_fields = {
-                    **input_type_meta.get("auto_context_fields", {}),
-                    **data.get("auto_context_fields", {}),
-                }
-                many_to_many_extras = {
-                    **input_type_meta.get("many_to_many_extras", {}),
-                    **data.get("many_to_many_extras", {}),
-                }
-                foreign_key_extras = {
-                    **input_type_meta.get("foreign_key_extras", {}),
-                    **data.get("foreign_key_extras", {}),
-                }
-                many_to_one_extras = {
-                    **input_type_meta.get("many_to_one_extras", {}),
-                    **data.get("many_to_one_extras", {}),
-                }
-                one_to_one_extras = {
-                    **input_type_meta.get("one_to_one_extras", {}),
-                    **data.get("one_to_one_extras", {}),
-                }
-                field_name_mappings = {
-                    **input_type_meta.get("field_name_mappings", {}),
-                    **data.get("field_name_mappings", {}),
-                }
-
                 if field_type == "auto":
                     # In this case, a new type has been created for us. Let's first find its name,
                     # then get its meta, and then create it. We also need to attach the obj as the
@@ -186,12 +510,12 @@ class DjangoCudBase(Mutation):
                     related_obj = cls.upsert_obj(
                         value,
                         info,
-                        auto_context_fields,
-                        many_to_many_extras,
-                        foreign_key_extras,
-                        many_to_one_extras,
-                        one_to_one_extras,
-                        field_name_mappings,
+                        input_type_meta.auto_context_fields,
+                        input_type_meta.many_to_many_extras,
+                        input_type_meta.foreign_key_extras,
+                        input_type_meta.many_to_one_extras,
+                        input_type_meta.one_to_one_extras,
+                        input_type_meta.field_name_mappings,
                         field.related_model,
                     )
                     results.append(related_obj)
@@ -200,12 +524,12 @@ class DjangoCudBase(Mutation):
                     related_obj = cls.create_obj(
                         value,
                         info,
-                        auto_context_fields,
-                        many_to_many_extras,
-                        foreign_key_extras,
-                        many_to_one_extras,
-                        one_to_one_extras,
-                        field_name_mappings,
+                        input_type_meta.auto_context_fields,
+                        input_type_meta.many_to_many_extras,
+                        input_type_meta.foreign_key_extras,
+                        input_type_meta.many_to_one_extras,
+                        input_type_meta.one_to_one_extras,
+                        input_type_meta.field_name_mappings,
                         field.related_model,
                     )
                     results.append(related_obj)
@@ -766,7 +1090,7 @@ class DjangoCudBase(Mutation):
         permissions = cls.get_permissions(root, info, *args, **kwargs)
 
         if permissions and len(permissions) > 0:
-            if not info.context.user.has_perms(permissions):
+            if not user_has_perms(info.context, permissions):
                 raise GraphQLError("Not permitted to access this mutation.")
 
     @classmethod
@@ -838,6 +1162,9 @@ class DjangoCudBaseOptions(MutationOptions):
     permissions = None
     login_required = None
 
+    transaction_max_attempts = None
+    retry_unsafe_hooks = None
+
     type_name = None
     return_field_name = None
 
@@ -3,9 +3,8 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
-from graphene import InputObjectType
 from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_snake_case
 from graphene_django.registry import get_global_registry
@@ -17,6 +16,8 @@ from graphene_django_cud.mutations.core import DjangoCudBase, DjangoCudBaseOptio
 from graphene_django_cud.registry import get_type_meta_registry
 from graphene_django_cud.signals import post_create_mutation
 from graphene_django_cud.util import get_input_fields_for_model, apply_field_name_mappings
+from graphene_django_cud.util.fingerprint import create_input_object_type
+from graphene_django_cud.util.lazy import create_input_type
 
 
 class DjangoCreateMutationOptions(DjangoCudBaseOptions):
@@ -53,6 +54,8 @@ class DjangoCreateMutation(DjangoCudBase):
         use_id_suffixes_for_fk=getattr(settings, USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY, None),
         use_id_suffixes_for_m2m=getattr(settings, USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY, None),
         field_name_mappings=None,
+        lazy_input_types=None,
+        reuse_input_types=None,
         **kwargs,
     ):
         registry = get_global_registry()
@@ -108,48 +111,54 @@ class DjangoCreateMutation(DjangoCudBase):
             get_model_fields(model), use_id_suffixes_for_fk, use_id_suffixes_for_m2m, field_name_mappings
         )
 
-        input_fields = get_input_fields_for_model(
-            model,
-            fields,
-            exclude,
-            tuple(auto_context_fields.keys()) + optional_fields,
-            required_fields,
-            many_to_many_extras,
-            foreign_key_extras,
-            many_to_one_extras,
-            one_to_one_extras=one_to_one_extras,
-            parent_type_name=input_type_name,
-            field_types=field_types,
-            ignore_primary_key=ignore_primary_key,
-            field_name_mappings=field_name_mappings,
-        )
+        def build_input_type():
+            input_fields = get_input_fields_for_model(
+                model,
+                fields,
+                exclude,
+                tuple(auto_context_fields.keys()) + optional_fields,
+                required_fields,
+                many_to_many_extras,
+                foreign_key_extras,
+                many_to_one_extras,
+                one_to_one_extras=one_to_one_extras,
+                parent_type_name=input_type_name,
+                field_types=field_types,
+                ignore_primary_key=ignore_primary_key,
+                field_name_mappings=field_name_mappings,
+                reuse_input_types=reuse_input_types,
+            )
 
-        for name, field in custom_fields.items():
-            input_fields[name] = field
-
-        InputType = type(input_type_name, (InputObjectType,), input_fields)
-
-        # Register meta-data
-        meta_registry.register(
-            input_type_name,
-            {
-                "auto_context_fields": auto_context_fields or {},
-                "optional_fields": optional_fields,
-                "required_fields": required_fields,
-                "many_to_many_extras": many_to_many_extras,
-                "many_to_one_extras": many_to_one_extras,
-                "foreign_key_extras": foreign_key_extras,
-                "one_to_one_extras": one_to_one_extras,
-                "field_types": field_types or {},
-                "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
-                "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
-                "field_name_mappings": field_name_mappings,
-            },
-        )
+            for name, field in custom_fields.items():
+                input_fields[name] = field
+
+            InputType = create_input_object_type(input_type_name, input_fields, reuse_input_types, model)
+
+            # Register meta-data
+            meta_registry.register(
+                input_type_name,
+                {
+                    "auto_context_fields": auto_context_fields or {},
+                    "optional_fields": optional_fields,
+                    "required_fields": required_fields,
+                    "many_to_many_extras": many_to_many_extras,
+                    "many_to_one_extras": many_to_one_extras,
+                    "foreign_key_extras": foreign_key_extras,
+                    "one_to_one_extras": one_to_one_extras,
+                    "field_types": field_types or {},
+                    "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
+                    "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
+                    "field_name_mappings": field_name_mappings,
+                },
+            )
 
-        registry.register_converted_field(input_type_name, InputType)
+            registry.register_converted_field(input_type_name, InputType)
 
-        arguments = OrderedDict(input=InputType(required=True))
+            return InputType
+
+        InputType = create_input_type(input_type_name, build_input_type, lazy_input_types)
+
+        arguments = OrderedDict(input=graphene.NonNull(InputType))
 
         output_fields = OrderedDict()
         output_fields[return_field_name] = graphene.Field(model_type)
@@ -203,6 +212,30 @@ class DjangoCreateMutation(DjangoCudBase):
     def validate(cls, root, info, input):
         return super().validate(root, info, input)
 
+    @classmethod
+    def perform_create(cls, root, info, input):
+        """Creates and saves the object. Runs inside the mutation transaction."""
+        Model = cls._meta.model
+        auto_context_fields = cls._meta.auto_context_fields or {}
+
+        obj = cls.create_obj(
+            input,
+            info,
+            auto_context_fields,
+            cls._meta.many_to_many_extras,
+            cls._meta.foreign_key_extras,
+            cls._meta.many_to_one_extras,
+            cls._meta.one_to_one_extras,
+            cls._meta.field_name_mappings,
+            Model,
+        )
+        updated_obj = cls.call_hook("before_save", root, info, input, obj)
+        if updated_obj:
+            updated_obj.save()
+            obj = updated_obj
+
+        return obj
+
     @classmethod
     def mutate(cls, root, info, input):
         updated_input = cls.before_mutate(root, info, input)
@@ -216,24 +249,7 @@ class DjangoCreateMutation(DjangoCudBase):
         cls.validate(root, info, input)
 
         Model = cls._meta.model
-        auto_context_fields = cls._meta.auto_context_fields or {}
-
-        with transaction.atomic():
-            obj = cls.create_obj(
-                input,
-                info,
-                auto_context_fields,
-                cls._meta.many_to_many_extras,
-                cls._meta.foreign_key_extras,
-                cls._meta.many_to_one_extras,
-                cls._meta.one_to_one_extras,
-                cls._meta.field_name_mappings,
-                Model,
-            )
-            updated_obj = cls.before_save(root, info, input, obj)
-            if updated_obj:
-                updated_obj.save()
-                obj = updated_obj
+        obj = cls.run_in_transaction(lambda: cls.perform_create(root, info, input))
 
         return_data = {cls._meta.return_field_name: obj}
         cls.after_mutate(root, info, input, obj, return_data)
@@ -241,3 +257,26 @@ class DjangoCreateMutation(DjangoCudBase):
         post_create_mutation.send(sender=Model, instance=obj)
 
         return cls(**return_data)
+
+    @classmethod
+    async def mutate_async(cls, root, info, input):
+        updated_input = await cls.call_hook_async("before_mutate", root, info, input)
+        if updated_input:
+            input = updated_input
+
+        await cls.check_login_required_async(info)
+
+        await cls.call_hook_async("check_permissions", root, info, input)
+        await cls.call_hook_async("validate", root, info, input)
+
+        Model = cls._meta.model
+
+        # Django transactions are bound to a thread, so the transaction runs in a single thread.
+        obj = await sync_to_async(cls.run_in_transaction)(lambda: cls.perform_create(root, info, input))
+
+        return_data = {cls._meta.return_field_name: obj}
+        await cls.call_hook_async("after_mutate", root, info, input, obj, return_data)
+
+        await post_create_mutation.asend(sender=Model, instance=obj)
+
+        return cls(**return_data)
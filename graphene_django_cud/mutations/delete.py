@@ -11,7 +11,7 @@ from graphene_django.registry import get_global_registry
 from graphql import GraphQLError
 from graphql_relay import to_global_id
 
-from graphene_django_cud.mutations.core import DjangoCudBase
+from graphene_django_cud.mutations.core import DjangoCudBase, is_library_method
 from graphene_django_cud.signals import post_delete_mutation
 
 
@@ -144,3 +144,43 @@ class DjangoDeleteMutation(DjangoCudBase):
         except ObjectDoesNotExist:
             cls.after_mutate(root, info, id, False)
             return cls(found=False)
+
+    @classmethod
+    async def mutate_async(cls, root, info, id):
+        await cls.call_hook_async("before_mutate", root, info, id)
+
+        await cls.check_login_required_async(info)
+
+        await cls.call_hook_async("validate", root, info, id)
+
+        resolved_id = cls.resolve_id(id)
+
+        try:
+            obj = await cls.get_queryset(root, info, id).aget(pk=resolved_id)
+            await cls.call_hook_async("check_permissions", root, info, id, obj)
+
+            updated_obj = await cls.call_hook_async("before_save", root, info, id, obj)
+            if updated_obj:
+                obj = updated_obj
+
+            return_id = cls.get_return_id(obj)
+            raw_id = obj.pk
+
+            if is_library_method(cls, "perform_delete"):
+                await obj.adelete()
+            else:
+                await cls.call_hook_async("perform_delete", obj)
+
+            await cls.call_hook_async("after_mutate", root, info, id, True)
+
+            await post_delete_mutation.asend(sender=cls._meta.model, id=return_id, raw_id=raw_id, deleted_input_id=id)
+
+            return cls(
+                found=True,
+                deleted_raw_id=raw_id,
+                deleted_id=return_id,
+                deleted_input_id=id,
+            )
+        except ObjectDoesNotExist:
+            await cls.call_hook_async("after_mutate", root, info, id, False)
+            return cls(found=False)
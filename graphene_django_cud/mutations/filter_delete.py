@@ -2,8 +2,6 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
-from django.core.exceptions import FieldDoesNotExist
-from django.db import models
 from graphene import InputObjectType
 from graphene.types.mutation import MutationOptions
 from graphene.types.utils import yank_fields_from_attrs
@@ -13,6 +11,7 @@ from graphql_relay import to_global_id
 
 from graphene_django_cud.mutations.core import DjangoCudBase
 from graphene_django_cud.signals import post_filter_update_mutation, post_filter_delete_mutation
+from graphene_django_cud.util.cost import MutationCost, get_filter_row_bound
 from graphene_django_cud.util import get_filter_fields_input_args
 
 
@@ -95,6 +94,13 @@ class DjangoFilterDeleteMutation(DjangoCudBase):
     def validate(cls, root, info, input, id, obj):
         return super().validate(root, info, input)
 
+    @classmethod
+    def estimate_cost(cls, root, info, **arguments):
+        # Selecting and deleting the filtered objects. Unless the filter is on ids (or other unique fields), any
+        # number of objects may match, and the rows are unbounded.
+        rows = get_filter_row_bound(arguments.get("input") or {}, cls._meta.model)
+        return MutationCost(statements=2, rows=rows)
+
     @classmethod
     def mutate(cls, root, info, input):
         updated_input = cls.before_mutate(root, info, input)
@@ -108,51 +114,7 @@ class DjangoFilterDeleteMutation(DjangoCudBase):
         cls.check_permissions(root, info, input)
 
         Model = cls._meta.model
-        model_field_values = {}
-
-        for name, value in super(type(input), input).items():
-            filter_field_split = name.split("__", 1)
-            field_name = filter_field_split[0]
-
-            try:
-                field = Model._meta.get_field(field_name)
-            except FieldDoesNotExist:
-                # This can happen with nested selectors. In this case we set the field to none.
-                field = None
-
-            filter_field_is_list = False
-
-            if len(filter_field_split) > 1:
-                # If we have an "__in" final part of the filter, we are now dealing with
-                # a list of things. Note that all other variants can be coerced directly
-                # on the filter-call, so we don't really have to deal with other cases.
-                filter_field_is_list = filter_field_split[-1] == "in"
-
-            new_value = value
-
-            value_handle_name = "handle_" + name
-            if hasattr(cls, value_handle_name):
-                handle_func = getattr(cls, value_handle_name)
-                assert callable(handle_func), f"Property {value_handle_name} on {cls.__name__} is not a function."
-                new_value = handle_func(value, name, info)
-
-            # On some fields we perform some default conversion, if the value was not transformed above.
-            if new_value == value and value is not None:
-                if type(field) in (models.ForeignKey, models.OneToOneField):
-                    name = getattr(field, "db_column", None) or name + "_id"
-                    new_value = cls.resolve_id(value)
-                elif (
-                    type(field)
-                    in (
-                        models.ManyToManyField,
-                        models.ManyToManyRel,
-                        models.ManyToOneRel,
-                    )
-                    or filter_field_is_list
-                ):
-                    new_value = cls.resolve_ids(value)
-
-            model_field_values[name] = new_value
+        model_field_values = cls.resolve_filter_values(info, input)
 
         filter_qs = cls.get_queryset(root, info, input).filter(**model_field_values)
         updated_qs = cls.before_save(root, info, filter_qs)
@@ -171,3 +133,33 @@ class DjangoFilterDeleteMutation(DjangoCudBase):
         post_filter_delete_mutation.send(sender=Model, ids=ids)
 
         return cls(deletion_count=deletion_count, deleted_ids=ids)
+
+    @classmethod
+    async def mutate_async(cls, root, info, input):
+        updated_input = await cls.call_hook_async("before_mutate", root, info, input)
+
+        if updated_input:
+            input = updated_input
+
+        await cls.check_login_required_async(info)
+
+        await cls.call_hook_async("check_permissions", root, info, input)
+
+        Model = cls._meta.model
+        model_field_values = await cls.resolve_filter_values_async(info, input)
+
+        filter_qs = cls.get_queryset(root, info, input).filter(**model_field_values)
+        updated_qs = await cls.call_hook_async("before_save", root, info, filter_qs)
+
+        if updated_qs:
+            filter_qs = updated_qs
+
+        type_name = get_global_registry().get_type_for_model(Model).__name__
+        ids = [to_global_id(type_name, id) async for id in filter_qs.values_list("id", flat=True)]
+
+        deletion_count, _ = await filter_qs.adelete()
+
+        await cls.call_hook_async("after_mutate", root, info, input, deletion_count, ids)
+        await post_filter_delete_mutation.asend(sender=Model, ids=ids)
+
+        return cls(deletion_count=deletion_count, deleted_ids=ids)
@@ -3,8 +3,6 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
-from django.core.exceptions import FieldDoesNotExist
-from django.db import models
 from graphene import InputObjectType
 from graphene.types.mutation import MutationOptions
 from graphene.types.utils import yank_fields_from_attrs
@@ -14,6 +12,7 @@ from graphql import GraphQLError
 
 from graphene_django_cud.mutations.core import DjangoCudBase, meta_registry
 from graphene_django_cud.signals import post_filter_update_mutation
+from graphene_django_cud.util.cost import MutationCost, get_filter_row_bound
 from graphene_django_cud.util import (
     get_filter_fields_input_args,
     get_input_fields_for_model,
@@ -171,6 +170,13 @@ class DjangoFilterUpdateMutation(DjangoCudBase):
     def validate(cls, root, info, filter, data):
         return super().validate(root, info, filter, data)
 
+    @classmethod
+    def estimate_cost(cls, root, info, **arguments):
+        # Selecting and updating the filtered objects. Unless the filter is on ids (or other unique fields), any
+        # number of objects may match, and the rows are unbounded.
+        rows = get_filter_row_bound(arguments.get("filter") or {}, cls._meta.model)
+        return MutationCost(statements=2, rows=rows)
+
     @classmethod
     def mutate(cls, root, info, filter, data):
         updated = cls.before_mutate(root, info, filter, data)
@@ -185,51 +191,7 @@ class DjangoFilterUpdateMutation(DjangoCudBase):
         cls.validate(root, info, filter, data)
 
         Model = cls._meta.model
-        model_field_values = {}
-
-        for name, value in super(type(filter), filter).items():
-            filter_field_split = name.split("__", 1)
-            field_name = filter_field_split[0]
-
-            try:
-                field = Model._meta.get_field(field_name)
-            except FieldDoesNotExist:
-                # This can happen with nested selectors. In this case we set the field to none.
-                field = None
-
-            filter_field_is_list = False
-
-            if len(filter_field_split) > 1:
-                # If we have an "__in" final part of the filter, we are now dealing with
-                # a list of things. Note that all other variants can be coerced directly
-                # on the filter-call, so we don't really have to deal with other cases.
-                filter_field_is_list = filter_field_split[-1] == "in"
-
-            new_value = value
-
-            value_handle_name = "handle_" + name
-            if hasattr(cls, value_handle_name):
-                handle_func = getattr(cls, value_handle_name)
-                assert callable(handle_func), f"Property {value_handle_name} on {cls.__name__} is not a function."
-                new_value = handle_func(value, name, info)
-
-            # On some fields we perform some default conversion, if the value was not transformed above.
-            if new_value == value and value is not None:
-                if type(field) in (models.ForeignKey, models.OneToOneField):
-                    name = getattr(field, "db_column", None) or name + "_id"
-                    new_value = cls.resolve_id(value)
-                elif (
-                    type(field)
-                    in (
-                        models.ManyToManyField,
-                        models.ManyToManyRel,
-                        models.ManyToOneRel,
-                    )
-                    or filter_field_is_list
-                ):
-                    new_value = cls.resolve_ids(value)
-
-            model_field_values[name] = new_value
+        model_field_values = cls.resolve_filter_values(info, filter)
 
         filter_qs = cls.get_queryset(root, info, filter, data).filter(**model_field_values)
         updated_qs = cls.before_save(root, info, filter_qs, filter, data)
@@ -243,3 +205,34 @@ class DjangoFilterUpdateMutation(DjangoCudBase):
         post_filter_update_mutation.send(sender=Model, instances=filter_qs, data=data)
 
         return cls(updated_objects=filter_qs, updated_count=filter_qs.count())
+
+    @classmethod
+    async def mutate_async(cls, root, info, filter, data):
+        updated = await cls.call_hook_async("before_mutate", root, info, filter, data)
+
+        if updated:
+            filter, data = updated
+
+        await cls.check_login_required_async(info)
+
+        await cls.call_hook_async("check_permissions", root, info, filter, data)
+        await cls.call_hook_async("validate", root, info, filter, data)
+
+        Model = cls._meta.model
+        model_field_values = await cls.resolve_filter_values_async(info, filter)
+
+        filter_qs = cls.get_queryset(root, info, filter, data).filter(**model_field_values)
+        updated_qs = await cls.call_hook_async("before_save", root, info, filter_qs, filter, data)
+
+        if updated_qs:
+            filter_qs = updated_qs
+
+        await filter_qs.aupdate(**data)
+
+        await cls.call_hook_async("after_mutate", root, info, filter, data, filter_qs)
+        await post_filter_update_mutation.asend(sender=Model, instances=filter_qs, data=data)
+
+        # The queryset is evaluated here, as it cannot be evaluated lazily in an async context.
+        updated_objects = [obj async for obj in filter_qs]
+
+        return cls(updated_objects=updated_objects, updated_count=len(updated_objects))
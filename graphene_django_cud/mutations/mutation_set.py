@@ -0,0 +1,168 @@
+from collections import OrderedDict
+
+from graphene.types.base import BaseOptions
+from graphene.utils.subclass_with_meta import SubclassWithMeta
+
+from graphene_django_cud.mutations.batch_create import DjangoBatchCreateMutation
+from graphene_django_cud.mutations.batch_delete import DjangoBatchDeleteMutation
+from graphene_django_cud.mutations.batch_patch import DjangoBatchPatchMutation
+from graphene_django_cud.mutations.batch_update import DjangoBatchUpdateMutation
+from graphene_django_cud.mutations.create import DjangoCreateMutation
+from graphene_django_cud.mutations.delete import DjangoDeleteMutation
+from graphene_django_cud.mutations.filter_delete import DjangoFilterDeleteMutation
+from graphene_django_cud.mutations.filter_update import DjangoFilterUpdateMutation
+from graphene_django_cud.mutations.patch import DjangoPatchMutation
+from graphene_django_cud.mutations.update import DjangoUpdateMutation
+from graphene_django_cud.util.lazy import is_lazy_input_type
+from graphene_django_cud.util.string import to_snake_case
+
+# The mutations a set can generate, by operation, in the order they are generated.
+OPERATIONS = OrderedDict(
+    create=DjangoCreateMutation,
+    update=DjangoUpdateMutation,
+    patch=DjangoPatchMutation,
+    delete=DjangoDeleteMutation,
+    batch_create=DjangoBatchCreateMutation,
+    batch_update=DjangoBatchUpdateMutation,
+    batch_patch=DjangoBatchPatchMutation,
+    batch_delete=DjangoBatchDeleteMutation,
+    filter_update=DjangoFilterUpdateMutation,
+    filter_delete=DjangoFilterDeleteMutation,
+)
+
+DEFAULT_OPERATIONS = ("create", "update", "patch", "delete")
+
+# The operations which take an input object, and the options describing it. These options are only passed to
+# these operations, all other options are passed to every operation.
+INPUT_OPERATIONS = ("create", "update", "patch", "batch_create", "batch_update", "batch_patch")
+INPUT_OPTIONS = (
+    "fields",
+    "exclude",
+    "optional_fields",
+    "required_fields",
+    "auto_context_fields",
+    "many_to_many_extras",
+    "foreign_key_extras",
+    "many_to_one_extras",
+    "one_to_one_extras",
+    "field_types",
+    "custom_fields",
+    "use_id_suffixes_for_fk",
+    "use_id_suffixes_for_m2m",
+    "field_name_mappings",
+    "lazy_input_types",
+    "reuse_input_types",
+)
+
+# The operations whose input object is the same as the one of another operation, and which share its input type.
+SHARED_INPUT_OPERATIONS = {"update": "create", "batch_create": "create"}
+
+# The operations taking a `type_name` option, which the set names after its prefix to avoid clashes.
+TYPE_NAME_OPERATIONS = INPUT_OPERATIONS + ("filter_update",)
+
+# The options naming or guarding a single mutation. Passing them to every operation would create clashing type names
+# or apply e.g. the permissions of the create mutation to the delete mutation, so they are only accepted per operation.
+OPERATION_ONLY_OPTIONS = ("type_name", "use_type_name", "return_field_name", "permissions")
+
+
+class DjangoCudMutationSetOptions(BaseOptions):
+    model = None
+    name_prefix = None
+    mutations = None
+
+
+class DjangoCudMutationSet(SubclassWithMeta):
+    """
+    Generates the mutations of `operations` for `model` from a single Meta. The generated mutation classes are
+    available as attributes named by operation, e.g. `DogMutations.create`, and as fields with `get_fields`. They are
+    named after `name_prefix`, which defaults to the name of the set, e.g. `DogMutationsCreate`.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls,
+        _meta=None,
+        model=None,
+        name_prefix=None,
+        operations=DEFAULT_OPERATIONS,
+        operation_options=None,
+        **options,
+    ):
+        if model is None:
+            raise ValueError(f"The mutation set {cls.__name__} must have a model")
+
+        name_prefix = name_prefix or cls.__name__
+        operation_options = operation_options or {}
+
+        for operation in tuple(operations) + tuple(operation_options):
+            if operation not in OPERATIONS:
+                raise ValueError(f"Unknown operation {operation} in mutation set {cls.__name__}")
+
+        for name in OPERATION_ONLY_OPTIONS:
+            if name in options:
+                raise ValueError(
+                    f"The option {name} of mutation set {cls.__name__} must be given per operation, "
+                    f"in operation_options"
+                )
+
+        shared_options = {name: value for name, value in options.items() if name not in INPUT_OPTIONS}
+        input_options = {name: value for name, value in options.items() if name in INPUT_OPTIONS}
+
+        # Operations with different input objects, e.g. patch, where no field is required, still take the same nested
+        # input objects, whose types are shared between them.
+        input_options.setdefault("reuse_input_types", True)
+
+        mutations = OrderedDict()
+        for operation, base in OPERATIONS.items():
+            if operation not in operations:
+                continue
+
+            meta = dict(shared_options, model=model)
+            if operation in INPUT_OPERATIONS:
+                meta.update(input_options)
+
+            name = name_prefix + "".join(part.capitalize() for part in operation.split("_"))
+            if operation in TYPE_NAME_OPERATIONS:
+                meta["type_name"] = f"{name}Input"
+
+            # The update and batch create mutations take the same input objects as the create mutation, so they share
+            # its input type instead of converting the fields and creating an identical type again. Lazy input types
+            # are not looked up here, as that would build them.
+            source = mutations.get(SHARED_INPUT_OPERATIONS.get(operation))
+            if (
+                source is not None
+                and operation not in operation_options
+                and SHARED_INPUT_OPERATIONS[operation] not in operation_options
+                and not is_lazy_input_type(source._meta.InputType)
+            ):
+                meta["use_type_name"] = source._meta.input_type_name
+                meta["field_name_mappings"] = source._meta.field_name_mappings
+
+            meta.update(operation_options.get(operation, {}))
+
+            mutations[operation] = type(name, (base,), {"Meta": type("Meta", (), meta), "__module__": cls.__module__})
+
+        if _meta is None:
+            _meta = DjangoCudMutationSetOptions(cls)
+
+        _meta.model = model
+        _meta.name_prefix = name_prefix
+        _meta.mutations = mutations
+        _meta.freeze()
+
+        cls._meta = _meta
+        for operation, mutation in mutations.items():
+            setattr(cls, operation, mutation)
+
+        super().__init_subclass_with_meta__()
+
+    @classmethod
+    def get_fields(cls):
+        """Returns the fields of the generated mutations, named e.g. `create_dog` and `batch_delete_dog`."""
+        model_name = to_snake_case(cls._meta.model.__name__)
+        return OrderedDict(
+            (f"{operation}_{model_name}", mutation.Field()) for operation, mutation in cls._meta.mutations.items()
+        )
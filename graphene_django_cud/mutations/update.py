@@ -3,9 +3,8 @@ from collections import OrderedDict
 from typing import Iterable
 
 import graphene
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
-from graphene import InputObjectType
 from graphene.types.utils import yank_fields_from_attrs
 from graphene_django.registry import get_global_registry
 from graphene_django.utils import get_model_fields
@@ -15,11 +14,19 @@ from graphene_django_cud.consts import USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY, USE_
 from graphene_django_cud.mutations.core import DjangoCudBaseOptions, DjangoCudBase
 from graphene_django_cud.registry import get_type_meta_registry
 from graphene_django_cud.signals import post_update_mutation
-from graphene_django_cud.util import get_input_fields_for_model, to_snake_case, apply_field_name_mappings
+from graphene_django_cud.util import (
+    apply_field_name_mappings,
+    get_changed_fields,
+    get_field_values,
+    get_input_fields_for_model,
+    to_snake_case,
+)
+from graphene_django_cud.util.fingerprint import create_input_object_type
+from graphene_django_cud.util.lazy import create_input_type, get_input_type
 
 
 class DjangoUpdateMutationOptions(DjangoCudBaseOptions):
-    pass
+    use_type_name = None
 
 
 class DjangoUpdateMutation(DjangoCudBase):
@@ -46,12 +53,15 @@ class DjangoUpdateMutation(DjangoCudBase):
         many_to_one_extras=None,
         one_to_one_extras=None,
         type_name=None,
+        use_type_name=None,
         field_types=None,
         custom_fields=None,
         use_id_suffixes_for_fk=getattr(settings, USE_ID_SUFFIXES_FOR_FK_SETTINGS_KEY, None),
         use_id_suffixes_for_m2m=getattr(settings, USE_ID_SUFFIXES_FOR_M2M_SETTINGS_KEY, None),
         field_name_mappings=None,
         use_select_for_update=True,
+        lazy_input_types=None,
+        reuse_input_types=None,
         **kwargs,
     ):
         registry = get_global_registry()
@@ -98,53 +108,65 @@ class DjangoUpdateMutation(DjangoCudBase):
                 DeprecationWarning,
             )
 
-        input_type_name = type_name or f"Update{model.__name__}Input"
+        if use_type_name:
+            input_type_name = use_type_name
+            InputType = get_input_type(input_type_name)
+            if not InputType:
+                raise GraphQLError(f"Could not find input type with name {input_type_name}")
+        else:
+            input_type_name = type_name or f"Update{model.__name__}Input"
 
-        field_name_mappings = apply_field_name_mappings(
-            get_model_fields(model), use_id_suffixes_for_fk, use_id_suffixes_for_m2m, field_name_mappings
-        )
-
-        input_fields = get_input_fields_for_model(
-            model,
-            fields,
-            exclude,
-            optional_fields=tuple(auto_context_fields.keys()) + optional_fields,
-            required_fields=required_fields,
-            many_to_many_extras=many_to_many_extras,
-            foreign_key_extras=foreign_key_extras,
-            many_to_one_extras=many_to_one_extras,
-            one_to_one_extras=one_to_one_extras,
-            parent_type_name=input_type_name,
-            field_types=field_types,
-            field_name_mappings=field_name_mappings,
-        )
-
-        for name, field in custom_fields.items():
-            input_fields[name] = field
-
-        InputType = type(input_type_name, (InputObjectType,), input_fields)
-
-        # Register meta-data
-        meta_registry.register(
-            input_type_name,
-            {
-                "auto_context_fields": auto_context_fields or {},
-                "optional_fields": optional_fields,
-                "required_fields": required_fields,
-                "many_to_many_extras": many_to_many_extras,
-                "many_to_one_extras": many_to_one_extras,
-                "foreign_key_extras": foreign_key_extras,
-                "one_to_one_extras": one_to_one_extras,
-                "field_types": field_types or {},
-                "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
-                "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
-                "field_name_mappings": field_name_mappings,
-            },
-        )
-
-        registry.register_converted_field(input_type_name, InputType)
+            field_name_mappings = apply_field_name_mappings(
+                get_model_fields(model), use_id_suffixes_for_fk, use_id_suffixes_for_m2m, field_name_mappings
+            )
 
-        arguments = OrderedDict(id=graphene.ID(required=True), input=InputType(required=True))
+            def build_input_type():
+                input_fields = get_input_fields_for_model(
+                    model,
+                    fields,
+                    exclude,
+                    optional_fields=tuple(auto_context_fields.keys()) + optional_fields,
+                    required_fields=required_fields,
+                    many_to_many_extras=many_to_many_extras,
+                    foreign_key_extras=foreign_key_extras,
+                    many_to_one_extras=many_to_one_extras,
+                    one_to_one_extras=one_to_one_extras,
+                    parent_type_name=input_type_name,
+                    field_types=field_types,
+                    field_name_mappings=field_name_mappings,
+                    reuse_input_types=reuse_input_types,
+                )
+
+                for name, field in custom_fields.items():
+                    input_fields[name] = field
+
+                InputType = create_input_object_type(input_type_name, input_fields, reuse_input_types, model)
+
+                # Register meta-data
+                meta_registry.register(
+                    input_type_name,
+                    {
+                        "auto_context_fields": auto_context_fields or {},
+                        "optional_fields": optional_fields,
+                        "required_fields": required_fields,
+                        "many_to_many_extras": many_to_many_extras,
+                        "many_to_one_extras": many_to_one_extras,
+                        "foreign_key_extras": foreign_key_extras,
+                        "one_to_one_extras": one_to_one_extras,
+                        "field_types": field_types or {},
+                        "use_id_suffixes_for_fk": use_id_suffixes_for_fk,
+                        "use_id_suffixes_for_m2m": use_id_suffixes_for_m2m,
+                        "field_name_mappings": field_name_mappings,
+                    },
+                )
+
+                registry.register_converted_field(input_type_name, InputType)
+
+                return InputType
+
+            InputType = create_input_type(input_type_name, build_input_type, lazy_input_types)
+
+        arguments = OrderedDict(id=graphene.ID(required=True), input=graphene.NonNull(InputType))
 
         output_fields = OrderedDict()
         output_fields[return_field_name] = graphene.Field(model_type)
@@ -204,6 +226,49 @@ class DjangoUpdateMutation(DjangoCudBase):
     def validate(cls, root, info, input, id, obj):
         return super().validate(root, info, input, id, obj)
 
+    @classmethod
+    def perform_update(cls, root, info, input, id):
+        """
+        Fetches, updates and saves the object. Runs inside the mutation transaction. Returns the object,
+        and its changed fields (see `get_changed_fields`).
+        """
+        Model = cls._meta.model
+        queryset = cls.get_queryset(root, info, input, id)
+
+        if cls._meta.use_select_for_update:
+            queryset = queryset.select_for_update()
+
+        obj = queryset.get(pk=id)
+        auto_context_fields = cls._meta.auto_context_fields or {}
+
+        cls.check_permissions(root, info, input, id, obj)
+
+        cls.call_hook("validate", root, info, input, id, obj)
+
+        old_values = get_field_values(obj)
+
+        obj = cls.update_obj(
+            obj,
+            input,
+            info,
+            auto_context_fields,
+            cls._meta.many_to_many_extras,
+            cls._meta.foreign_key_extras,
+            cls._meta.many_to_one_extras,
+            cls._meta.one_to_one_extras,
+            cls._meta.field_name_mappings,
+            Model,
+        )
+
+        updated_obj = cls.call_hook("before_save", root, info, input, id, obj)
+
+        if updated_obj:
+            obj = updated_obj
+
+        obj.save()
+
+        return obj, get_changed_fields(old_values, obj)
+
     @classmethod
     def mutate(cls, root, info, input, id):
         updated_input = cls.before_mutate(root, info, input, id)
@@ -213,44 +278,36 @@ class DjangoUpdateMutation(DjangoCudBase):
         if cls._meta.login_required and not info.context.user.is_authenticated:
             raise GraphQLError("Must be logged in to access this mutation.")
 
-        with transaction.atomic():
-            id = cls.resolve_id(id)
-            Model = cls._meta.model
-            queryset = cls.get_queryset(root, info, input, id)
-
-            if cls._meta.use_select_for_update:
-                queryset = queryset.select_for_update()
+        id = cls.resolve_id(id)
+        Model = cls._meta.model
+        obj, changed_fields = cls.run_in_transaction(lambda: cls.perform_update(root, info, input, id))
 
-            obj = queryset.get(pk=id)
-            auto_context_fields = cls._meta.auto_context_fields or {}
+        return_data = {cls._meta.return_field_name: obj}
+        cls.after_mutate(root, info, id, input, obj, return_data)
 
-            cls.check_permissions(root, info, input, id, obj)
+        post_update_mutation.send(sender=Model, instance=obj, changed_fields=changed_fields)
 
-            cls.validate(root, info, input, id, obj)
+        return cls(**return_data)
 
-            obj = cls.update_obj(
-                obj,
-                input,
-                info,
-                auto_context_fields,
-                cls._meta.many_to_many_extras,
-                cls._meta.foreign_key_extras,
-                cls._meta.many_to_one_extras,
-                cls._meta.one_to_one_extras,
-                cls._meta.field_name_mappings,
-                Model,
-            )
+    @classmethod
+    async def mutate_async(cls, root, info, input, id):
+        updated_input = await cls.call_hook_async("before_mutate", root, info, input, id)
+        if updated_input:
+            input = updated_input
 
-            updated_obj = cls.before_save(root, info, input, id, obj)
+        await cls.check_login_required_async(info)
 
-            if updated_obj:
-                obj = updated_obj
+        id = cls.resolve_id(id)
+        Model = cls._meta.model
 
-            obj.save()
+        # Django transactions are bound to a thread, so the transaction runs in a single thread.
+        obj, changed_fields = await sync_to_async(cls.run_in_transaction)(
+            lambda: cls.perform_update(root, info, input, id)
+        )
 
         return_data = {cls._meta.return_field_name: obj}
-        cls.after_mutate(root, info, id, input, obj, return_data)
+        await cls.call_hook_async("after_mutate", root, info, id, input, obj, return_data)
 
-        post_update_mutation.send(sender=Model, instance=obj)
+        await post_update_mutation.asend(sender=Model, instance=obj, changed_fields=changed_fields)
 
         return cls(**return_data)
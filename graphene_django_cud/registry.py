@@ -1,5 +1,155 @@
+import functools
+
 from graphene_django.registry import Registry
 
+# The number of merged type metas which are kept, see `TypeMeta.merge`.
+MERGED_TYPE_META_CACHE_SIZE = 1024
+
+
+class TypeMeta:
+    """
+    The meta-data of an input type, as registered in the `TypeMetaRegistry`. Type metas are immutable, and are shared
+    by all mutations using the input type.
+    """
+
+    # The extras and mappings which are merged with the extras of a parent type, see `merge`.
+    MERGED_KEYS = (
+        "auto_context_fields",
+        "many_to_many_extras",
+        "foreign_key_extras",
+        "many_to_one_extras",
+        "one_to_one_extras",
+        "field_name_mappings",
+    )
+    KEYS = MERGED_KEYS + (
+        "optional_fields",
+        "required_fields",
+        "field_types",
+        "use_id_suffixes_for_fk",
+        "use_id_suffixes_for_m2m",
+    )
+
+    __slots__ = KEYS
+
+    def __init__(
+        self,
+        auto_context_fields=None,
+        many_to_many_extras=None,
+        foreign_key_extras=None,
+        many_to_one_extras=None,
+        one_to_one_extras=None,
+        field_name_mappings=None,
+        optional_fields=(),
+        required_fields=(),
+        field_types=None,
+        use_id_suffixes_for_fk=None,
+        use_id_suffixes_for_m2m=None,
+    ):
+        set_attr = super().__setattr__
+        set_attr("auto_context_fields", auto_context_fields or {})
+        set_attr("many_to_many_extras", many_to_many_extras or {})
+        set_attr("foreign_key_extras", foreign_key_extras or {})
+        set_attr("many_to_one_extras", many_to_one_extras or {})
+        set_attr("one_to_one_extras", one_to_one_extras or {})
+        set_attr("field_name_mappings", field_name_mappings or {})
+        set_attr("optional_fields", optional_fields or ())
+        set_attr("required_fields", required_fields or ())
+        set_attr("field_types", field_types or {})
+        set_attr("use_id_suffixes_for_fk", use_id_suffixes_for_fk)
+        set_attr("use_id_suffixes_for_m2m", use_id_suffixes_for_m2m)
+
+    @classmethod
+    def from_dict(cls, meta):
+        """Creates the type meta from a dict, e.g. the extras of a nested field. Other keys are ignored."""
+        return cls(**{key: meta[key] for key in cls.KEYS if key in meta})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{key}={getattr(self, key)!r}' for key in self.KEYS)})"
+
+    def get(self, key, default=None):
+        """Returns the meta-data `key`, like the dicts which were registered before type metas."""
+        return getattr(self, key) if key in self.KEYS else default
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def merge(self, extras):
+        """
+        Returns the type meta with the extras of the `extras` dict (e.g. the many to many extras of a parent type for
+        this type) taking precedence. The result is cached by the contents of the extras, see `_merge_type_meta`.
+        """
+        if not extras or not any(key in extras for key in self.MERGED_KEYS):
+            return self
+
+        try:
+            frozen_extras = _FrozenExtras(extras, self.MERGED_KEYS)
+        except TypeError:
+            # Extras with unhashable values are merged every time.
+            return self._merge(extras)
+
+        return _merge_type_meta(self, frozen_extras)
+
+    def _merge(self, extras):
+        return TypeMeta(
+            **{key: {**getattr(self, key), **extras.get(key, {})} for key in self.MERGED_KEYS},
+            optional_fields=self.optional_fields,
+            required_fields=self.required_fields,
+            field_types=self.field_types,
+            use_id_suffixes_for_fk=self.use_id_suffixes_for_fk,
+            use_id_suffixes_for_m2m=self.use_id_suffixes_for_m2m,
+        )
+
+
+def _freeze(value):
+    """Returns a hashable form of `value`, freezing dicts, lists, tuples and sets recursively."""
+    if isinstance(value, dict):
+        return dict, tuple((key, _freeze(item)) for key, item in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return tuple, tuple(_freeze(item) for item in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(_freeze(item) for item in value)
+
+    return value
+
+
+class _FrozenExtras:
+    """
+    The `keys` of an extras dict, hashed and compared by their contents. Raises `TypeError` if a value is unhashable.
+    """
+
+    __slots__ = ("extras", "frozen", "hash")
+
+    def __init__(self, extras, keys):
+        self.extras = extras
+        self.frozen = _freeze({key: extras[key] for key in keys if key in extras})
+        self.hash = hash(self.frozen)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return isinstance(other, _FrozenExtras) and self.frozen == other.frozen
+
+
+@functools.lru_cache(maxsize=MERGED_TYPE_META_CACHE_SIZE)
+def _merge_type_meta(type_meta, frozen_extras):
+    """Merges `type_meta` with the extras, once for each type meta and extras contents."""
+    return type_meta._merge(frozen_extras.extras)
+
+
+EMPTY_TYPE_META = TypeMeta()
+
 
 class TypeMetaRegistry:
     """
@@ -10,9 +160,13 @@ class TypeMetaRegistry:
 
     def __init__(self):
         self._registry = {}
+        self._input_types_by_fingerprint = {}
 
     def register(self, type, meta):
-        assert isinstance(meta, dict)
+        assert isinstance(meta, (dict, TypeMeta))
+
+        if isinstance(meta, dict):
+            meta = TypeMeta.from_dict(meta)
 
         if isinstance(type, str):
             self._registry[type] = meta
@@ -24,9 +178,16 @@ class TypeMetaRegistry:
 
     def get_meta_for_type(self, type):
         if isinstance(type, str):
-            return self._registry.get(type, {})
+            return self._registry.get(type, EMPTY_TYPE_META)
         else:
-            return self._registry.get(type.__name__, {})
+            return self._registry.get(type.__name__, EMPTY_TYPE_META)
+
+    def register_input_type_fingerprint(self, fingerprint, input_type):
+        """Registers an input type by the fingerprint of its fields, see `create_input_object_type`."""
+        self._input_types_by_fingerprint.setdefault(fingerprint, input_type)
+
+    def get_input_type_for_fingerprint(self, fingerprint):
+        return self._input_types_by_fingerprint.get(fingerprint)
 
 
 input_type_registry = None
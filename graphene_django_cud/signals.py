@@ -1,12 +1,96 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.dispatch import Signal
 
-post_create_mutation = Signal()
-post_update_mutation = Signal()
-post_delete_mutation = Signal()
+from graphene_django_cud.consts import DEFER_SIGNALS_UNTIL_COMMIT_SETTINGS_KEY
 
-post_batch_create_mutation = Signal()
-post_batch_update_mutation = Signal()
-post_batch_delete_mutation = Signal()
 
-post_filter_update_mutation = Signal()
-post_filter_delete_mutation = Signal()
+class _DeferredSignalBatch:
+    """
+    Signal sends queued within one transaction (and savepoint), dispatched in order by a single
+    `on_commit` callback.
+    """
+
+    def __init__(self, savepoint_ids):
+        self.savepoint_ids = savepoint_ids
+        self.sends = []
+
+    def __call__(self):
+        for signal, robust, sender, named in self.sends:
+            if robust:
+                Signal.send_robust(signal, sender=sender, **named)
+            else:
+                Signal.send(signal, sender=sender, **named)
+
+
+class MutationSignal(Signal):
+    """
+    A signal which, if `GRAPHENE_DJANGO_CUD_DEFER_SIGNALS_UNTIL_COMMIT` is set, is not sent until
+    the current transaction commits, and not at all if it is rolled back. Outside of a transaction,
+    the signal is sent immediately.
+
+    All sends within one transaction are coalesced into a single `on_commit` callback. A deferred
+    send returns an empty list, as the receivers have not been called yet.
+    """
+
+    @staticmethod
+    def should_defer(using=DEFAULT_DB_ALIAS):
+        return getattr(settings, DEFER_SIGNALS_UNTIL_COMMIT_SETTINGS_KEY, False) and connections[using].in_atomic_block
+
+    def defer(self, robust, sender, named, using=DEFAULT_DB_ALIAS):
+        connection = connections[using]
+        savepoint_ids = tuple(connection.savepoint_ids)
+
+        # Only the most recent batch is reused, so that the signals are dispatched in the order they
+        # were sent. A batch whose callback is no longer pending was either dispatched or discarded by
+        # a savepoint rollback.
+        batch = getattr(connection, "_graphene_django_cud_signal_batch", None)
+        if (
+            batch is None
+            or batch.savepoint_ids != savepoint_ids
+            or not any(func is batch for _, func, _ in connection.run_on_commit)
+        ):
+            batch = _DeferredSignalBatch(savepoint_ids)
+            connection._graphene_django_cud_signal_batch = batch
+            connection.on_commit(batch)
+
+        batch.sends.append((self, robust, sender, named))
+        return []
+
+    def send(self, sender, **named):
+        if self.should_defer():
+            return self.defer(False, sender, named)
+
+        return super().send(sender, **named)
+
+    def send_robust(self, sender, **named):
+        if self.should_defer():
+            return self.defer(True, sender, named)
+
+        return super().send_robust(sender, **named)
+
+    async def asend(self, sender, **named):
+        if getattr(settings, DEFER_SIGNALS_UNTIL_COMMIT_SETTINGS_KEY, False):
+            # Transactions are bound to the thread running the synchronous code.
+            return await sync_to_async(self.send)(sender, **named)
+
+        return await super().asend(sender, **named)
+
+    async def asend_robust(self, sender, **named):
+        if getattr(settings, DEFER_SIGNALS_UNTIL_COMMIT_SETTINGS_KEY, False):
+            return await sync_to_async(self.send_robust)(sender, **named)
+
+        return await super().asend_robust(sender, **named)
+
+
+post_create_mutation = MutationSignal()
+post_update_mutation = MutationSignal()
+post_delete_mutation = MutationSignal()
+
+post_batch_create_mutation = MutationSignal()
+post_batch_update_mutation = MutationSignal()
+post_batch_delete_mutation = MutationSignal()
+
+post_filter_update_mutation = MutationSignal()
+post_filter_delete_mutation = MutationSignal()
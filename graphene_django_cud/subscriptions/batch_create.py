@@ -0,0 +1,19 @@
+from graphene_django_cud.signals import post_batch_create_mutation
+from graphene_django_cud.subscriptions.create import DjangoCreateSubscription
+
+
+class DjangoBatchCreateSubscription(DjangoCreateSubscription):
+    """
+    A `DjangoCreateSubscription` connected to `post_batch_create_mutation`, which pushes one payload per
+    batch mutation, with the list of created instances.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, signal=post_batch_create_mutation, coalesce_as_list=True, **kwargs):
+        if not coalesce_as_list:
+            raise ValueError("coalesce_as_list cannot be disabled for DjangoBatchCreateSubscription")
+
+        super().__init_subclass_with_meta__(signal=signal, coalesce_as_list=True, **kwargs)
@@ -0,0 +1,19 @@
+from graphene_django_cud.signals import post_batch_delete_mutation
+from graphene_django_cud.subscriptions.delete import DjangoDeleteSubscription
+
+
+class DjangoBatchDeleteSubscription(DjangoDeleteSubscription):
+    """
+    A `DjangoDeleteSubscription` connected to `post_batch_delete_mutation`, which pushes one payload per
+    batch mutation, with the list of ids of the deleted instances.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, signal=post_batch_delete_mutation, coalesce_as_list=True, **kwargs):
+        if not coalesce_as_list:
+            raise ValueError("coalesce_as_list cannot be disabled for DjangoBatchDeleteSubscription")
+
+        super().__init_subclass_with_meta__(signal=signal, coalesce_as_list=True, **kwargs)
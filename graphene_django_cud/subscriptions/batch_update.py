@@ -0,0 +1,19 @@
+from graphene_django_cud.signals import post_batch_update_mutation
+from graphene_django_cud.subscriptions.update import DjangoUpdateSubscription
+
+
+class DjangoBatchUpdateSubscription(DjangoUpdateSubscription):
+    """
+    A `DjangoUpdateSubscription` connected to `post_batch_update_mutation`, which pushes one payload per
+    batch mutation, with the list of updated instances.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, signal=post_batch_update_mutation, coalesce_as_list=True, **kwargs):
+        if not coalesce_as_list:
+            raise ValueError("coalesce_as_list cannot be disabled for DjangoBatchUpdateSubscription")
+
+        super().__init_subclass_with_meta__(signal=signal, coalesce_as_list=True, **kwargs)
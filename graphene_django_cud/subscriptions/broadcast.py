@@ -0,0 +1,343 @@
+import hmac
+import logging
+import os
+import pickle
+import socket
+import stat
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import salted_hmac
+from django.utils.module_loading import import_string
+
+from graphene_django_cud.consts import (
+    SUBSCRIPTION_BROADCAST_BACKEND_SETTINGS_KEY,
+    SUBSCRIPTION_BROADCAST_OPTIONS_SETTINGS_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROADCAST_BACKEND = "graphene_django_cud.subscriptions.broadcast.InMemoryBroadcastBackend"
+
+
+class BroadcastBackend:
+    """
+    Carries subscription events from the signal handlers to the subscribers, possibly in other processes.
+
+    `publish` sends a batch of events on a channel as a single message. Every listener, in every process
+    using the same backend configuration, is called with the channel and the batch of events.
+    """
+
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def publish(self, channel, events):
+        raise NotImplementedError("`publish` must be implemented by the broadcast backend.")
+
+    def close(self):
+        pass
+
+    def dispatch(self, channel, events):
+        for listener in tuple(self.listeners):
+            try:
+                listener(channel, events)
+            except Exception:
+                logger.exception("Subscription broadcast listener failed for channel %s", channel)
+
+
+class InMemoryBroadcastBackend(BroadcastBackend):
+    """Delivers events to the listeners of the current process only. This is the default."""
+
+    def publish(self, channel, events):
+        self.dispatch(channel, list(events))
+
+
+class SerializingBroadcastBackend(BroadcastBackend):
+    """
+    Base class for backends which send pickled messages to other processes. The listeners of the
+    publishing process are called directly, and messages coming back from the same process are ignored.
+
+    Each message is signed with an HMAC of `secret` (defaulting to the `SECRET_KEY` setting), and is only
+    unpickled if its signature is valid, so all processes must share the secret. Messages with a missing or
+    invalid signature are dropped.
+    """
+
+    SIGNATURE_SALT = "graphene_django_cud.subscriptions.broadcast"
+    SIGNATURE_SIZE = 32
+
+    def __init__(self, secret=None):
+        super().__init__()
+        self.origin = uuid.uuid4().hex
+        self.closed = False
+        self.secret = secret
+
+    def sign(self, payload):
+        return salted_hmac(self.SIGNATURE_SALT, payload, secret=self.secret, algorithm="sha256").digest()
+
+    def publish(self, channel, events):
+        events = list(events)
+        self.dispatch(channel, events)
+
+        try:
+            payload = pickle.dumps((self.origin, channel, events), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            logger.exception("Could not serialize the subscription events of channel %s", channel)
+            return
+
+        self.send(self.sign(payload) + payload)
+
+    def send(self, message):
+        raise NotImplementedError("`send` must be implemented by the broadcast backend.")
+
+    def receive(self, message):
+        size = self.SIGNATURE_SIZE
+        signature, payload = message[:size], message[size:]
+        if not hmac.compare_digest(signature, self.sign(payload)):
+            logger.warning("Dropped a subscription broadcast message with an invalid signature")
+            return
+
+        try:
+            origin, channel, events = pickle.loads(payload)
+        except Exception:
+            logger.exception("Could not deserialize a subscription broadcast message")
+            return
+
+        if origin != self.origin:
+            self.dispatch(channel, events)
+
+    def start_receiving(self):
+        thread = threading.Thread(target=self.receive_loop, name=f"{type(self).__name__}-{self.origin}", daemon=True)
+        thread.start()
+        return thread
+
+    def receive_loop(self):
+        raise NotImplementedError("`receive_loop` must be implemented by the broadcast backend.")
+
+
+class UnixSocketBroadcastBackend(SerializingBroadcastBackend):
+    """
+    Broadcasts events to all processes on the same host. Each process binds a Unix datagram socket in
+    `path`, and a batch of events is sent as one datagram to every socket in the directory.
+
+    Sending never blocks: if the receive buffer of a process is full, or the batch is larger than the
+    maximum datagram size, the message is dropped for that process and a warning is logged.
+    """
+
+    SOCKET_SUFFIX = ".sock"
+
+    def __init__(self, path=None, max_message_size=2**20, secret=None):
+        super().__init__(secret=secret)
+        self.path = path or os.path.join(tempfile.gettempdir(), f"graphene-django-cud-broadcast-{os.geteuid()}")
+        self.max_message_size = max_message_size
+        self.ensure_private_directory(self.path)
+
+        self.socket_path = os.path.join(self.path, f"{os.getpid()}-{self.origin}{self.SOCKET_SUFFIX}")
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.socket_path)
+
+        self.send_socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.send_socket.setblocking(False)
+
+        self.thread = self.start_receiving()
+
+    @staticmethod
+    def ensure_private_directory(path):
+        """
+        Creates the socket directory, accessible to the current user only. An existing directory must be owned by
+        the current user, and not be accessible to other users, as anyone able to write to it can receive events.
+        """
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+
+        path_stat = os.lstat(path)
+        if not stat.S_ISDIR(path_stat.st_mode):
+            raise ImproperlyConfigured(f"The subscription broadcast path {path} is not a directory.")
+
+        if path_stat.st_uid != os.geteuid() or path_stat.st_mode & 0o077:
+            raise ImproperlyConfigured(
+                f"The subscription broadcast directory {path} must be owned by the current user, "
+                "and not be accessible to other users (mode 0700)."
+            )
+
+    def get_peer_paths(self):
+        for name in os.listdir(self.path):
+            peer_path = os.path.join(self.path, name)
+            if name.endswith(self.SOCKET_SUFFIX) and peer_path != self.socket_path:
+                yield peer_path
+
+    def send(self, message):
+        for peer_path in self.get_peer_paths():
+            try:
+                self.send_socket.sendto(message, peer_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The process has exited without cleaning up
+                try:
+                    os.unlink(peer_path)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning("Could not send subscription events to %s: %s", peer_path, e)
+
+    def receive_loop(self):
+        while not self.closed:
+            try:
+                message = self.socket.recv(self.max_message_size)
+            except OSError:
+                break
+
+            if not self.closed:
+                self.receive(message)
+
+        self.socket.close()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        # Wake up the receiving thread
+        try:
+            self.send_socket.sendto(b"", self.socket_path)
+        except OSError:
+            pass
+
+        self.thread.join(1)
+        self.send_socket.close()
+
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class RedisBroadcastBackend(SerializingBroadcastBackend):
+    """
+    Broadcasts events through a Redis pub/sub channel. `client` is a `redis.Redis` instance, or any
+    object with the same `publish` and `pubsub` methods. If it is not given, one is created from `url`.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        url="redis://localhost:6379/0",
+        channel="graphene_django_cud",
+        poll_timeout=1.0,
+        secret=None,
+    ):
+        super().__init__(secret=secret)
+        self.poll_timeout = poll_timeout
+
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("The redis package is required to use the RedisBroadcastBackend.")
+
+            client = redis.Redis.from_url(url)
+
+        self.client = client
+        self.channel = channel
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+        self.thread = self.start_receiving()
+
+    def send(self, message):
+        try:
+            self.client.publish(self.channel, message)
+        except Exception:
+            logger.exception("Could not publish subscription events to Redis")
+
+    def receive_loop(self):
+        while not self.closed:
+            try:
+                message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=self.poll_timeout)
+            except Exception:
+                if self.closed:
+                    break
+
+                logger.exception("Could not receive subscription events from Redis")
+                time.sleep(1.0)
+                continue
+
+            if message and message.get("type") == "message" and not self.closed:
+                self.receive(message["data"])
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        self.thread.join(self.poll_timeout + 1.0)
+        self.pubsub.close()
+
+
+_channel_receivers = {}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def register_channel(channel, receive):
+    """Registers the function called with the batches of events published on `channel`."""
+    _channel_receivers[channel] = receive
+
+
+def _dispatch_to_channel(channel, events):
+    receive = _channel_receivers.get(channel)
+    if receive is not None:
+        receive(events)
+
+
+def get_broadcast_backend():
+    """
+    Returns the broadcast backend of the process, as configured by the
+    `GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_BACKEND` and `GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_OPTIONS`
+    settings.
+    """
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            backend_class = import_string(
+                getattr(settings, SUBSCRIPTION_BROADCAST_BACKEND_SETTINGS_KEY, DEFAULT_BROADCAST_BACKEND)
+            )
+            backend = backend_class(**getattr(settings, SUBSCRIPTION_BROADCAST_OPTIONS_SETTINGS_KEY, {}))
+            backend.add_listener(_dispatch_to_channel)
+            _backend = backend
+
+    return _backend
+
+
+def reset_broadcast_backend():
+    global _backend
+
+    with _backend_lock:
+        backend, _backend = _backend, None
+
+    if backend is not None:
+        backend.close()
+
+
+@receiver(setting_changed)
+def _reset_broadcast_backend_on_setting_changed(setting, **kwargs):
+    if setting in (SUBSCRIPTION_BROADCAST_BACKEND_SETTINGS_KEY, SUBSCRIPTION_BROADCAST_OPTIONS_SETTINGS_KEY):
+        reset_broadcast_backend()
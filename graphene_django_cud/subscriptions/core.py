@@ -1,5 +1,361 @@
+import asyncio
+import hashlib
+import json
+import threading
+
 import graphene
-from graphql import GraphQLError
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from graphql import GraphQLError, print_ast
+
+from graphene_django_cud.consts import (
+    SUBSCRIPTION_MAX_QUEUE_SIZE_SETTINGS_KEY,
+    SUBSCRIPTION_QUEUE_OVERFLOW_POLICY_SETTINGS_KEY,
+    SUBSCRIPTION_REPLAY_BUFFER_SIZE_SETTINGS_KEY,
+    SUBSCRIPTION_REPLAY_MAX_AGE_SETTINGS_KEY,
+    SUBSCRIPTION_SHARE_PAYLOADS_SETTINGS_KEY,
+)
+from graphene_django_cud.util.permissions import get_user_permission_cache, user_has_perms
+from graphene_django_cud.subscriptions.broadcast import get_broadcast_backend, register_channel
+from graphene_django_cud.subscriptions.filters import InstanceFilter
+from graphene_django_cud.subscriptions.replay import (
+    EventLog,
+    SubscriptionEvent,
+    get_event_changed_fields,
+    unwrap_event,
+)
+
+
+QUEUE_OVERFLOW_DROP_OLDEST = "drop_oldest"
+QUEUE_OVERFLOW_DROP_NEWEST = "drop_newest"
+QUEUE_OVERFLOW_COALESCE = "coalesce"
+QUEUE_OVERFLOW_DISCONNECT = "disconnect"
+
+QUEUE_OVERFLOW_POLICIES = (
+    QUEUE_OVERFLOW_DROP_OLDEST,
+    QUEUE_OVERFLOW_DROP_NEWEST,
+    QUEUE_OVERFLOW_COALESCE,
+    QUEUE_OVERFLOW_DISCONNECT,
+)
+
+
+class SubscriberDisconnected(GraphQLError):
+    def __init__(self):
+        super().__init__("The subscription was disconnected, as it could not keep up with the events.")
+
+
+_DISCONNECTED = object()
+
+# Yielded by `iterate_events` when the `since` cursor of a subscriber has expired.
+RESYNC_REQUIRED = object()
+
+
+class SubscriberQueue(asyncio.Queue):
+    def replace(self, key, item, get_key):
+        """Replaces the queued item with the given key, if any. Returns True if an item was replaced."""
+        for index, queued_item in enumerate(self._queue):
+            if queued_item is not _DISCONNECTED and get_key(unwrap_event(queued_item)) == key:
+                self._queue[index] = item
+                return True
+
+        return False
+
+    def clear(self):
+        self._queue.clear()
+
+
+class Subscriber:
+    """
+    The event queue of a single active subscription, and the event loop it is consumed on.
+
+    If `max_queue_size` is set, the queue is bounded, and `overflow_policy` decides what happens
+    when an event arrives at a full queue:
+
+    - ``drop_oldest``: the oldest queued event is dropped.
+    - ``drop_newest``: the new event is dropped.
+    - ``coalesce``: the new event replaces a queued event for the same object (as given by `get_key`),
+      and otherwise the oldest queued event is dropped.
+    - ``disconnect``: the queue is cleared, and the subscription ends with an error.
+
+    If `filter` is set, only events it matches are put in the queue (see `InstanceFilter`).
+
+    If `coalesce_window` (in seconds) is set, events are buffered for the duration of the window,
+    keeping only the latest event per key (as given by `get_key`), and the buffered events are queued
+    when the window ends. With `coalesce_as_list`, they are queued as a single list, and without a
+    window, the events of each published batch are queued as a single list.
+    """
+
+    __slots__ = (
+        "queue",
+        "loop",
+        "overflow_policy",
+        "get_key",
+        "filter",
+        "coalesce_window",
+        "coalesce_as_list",
+        "buffer",
+        "dropped_count",
+        "disconnected",
+    )
+
+    def __init__(
+        self,
+        max_queue_size=None,
+        overflow_policy=QUEUE_OVERFLOW_DROP_OLDEST,
+        get_key=None,
+        filter=None,
+        coalesce_window=None,
+        coalesce_as_list=False,
+    ):
+        self.loop = asyncio.get_running_loop()
+        self.queue = SubscriberQueue(maxsize=max_queue_size or 0)
+        self.overflow_policy = overflow_policy
+        self.get_key = get_key
+        self.filter = filter
+        self.coalesce_window = coalesce_window
+        self.coalesce_as_list = coalesce_as_list
+        self.buffer = {}
+        self.dropped_count = 0
+        self.disconnected = False
+
+    def put(self, item):
+        if self.disconnected:
+            self.dropped_count += 1
+            return
+
+        if self.coalesce_window:
+            self.buffer_item(item)
+        elif self.coalesce_as_list:
+            self.enqueue([item])
+        else:
+            self.enqueue(item)
+
+    def put_many(self, items):
+        """Puts the events of one published batch."""
+        if self.coalesce_as_list and not self.coalesce_window and not self.disconnected:
+            self.enqueue(list(items))
+            return
+
+        for item in items:
+            self.put(item)
+
+    def buffer_item(self, item):
+        if not self.buffer:
+            self.loop.call_later(self.coalesce_window, self.flush)
+
+        key = self.get_key(unwrap_event(item)) if self.get_key is not None else None
+
+        # Events without a key are never coalesced. A replaced event keeps its position in the buffer.
+        self.buffer[object() if key is None else key] = item
+
+    def flush(self):
+        items = list(self.buffer.values())
+        self.buffer.clear()
+
+        if not items or self.disconnected:
+            return
+
+        if self.coalesce_as_list:
+            self.enqueue(items)
+            return
+
+        for item in items:
+            self.enqueue(item)
+
+    def enqueue(self, item):
+        if self.disconnected:
+            self.dropped_count += 1
+            return
+
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+            return
+
+        self.dropped_count += 1
+
+        if self.overflow_policy == QUEUE_OVERFLOW_DROP_NEWEST:
+            return
+
+        if self.overflow_policy == QUEUE_OVERFLOW_DISCONNECT:
+            self.dropped_count += self.queue.qsize()
+            self.disconnected = True
+            self.queue.clear()
+            self.queue.put_nowait(_DISCONNECTED)
+            return
+
+        if self.overflow_policy == QUEUE_OVERFLOW_COALESCE and self.get_key is not None and not self.coalesce_as_list:
+            key = self.get_key(unwrap_event(item))
+            if key is not None and self.queue.replace(key, item, self.get_key):
+                return
+
+        self.queue.get_nowait()
+        self.queue.put_nowait(item)
+
+    async def get(self):
+        item = await self.queue.get()
+        if item is _DISCONNECTED:
+            raise SubscriberDisconnected()
+
+        return item
+
+
+class SubscriberRegistry:
+    """
+    The active subscribers of a subscription, grouped by event loop.
+
+    Publishing hands the event to each event loop with a single `call_soon_threadsafe`, and never
+    blocks the publishing thread. The event is put in the subscribers' queues on their own loop, so
+    the cost for the publisher does not grow with the number of subscribers.
+
+    Subscribers with a filter are matched by the publisher, before anything is queued. They are
+    indexed by the value of their first equality lookup, so only the subscribers whose indexed
+    value equals the value of the instance are matched.
+    """
+
+    def __init__(self):
+        # Subscribers are added and removed on their own loop, while events are published from any thread.
+        self._lock = threading.Lock()
+        self._subscribers_by_loop = {}
+
+        # Subscribers with a filter, by attname and value of the indexed lookup. Subscribers whose filter
+        # has no equality lookup are stored under `None`.
+        self._filtered_subscribers = {}
+
+        # Counters of subscribers which have been removed.
+        self._removed_dropped_count = 0
+        self._removed_disconnected_count = 0
+
+    def __len__(self):
+        return len(self._get_subscribers())
+
+    def _get_subscribers(self):
+        subscribers = [subscriber for by_loop in self._subscribers_by_loop.values() for subscriber in by_loop]
+        for by_value in self._filtered_subscribers.values():
+            for filtered_subscribers in by_value.values():
+                subscribers.extend(filtered_subscribers)
+
+        return subscribers
+
+    @staticmethod
+    def _get_index_item(subscriber):
+        return subscriber.filter.index_item or (None, None)
+
+    def add(self, subscriber):
+        with self._lock:
+            if subscriber.filter:
+                attname, value = self._get_index_item(subscriber)
+                self._filtered_subscribers.setdefault(attname, {}).setdefault(value, {})[subscriber] = None
+            else:
+                self._subscribers_by_loop.setdefault(subscriber.loop, {})[subscriber] = None
+
+    def remove(self, subscriber):
+        with self._lock:
+            if subscriber.filter:
+                attname, value = self._get_index_item(subscriber)
+                by_value = self._filtered_subscribers.get(attname, {})
+                subscribers = by_value.get(value)
+            else:
+                subscribers = self._subscribers_by_loop.get(subscriber.loop)
+
+            if subscribers is None:
+                return
+
+            if subscriber in subscribers:
+                del subscribers[subscriber]
+                self._removed_dropped_count += subscriber.dropped_count
+                self._removed_disconnected_count += subscriber.disconnected
+
+            if subscribers:
+                return
+
+            if subscriber.filter:
+                del by_value[value]
+                if not by_value:
+                    del self._filtered_subscribers[attname]
+            else:
+                del self._subscribers_by_loop[subscriber.loop]
+
+    def get_stats(self):
+        """
+        Returns the number of subscribers, their number of queued events, and the number of events
+        dropped and subscribers disconnected by the queue overflow policies since startup.
+        """
+        with self._lock:
+            subscribers = self._get_subscribers()
+            return {
+                "subscribers": len(subscribers),
+                "queued": sum(subscriber.queue.qsize() for subscriber in subscribers),
+                "dropped": self._removed_dropped_count + sum(subscriber.dropped_count for subscriber in subscribers),
+                "disconnected": self._removed_disconnected_count
+                + sum(subscriber.disconnected for subscriber in subscribers),
+            }
+
+    def _get_filter_candidates(self, item):
+        candidates = []
+        for attname, by_value in self._filtered_subscribers.items():
+            if attname is None:
+                candidates.extend(by_value[None])
+                continue
+
+            try:
+                subscribers = by_value.get(getattr(unwrap_event(item), attname, None))
+            except TypeError:
+                # Unhashable value
+                continue
+
+            if subscribers:
+                candidates.extend(subscribers)
+
+        return candidates
+
+    def publish(self, item):
+        self.publish_many((item,))
+
+    def publish_many(self, items):
+        """Publishes a batch of events, with a single `call_soon_threadsafe` per event loop."""
+        items = list(items)
+        if not items:
+            return
+
+        with self._lock:
+            loops = tuple(self._subscribers_by_loop)
+            candidates = (
+                [(item, self._get_filter_candidates(item)) for item in items] if self._filtered_subscribers else ()
+            )
+
+        for loop in loops:
+            if loop.is_closed():
+                continue
+
+            loop.call_soon_threadsafe(self._deliver, loop, items)
+
+        # Only the lookups evaluated in process are matched here. Lookups needing a query are matched where the
+        # events are consumed, see `DjangoCudSubscriptionBase.iterate_events`.
+        deliveries_by_loop = {}
+        for item, subscribers in candidates:
+            for subscriber in subscribers:
+                if subscriber.filter.matches_event(item, query=False):
+                    deliveries_by_loop.setdefault(subscriber.loop, []).append((subscriber, item))
+
+        for loop, deliveries in deliveries_by_loop.items():
+            if loop.is_closed():
+                continue
+
+            loop.call_soon_threadsafe(self._deliver_to, deliveries)
+
+    def _deliver(self, loop, items):
+        # Runs on `loop`, so the subscribers are read at delivery time, after the publisher has returned.
+        for subscriber in tuple(self._subscribers_by_loop.get(loop, ())):
+            subscriber.put_many(items)
+
+    @staticmethod
+    def _deliver_to(deliveries):
+        items_by_subscriber = {}
+        for subscriber, item in deliveries:
+            items_by_subscriber.setdefault(subscriber, []).append(item)
+
+        for subscriber, items in items_by_subscriber.items():
+            subscriber.put_many(items)
 
 
 class SubscriptionField(graphene.Field):
@@ -22,6 +378,235 @@ class SubscriptionField(graphene.Field):
 class DjangoCudSubscriptionBase(graphene.ObjectType):
     """Base class for DjangoCud subscriptions"""
 
+    @classmethod
+    def __init_subclass_with_meta__(
+        cls,
+        _meta=None,
+        max_queue_size=None,
+        queue_overflow_policy=None,
+        share_payloads=None,
+        coalesce_window_ms=None,
+        coalesce_as_list=False,
+        replay_buffer_size=None,
+        replay_max_age=None,
+        **kwargs,
+    ):
+        if _meta is not None:
+            if max_queue_size is None:
+                max_queue_size = getattr(settings, SUBSCRIPTION_MAX_QUEUE_SIZE_SETTINGS_KEY, None)
+
+            if queue_overflow_policy is None:
+                queue_overflow_policy = getattr(
+                    settings, SUBSCRIPTION_QUEUE_OVERFLOW_POLICY_SETTINGS_KEY, QUEUE_OVERFLOW_DROP_OLDEST
+                )
+
+            if queue_overflow_policy not in QUEUE_OVERFLOW_POLICIES:
+                raise ValueError(
+                    f"Invalid queue_overflow_policy {queue_overflow_policy!r}, "
+                    f"must be one of {', '.join(QUEUE_OVERFLOW_POLICIES)}"
+                )
+
+            if share_payloads is None:
+                share_payloads = getattr(settings, SUBSCRIPTION_SHARE_PAYLOADS_SETTINGS_KEY, False)
+
+            if replay_buffer_size is None:
+                replay_buffer_size = getattr(settings, SUBSCRIPTION_REPLAY_BUFFER_SIZE_SETTINGS_KEY, None)
+
+            if replay_max_age is None:
+                replay_max_age = getattr(settings, SUBSCRIPTION_REPLAY_MAX_AGE_SETTINGS_KEY, 300)
+
+            _meta.event_log = EventLog(replay_buffer_size, replay_max_age) if replay_buffer_size else None
+            if _meta.event_log is not None:
+                # Clients resume from the id of the last event they received.
+                _meta.arguments = {**(getattr(_meta, "arguments", None) or {}), "since": graphene.String()}
+                _meta.fields["event_id"] = graphene.Field(graphene.String)
+                _meta.fields["resync_required"] = graphene.Field(graphene.Boolean)
+
+            _meta.max_queue_size = max_queue_size
+            _meta.queue_overflow_policy = queue_overflow_policy
+            _meta.share_payloads = share_payloads
+            _meta.coalesce_window_ms = coalesce_window_ms
+            _meta.coalesce_as_list = coalesce_as_list
+
+            # Events are broadcast on a channel named after the subscription, which is the same in all processes.
+            _meta.channel = f"{cls.__module__}.{cls.__qualname__}"
+            register_channel(_meta.channel, cls.receive_events)
+
+        super().__init_subclass_with_meta__(_meta=_meta, **kwargs)
+
+    @classmethod
+    def create_subscriber(cls, filter=None):
+        return Subscriber(
+            max_queue_size=cls._meta.max_queue_size,
+            overflow_policy=cls._meta.queue_overflow_policy,
+            get_key=cls.get_event_key,
+            filter=filter,
+            coalesce_window=cls._meta.coalesce_window_ms / 1000 if cls._meta.coalesce_window_ms else None,
+            coalesce_as_list=cls._meta.coalesce_as_list,
+        )
+
+    @classmethod
+    def get_subscriber_filter(cls, root, info, **kwargs):
+        """
+        Returns the filter of a new subscriber from the subscription arguments, or None if the
+        subscriber receives all events. By default, the `filter_fields` arguments are matched
+        against the instances, and the `watch_fields` argument against the changed fields.
+        """
+        watch_fields = kwargs.pop("watch_fields", None)
+        if not getattr(cls._meta, "filter_fields", None):
+            kwargs = {}
+
+        return InstanceFilter(cls._meta.model, kwargs, watch_fields=watch_fields) or None
+
+    @classmethod
+    def get_event_key(cls, item):
+        """
+        Returns the key used to coalesce queued events with the ``coalesce`` overflow policy, or None
+        if the event cannot be coalesced. By default, events for the same model instance are coalesced.
+        """
+        return getattr(item, "pk", None)
+
+    @classmethod
+    def get_subscriber_registries(cls):
+        return []
+
+    @classmethod
+    def broadcast(cls, events):
+        """Publishes a batch of events to the subscribers of this subscription, in all processes."""
+        get_broadcast_backend().publish(cls._meta.channel, events)
+
+    @classmethod
+    def receive_events(cls, events):
+        """Called with each batch of events broadcast on the channel of this subscription."""
+        event_log = cls._meta.event_log
+        if event_log is not None:
+            events = [
+                SubscriptionEvent(
+                    event_log.append(cls.get_event_key(unwrap_event(event))),
+                    unwrap_event(event),
+                    get_event_changed_fields(event),
+                )
+                for event in events
+            ]
+
+        for registry in cls.get_subscriber_registries():
+            registry.publish_many(events)
+
+    @classmethod
+    def get_replay_queryset(cls):
+        """Returns the queryset the instances of replayed events are loaded from."""
+        model = getattr(cls._meta, "model", None)
+        if model is None:
+            raise NotImplementedError("This subscription does not support replaying events.")
+
+        return model._default_manager.all()
+
+    @classmethod
+    def get_replay_items(cls, entries, filter=None):
+        """
+        Returns the items of the logged events `entries`, as `SubscriptionEvent`s, for replaying them
+        to a subscriber. Runs in a synchronous context.
+        """
+        # The events are replayed with the current state of the instances, once per instance.
+        last_entries = {entry.key: entry for entry in entries if entry.key is not None}
+        instances = cls.get_replay_queryset().in_bulk(list(last_entries))
+
+        return [
+            SubscriptionEvent(entry.event_id, instances[entry.key])
+            for entry in sorted(last_entries.values(), key=lambda entry: entry.seq)
+            if entry.key in instances and (filter is None or filter.matches(instances[entry.key]))
+        ]
+
+    @classmethod
+    async def iterate_events(cls, subscriber, since=None, unwrap=True):
+        """
+        Yields `(event_id, item)` for each event of the subscriber. If `since` is given, the events
+        after it are first replayed from the event log, or `(event_id, RESYNC_REQUIRED)` is yielded if
+        the cursor has expired. With `coalesce_as_list`, each item is a list. If `unwrap` is False, the
+        items are yielded as `SubscriptionEvent`s where they were published as such.
+        """
+        event_log = cls._meta.event_log
+        last_replayed_seq = None
+
+        if since is not None and event_log is not None:
+            entries = event_log.get_since(since)
+            if entries is None:
+                yield event_log.last_event_id, RESYNC_REQUIRED
+            elif entries:
+                last_replayed_seq = entries[-1].seq
+                events = await sync_to_async(cls.get_replay_items)(entries, subscriber.filter)
+
+                if events and subscriber.coalesce_as_list:
+                    yield events[-1].id, [event.item for event in events] if unwrap else events
+                else:
+                    for event in events:
+                        yield event.id, (event.item if unwrap else event)
+
+        while True:
+            item = await subscriber.get()
+            events = item if subscriber.coalesce_as_list else [item]
+
+            if last_replayed_seq is not None:
+                # Events published while the replay was loaded are already replayed.
+                events = [
+                    event
+                    for event in events
+                    if not isinstance(event, SubscriptionEvent)
+                    or event_log.parse_event_id(event.id) > last_replayed_seq
+                ]
+                if not events:
+                    continue
+
+            if getattr(subscriber.filter, "query_lookups", None):
+                events = await sync_to_async(subscriber.filter.filter_by_query)(events)
+                if not events:
+                    continue
+
+            event_id = events[-1].id if isinstance(events[-1], SubscriptionEvent) else None
+            items = [unwrap_event(event) for event in events] if unwrap else events
+            yield event_id, items if subscriber.coalesce_as_list else items[0]
+
+    @classmethod
+    def create_payload(cls, event_id=None, resync_required=False, **data):
+        if cls._meta.event_log is not None:
+            data["event_id"] = event_id
+            data["resync_required"] = resync_required
+
+        return cls(**data)
+
+    @classmethod
+    def get_subscriber_stats(cls):
+        """Returns the subscriber and queue counters of this subscription. See `SubscriberRegistry.get_stats`."""
+        stats = {"subscribers": 0, "queued": 0, "dropped": 0, "disconnected": 0}
+        for registry in cls.get_subscriber_registries():
+            for key, value in registry.get_stats().items():
+                stats[key] += value
+
+        return stats
+
+    @classmethod
+    def get_payload_scope(cls, root, info, **kwargs):
+        """
+        Returns the scope within which subscriptions with `share_payloads` may share payloads, i.e.
+        the part of the context that the resolvers of the payload depend on. Defaults to the user.
+        """
+        user = getattr(info.context, "user", None)
+        return getattr(user, "pk", None)
+
+    @classmethod
+    def get_payload_fingerprint(cls, root, info, **kwargs):
+        """
+        Returns the fingerprint of a subscription with `share_payloads`. Subscriptions with the same
+        fingerprint receive the same payload, which is resolved once per event.
+        """
+        fingerprint = [
+            print_ast(info.operation),
+            *(print_ast(fragment) for _, fragment in sorted(info.fragments.items())),
+            json.dumps(info.variable_values, sort_keys=True, default=str),
+            repr(cls.get_payload_scope(root, info, **kwargs)),
+        ]
+        return hashlib.sha256("\n".join(fingerprint).encode()).hexdigest()
+
     @classmethod
     def get_permissions(cls, root, info, *args, **kwargs):
         return cls._meta.permissions
@@ -35,7 +620,14 @@ class DjangoCudSubscriptionBase(graphene.ObjectType):
         permissions = cls.get_permissions(root, info, *args, **kwargs)
 
         if permissions and len(permissions) > 0:
-            if not info.context.user.has_perms(permissions):
+            # Reconnecting subscribers may be checked against the cache of recent checks of the user.
+            cache = get_user_permission_cache()
+            if cache is not None:
+                has_perms = cache.has_perms(info.context.user, permissions)
+            else:
+                has_perms = user_has_perms(info.context, permissions)
+
+            if not has_perms:
                 raise GraphQLError("Not permitted to access this subscription.")
 
     @classmethod
@@ -43,6 +635,7 @@ class DjangoCudSubscriptionBase(graphene.ObjectType):
         """Create a field for the subscription that automatically creates a subscription resolver"""
         return SubscriptionField(
             cls._meta.output,
+            args=getattr(cls._meta, "arguments", None),
             resolver=cls._meta.resolver,
             subscribe=cls._meta.subscribe,
             name=name,
@@ -1,9 +1,7 @@
-import asyncio
 from collections import OrderedDict
 from typing import Optional
 
 import graphene
-from asgiref.sync import async_to_sync
 from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import Signal
@@ -12,21 +10,29 @@ from graphene_django.registry import get_global_registry
 
 from graphene_django_cud.consts import USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS_KEY
 from graphene_django_cud.signals import post_create_mutation
-from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase
-from graphene_django_cud.util import to_snake_case
+from graphene_django_cud.subscriptions.core import RESYNC_REQUIRED, DjangoCudSubscriptionBase, SubscriberRegistry
+from graphene_django_cud.util import get_filter_fields_input_args, to_snake_case
 
 
 class DjangoCreateSubscriptionOptions(ObjectTypeOptions):
     model = None
     return_field_name = None
     permissions = None
+    filter_fields = None
+    arguments = None
+    max_queue_size = None
+    queue_overflow_policy = None
+    share_payloads = False
+    coalesce_window_ms = None
+    coalesce_as_list = False
+    event_log = None
+    channel = None
     signal: Optional[Signal] = None
 
 
 class DjangoCreateSubscription(DjangoCudSubscriptionBase):
-    # All active subscriptions are stored in this centralized dictionary.
-    # We need to do this to keep track of which subscriptions are listening to
-    # which signals.
+    # The registries of active subscribers, by model. Each subclass is given its own dictionary,
+    # so that the events of one subscription are never delivered to the subscribers of another.
     subscribers = {}
 
     @classmethod
@@ -36,6 +42,8 @@ class DjangoCreateSubscription(DjangoCudSubscriptionBase):
         model=None,
         permissions=None,
         return_field_name=None,
+        filter_fields=(),
+        coalesce_as_list=False,
         signal=post_create_mutation
         if getattr(settings, USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS_KEY, False)
         else post_save,
@@ -47,17 +55,24 @@ class DjangoCreateSubscription(DjangoCudSubscriptionBase):
         if not _meta:
             _meta = DjangoCreateSubscriptionOptions(cls)
 
-        if not return_field_name:
-            return_field_name = to_snake_case(model.__name__)
-
         output_fields = OrderedDict()
-        output_fields[return_field_name] = graphene.Field(model_type)
+        if coalesce_as_list:
+            # Each payload is a list of instances
+            return_field_name = return_field_name or to_snake_case(model.__name__) + "s"
+            output_fields[return_field_name] = graphene.Field(graphene.List(model_type))
+        else:
+            return_field_name = return_field_name or to_snake_case(model.__name__)
+            output_fields[return_field_name] = graphene.Field(model_type)
+
+        cls.subscribers = {model: SubscriberRegistry()}
 
         _meta.model = model
         _meta.model_type = model_type
         _meta.fields = output_fields
         _meta.output = cls
         _meta.permissions = permissions
+        _meta.filter_fields = filter_fields
+        _meta.arguments = get_filter_fields_input_args(filter_fields, model)
 
         # Importantly, this needs to be set to either nothing or the identity.
         # Internally in graphene it will be defaulted to the identity function. If it
@@ -73,29 +88,36 @@ class DjangoCreateSubscription(DjangoCudSubscriptionBase):
         # Connect to the model's post_save (or your custom) signal
         signal.connect(cls._model_created_handler, sender=model)
 
-        super().__init_subclass_with_meta__(_meta=_meta, **kwargs)
+        super().__init_subclass_with_meta__(_meta=_meta, coalesce_as_list=coalesce_as_list, **kwargs)
 
     @classmethod
-    def _model_created_handler(cls, sender, instance, created=None, **kwargs):
-        """Handle model creation and notify subscribers"""
+    def _model_created_handler(cls, sender, instance=None, created=None, instances=None, **kwargs):
+        """
+        Handle model creation and notify subscribers. The `instances` of a batch, as sent by
+        `post_batch_create_mutation`, are published together.
+        """
         if created or created is None:
-            print(sender, instance, created, kwargs)
-            new_instance = cls.handle_object_created(sender, instance, **kwargs)
+            created_instances = []
+            for instance in instances if instances is not None else [instance]:
+                new_instance = cls.handle_object_created(sender, instance, **kwargs)
 
-            assert new_instance is None or isinstance(new_instance, cls._meta.model)
+                assert new_instance is None or isinstance(new_instance, cls._meta.model)
 
-            if new_instance:
-                instance = new_instance
+                created_instances.append(new_instance or instance)
 
-            # Notify all subscribers for the model
-            for subscriber in cls.subscribers.get(sender, []):
-                async_to_sync(subscriber)(instance)
+            # Notify all subscribers for the model, in all processes
+            if created_instances:
+                cls.broadcast(created_instances)
 
     @classmethod
     def handle_object_created(cls, sender, instance, **kwargs):
         """Handle and modify any instance created"""
         pass
 
+    @classmethod
+    def get_subscriber_registries(cls):
+        return [cls.subscribers[cls._meta.model]]
+
     @classmethod
     def check_permissions(cls, root, info, *args, **kwargs) -> None:
         return super().check_permissions(root, info, *args, **kwargs)
@@ -106,22 +128,21 @@ class DjangoCreateSubscription(DjangoCudSubscriptionBase):
 
         cls.check_permissions(root, info, *args, **kwargs)
 
+        since = kwargs.pop("since", None)
         model = cls._meta.model
-        queue = asyncio.Queue()
-
-        # Ensure there's a list of subscribers for the model
-        if model not in cls.subscribers:
-            cls.subscribers[model] = []
+        subscriber = cls.create_subscriber(filter=cls.get_subscriber_filter(root, info, **kwargs))
 
-        # Add the queue's put method to the subscribers for this model
-        cls.subscribers[model].append(queue.put)
+        registry = cls.subscribers[model]
+        registry.add(subscriber)
 
         try:
-            while True:
-                # Wait for the next model instance to be created
-                instance = await queue.get()
+            async for event_id, instance in cls.iterate_events(subscriber, since):
+                if instance is RESYNC_REQUIRED:
+                    yield cls.create_payload(event_id, resync_required=True)
+                    continue
+
                 data = {cls._meta.return_field_name: instance}
-                yield cls(**data)
+                yield cls.create_payload(event_id, **data)
         finally:
             # Clean up the subscriber when the subscription ends
-            cls.subscribers[model].remove(queue.put)
+            registry.remove(subscriber)
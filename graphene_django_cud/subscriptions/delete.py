@@ -1,17 +1,15 @@
-import asyncio
 from collections import OrderedDict
 from typing import Optional
 
 import graphene
-from asgiref.sync import async_to_sync
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_delete
 from graphene.types.objecttype import ObjectTypeOptions
 from graphene.types.utils import yank_fields_from_attrs
 from graphene_django.registry import get_global_registry
-from requests import delete
 
-from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase
-from graphene_django_cud.util import to_snake_case
+from graphene_django_cud.subscriptions.core import RESYNC_REQUIRED, DjangoCudSubscriptionBase, SubscriberRegistry
+from graphene_django_cud.subscriptions.replay import SubscriptionEvent
+from graphene_django_cud.util import disambiguate_id, to_snake_case
 
 from graphene_django_cud.util.dict import get_any_of
 import logging
@@ -23,13 +21,19 @@ class DjangoDeleteSubscriptionOptions(ObjectTypeOptions):
     model = None
     return_field_name = None
     permissions = None
+    max_queue_size = None
+    queue_overflow_policy = None
+    share_payloads = False
+    coalesce_window_ms = None
+    coalesce_as_list = False
+    event_log = None
+    channel = None
     signal = None
 
 
 class DjangoDeleteSubscription(DjangoCudSubscriptionBase):
-    # All active subscriptions are stored in this centralized dictionary.
-    # We need to do this to keep track of which subscriptions are listening to
-    # which signals.
+    # The registries of active subscribers, by model. Each subclass is given its own dictionary,
+    # so that the events of one subscription are never delivered to the subscribers of another.
     subscribers = {}
 
     @classmethod
@@ -39,6 +43,7 @@ class DjangoDeleteSubscription(DjangoCudSubscriptionBase):
         model=None,
         permissions=None,
         return_field_name=None,
+        coalesce_as_list=False,
         signal=post_delete,
         **kwargs,
     ):
@@ -52,7 +57,12 @@ class DjangoDeleteSubscription(DjangoCudSubscriptionBase):
             return_field_name = to_snake_case(model.__name__)
 
         output_fields = OrderedDict()
-        output_fields["id"] = graphene.String()
+        if coalesce_as_list:
+            output_fields["ids"] = graphene.List(graphene.String)
+        else:
+            output_fields["id"] = graphene.String()
+
+        cls.subscribers = {model: SubscriberRegistry()}
 
         _meta.model = model
         _meta.model_type = model_type
@@ -68,55 +78,77 @@ class DjangoDeleteSubscription(DjangoCudSubscriptionBase):
         _meta.subscribe = cls.subscribe
         _meta.return_field_name = return_field_name
 
-        # Connect to the model's post_save signal
+        # Connect to the deletion signal of the model
         signal.connect(cls._model_deleted_handler, sender=model)
 
-        super().__init_subclass_with_meta__(_meta=_meta, **kwargs)
+        super().__init_subclass_with_meta__(_meta=_meta, coalesce_as_list=coalesce_as_list, **kwargs)
 
     @classmethod
-    def _model_deleted_handler(cls, sender, *args, **kwargs):
-        """Handle model updating and notify subscribers"""
+    def _model_deleted_handler(cls, sender, *args, deleted_ids=None, **kwargs):
+        """
+        Handle model deletion and notify subscribers. The `deleted_ids` of a batch, as sent by
+        `post_batch_delete_mutation`, are published together.
+        """
 
         Model = cls._meta.model
 
-        instance: Optional[Model] = kwargs.get("instance", None) or next(
-            filter(lambda x: isinstance(x, Model), args), None
-        )
-
-        deleted_id = (
-            get_any_of(kwargs, ["pk", "raw_id", "input_id", "id"])
-            if not instance
-            else get_any_of(
-                instance,
-                [
-                    "pk",
-                    "id",
-                ],
+        if deleted_ids is None:
+            instance: Optional[Model] = kwargs.get("instance", None) or next(
+                filter(lambda x: isinstance(x, Model), args), None
             )
-        )
 
-        if deleted_id is None:
-            logger.warning(
-                "Received a delete signal for a model without an instance or an id being passed to the "
-                "signal handler. Are you using a compatible signal? Read the documentation for "
-                "graphene-django-cud for more information."
+            deleted_id = (
+                get_any_of(kwargs, ["pk", "raw_id", "input_id", "id"])
+                if not instance
+                else get_any_of(
+                    instance,
+                    [
+                        "pk",
+                        "id",
+                    ],
+                )
             )
-            return
 
-        new_deleted_id = cls.handle_object_deleted(sender, deleted_id, **kwargs)
+            if deleted_id is None:
+                logger.warning(
+                    "Received a delete signal for a model without an instance or an id being passed to the "
+                    "signal handler. Are you using a compatible signal? Read the documentation for "
+                    "graphene-django-cud for more information."
+                )
+                return
+
+            deleted_ids = [deleted_id]
+        else:
+            # Batch mutations return global ids, while the ids of single deletions are the primary keys.
+            deleted_ids = [disambiguate_id(deleted_id) for deleted_id in deleted_ids]
 
-        if new_deleted_id is not None:
-            deleted_id = new_deleted_id
+        published_ids = []
+        for deleted_id in deleted_ids:
+            new_deleted_id = cls.handle_object_deleted(sender, deleted_id, **kwargs)
+            published_ids.append(deleted_id if new_deleted_id is None else new_deleted_id)
 
-        # Notify all subscribers for the model
-        for subscriber in cls.subscribers.get(sender, []):
-            async_to_sync(subscriber)(deleted_id)
+        # Notify all subscribers for the model, in all processes
+        if published_ids:
+            cls.broadcast(published_ids)
 
     @classmethod
     def handle_object_deleted(cls, sender, deleted_id, **kwargs):
         """Handle and modify any instance created"""
         pass
 
+    @classmethod
+    def get_subscriber_registries(cls):
+        return [cls.subscribers[cls._meta.model]]
+
+    @classmethod
+    def get_event_key(cls, item):
+        # Events are deleted ids
+        return item
+
+    @classmethod
+    def get_replay_items(cls, entries, filter=None):
+        return [SubscriptionEvent(entry.event_id, entry.key) for entry in entries]
+
     @classmethod
     def check_permissions(cls, root, info, *args, **kwargs) -> None:
         return super().check_permissions(root, info, *args, **kwargs)
@@ -127,22 +159,21 @@ class DjangoDeleteSubscription(DjangoCudSubscriptionBase):
 
         cls.check_permissions(root, info, *args, **kwargs)
 
+        since = kwargs.pop("since", None)
         model = cls._meta.model
-        queue = asyncio.Queue()
+        subscriber = cls.create_subscriber()
 
-        # Ensure there's a list of subscribers for the model
-        if model not in cls.subscribers:
-            cls.subscribers[model] = []
-
-        # Add the queue's put method to the subscribers for this model
-        cls.subscribers[model].append(queue.put)
+        registry = cls.subscribers[model]
+        registry.add(subscriber)
 
         try:
-            while True:
-                # Wait for the next model instance to be deleted
-                _id = await queue.get()
-
-                yield cls(id=_id)
+            async for event_id, _id in cls.iterate_events(subscriber, since):
+                if _id is RESYNC_REQUIRED:
+                    yield cls.create_payload(event_id, resync_required=True)
+                elif cls._meta.coalesce_as_list:
+                    yield cls.create_payload(event_id, ids=_id)
+                else:
+                    yield cls.create_payload(event_id, id=_id)
         finally:
             # Clean up the subscriber when the subscription ends
-            cls.subscribers[model].remove(queue.put)
+            registry.remove(subscriber)
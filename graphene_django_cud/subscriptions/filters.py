@@ -0,0 +1,191 @@
+import enum
+import operator
+
+from django.core.exceptions import ValidationError
+from graphql import GraphQLError
+
+from graphene_django_cud.subscriptions.replay import get_event_changed_fields, unwrap_event
+from graphene_django_cud.util import disambiguate_id, disambiguate_ids, get_model_field_or_none, to_snake_case
+
+
+def _lower(value):
+    return str(value).lower()
+
+
+LOOKUP_OPERATORS = {
+    "exact": operator.eq,
+    "iexact": lambda actual, value: _lower(actual) == _lower(value),
+    "in": lambda actual, value: actual in value,
+    "contains": lambda actual, value: str(value) in str(actual),
+    "icontains": lambda actual, value: _lower(value) in _lower(actual),
+    "startswith": lambda actual, value: str(actual).startswith(str(value)),
+    "istartswith": lambda actual, value: _lower(actual).startswith(_lower(value)),
+    "endswith": lambda actual, value: str(actual).endswith(str(value)),
+    "iendswith": lambda actual, value: _lower(actual).endswith(_lower(value)),
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+STRING_LOOKUPS = ("iexact", "contains", "icontains", "startswith", "istartswith", "endswith", "iendswith")
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+class _FieldLookup:
+    """A lookup on a concrete field of the model, evaluated against the attribute of the instance."""
+
+    __slots__ = ("attname", "lookup", "value")
+
+    def __init__(self, attname, lookup, value):
+        self.attname = attname
+        self.lookup = lookup
+        self.value = value
+
+    def matches(self, instance):
+        actual = getattr(instance, self.attname, None)
+
+        if self.lookup == "isnull":
+            return (actual is None) == self.value
+
+        # As in SQL, nothing compares equal to null.
+        if actual is None:
+            return False
+
+        try:
+            return LOOKUP_OPERATORS[self.lookup](actual, self.value)
+        except TypeError:
+            return False
+
+
+class InstanceFilter:
+    """
+    Matches model instances against the values of subscription `filter_fields`, using the same
+    lookup syntax as `QuerySet.filter`.
+
+    Lookups on the fields of the model itself are evaluated in process, by `matches_event` with
+    `query=False` when events are published. Lookups traversing relations (e.g. ``owner__name``)
+    are evaluated where the events are consumed, with a single query per batch of events (see
+    `filter_by_query`), so publishing never queries the database.
+
+    If `watch_fields` is given, update events whose changed fields are known only match if one of
+    the watched fields has changed.
+    """
+
+    def __init__(self, model, filters, watch_fields=None):
+        self.model = model
+        self.field_lookups = []
+        self.query_lookups = {}
+        self.watch_fields = self.resolve_watch_fields(watch_fields) if watch_fields else None
+
+        for name, value in filters.items():
+            if value is None:
+                continue
+
+            try:
+                self.add_lookup(name, value)
+            except (ValidationError, ValueError, TypeError) as e:
+                raise GraphQLError(f"Invalid value for {name}: {e}")
+
+        # The first equality lookup on a field is used to index the subscriber.
+        self.index_item = next(
+            (
+                (lookup.attname, lookup.value)
+                for lookup in self.field_lookups
+                if lookup.lookup == "exact" and lookup.value.__hash__ is not None
+            ),
+            None,
+        )
+
+    def __bool__(self):
+        return bool(self.field_lookups or self.query_lookups or self.watch_fields)
+
+    def resolve_watch_fields(self, watch_fields):
+        field_names = set()
+        for name in watch_fields:
+            field = get_model_field_or_none(to_snake_case(name), self.model)
+            if field is None or not field.concrete or field.many_to_many:
+                raise GraphQLError(f"Invalid value for watch_fields: {name} is not a field of {self.model.__name__}")
+
+            field_names.add(field.name)
+
+        return frozenset(field_names)
+
+    def add_lookup(self, name, value):
+        value = _enum_value(value)
+        name_split = name.split("__")
+
+        lookup = "exact"
+        if len(name_split) > 1 and (name_split[-1] in LOOKUP_OPERATORS or name_split[-1] == "isnull"):
+            lookup = name_split.pop()
+
+        field = get_model_field_or_none(name_split[0], self.model)
+
+        if len(name_split) > 1 or field is None or not field.concrete or field.many_to_many:
+            self.query_lookups[name] = self.resolve_query_value(name_split, lookup, value)
+            return
+
+        if lookup == "isnull":
+            value = bool(value)
+        elif lookup not in STRING_LOOKUPS:
+            target_field = field.target_field if field.is_relation else field
+
+            def to_python(_value):
+                _value = disambiguate_id(_value) if field.is_relation else _enum_value(_value)
+                return target_field.to_python(_value)
+
+            value = tuple(to_python(_value) for _value in value) if lookup == "in" else to_python(value)
+
+        self.field_lookups.append(_FieldLookup(field.attname, lookup, value))
+
+    def resolve_query_value(self, name_split, lookup, value):
+        Model = self.model
+        field = None
+
+        for field_name in name_split:
+            field = get_model_field_or_none(field_name, Model)
+            if field is None or not field.is_relation:
+                break
+            Model = field.related_model
+
+        if field is None or not field.is_relation or lookup == "isnull":
+            return value
+
+        return disambiguate_ids(value) if lookup == "in" else disambiguate_id(value)
+
+    def matches_event(self, event, query=True):
+        """Returns True if the filter matches the event. With `query=False`, lookups needing a query are ignored."""
+        changed_fields = get_event_changed_fields(event)
+        if self.watch_fields and changed_fields is not None and self.watch_fields.isdisjoint(changed_fields):
+            return False
+
+        return self.matches(unwrap_event(event), query=query)
+
+    def matches(self, instance, query=True):
+        if not isinstance(instance, self.model):
+            return False
+
+        if not all(lookup.matches(instance) for lookup in self.field_lookups):
+            return False
+
+        if query and self.query_lookups:
+            return self.model._default_manager.filter(pk=instance.pk, **self.query_lookups).exists()
+
+        return True
+
+    def filter_by_query(self, events):
+        """
+        Returns the events whose instances match the lookups needing a query, with a single query. The other
+        lookups are expected to be matched already, e.g. by `matches_event` with `query=False`.
+        """
+        if not self.query_lookups or not events:
+            return list(events)
+
+        pks = {unwrap_event(event).pk for event in events}
+        matching_pks = set(
+            self.model._default_manager.filter(pk__in=pks, **self.query_lookups).values_list("pk", flat=True)
+        )
+        return [event for event in events if unwrap_event(event).pk in matching_pks]
@@ -0,0 +1,99 @@
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+EventLogEntry = namedtuple("EventLogEntry", ["seq", "event_id", "timestamp", "key"])
+
+
+class SubscriptionEvent:
+    """
+    An event published with the id it was given by the event log of the subscription, if any, and
+    the fields changed by an update, if known.
+    """
+
+    __slots__ = ("id", "item", "changed_fields")
+
+    def __init__(self, id, item, changed_fields=None):
+        self.id = id
+        self.item = item
+        self.changed_fields = changed_fields
+
+
+def unwrap_event(item):
+    return item.item if isinstance(item, SubscriptionEvent) else item
+
+
+def get_event_changed_fields(item):
+    return item.changed_fields if isinstance(item, SubscriptionEvent) else None
+
+
+class EventLog:
+    """
+    A ring buffer of the recent events of a subscription, holding the id, timestamp and key (the
+    primary key of the instance) of each event, bounded by `max_size` entries and `max_age` seconds.
+
+    Event ids have the form ``<epoch>-<sequence number>``, where the epoch identifies the log. Ids of
+    another log, for instance of another process or from before a restart, are treated as expired.
+    """
+
+    def __init__(self, max_size, max_age=None):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.max_age = max_age
+        self.entries = deque(maxlen=max_size)
+        self.next_seq = 1
+        self.lock = threading.Lock()
+
+    def format_event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id):
+        """Returns the sequence number of an event id of this log, or None."""
+        epoch, _, seq = str(event_id).rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+
+        return int(seq)
+
+    @property
+    def last_event_id(self):
+        return self.format_event_id(self.next_seq - 1)
+
+    def append(self, key):
+        """Logs an event, and returns its id."""
+        with self.lock:
+            seq = self.next_seq
+            self.next_seq += 1
+
+            event_id = self.format_event_id(seq)
+            self.entries.append(EventLogEntry(seq, event_id, time.time(), key))
+            return event_id
+
+    def prune(self):
+        if self.max_age is None:
+            return
+
+        expiry = time.time() - self.max_age
+        while self.entries and self.entries[0].timestamp < expiry:
+            self.entries.popleft()
+
+    def get_since(self, event_id):
+        """
+        Returns the entries of the events after `event_id`, or None if the cursor has expired, i.e. if
+        any event after it has already been evicted from the log.
+        """
+        seq = self.parse_event_id(event_id)
+        if seq is None:
+            return None
+
+        with self.lock:
+            self.prune()
+
+            if seq >= self.next_seq:
+                return None
+
+            first_seq = self.entries[0].seq if self.entries else self.next_seq
+            if seq < first_seq - 1:
+                return None
+
+            return [entry for entry in self.entries if entry.seq > seq]
@@ -0,0 +1,197 @@
+import asyncio
+from inspect import isawaitable
+
+import graphene
+from graphene.types.schema import normalize_execute_kwargs
+from graphql import ExecutionResult, GraphQLError, execute, located_error, parse, subscribe, validate
+from graphql.execution.collect_fields import collect_fields
+from graphql.execution.execute import ExecutionContext, assert_valid_execution_arguments, get_field_def
+from graphql.execution.values import get_argument_values
+from graphql.pyutils import Path
+
+from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase, Subscriber
+
+# Active groups, by event loop and fingerprint. Groups are only accessed from their own event loop.
+_groups = {}
+
+
+class _SourceError:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class SharedPayloadGroup:
+    """
+    Subscriptions with the same payload fingerprint, served by a single source event stream. Each
+    event is executed once, and the same `ExecutionResult` is put in the queue of every member.
+    """
+
+    def __init__(self, key, subscription, source, render):
+        self.key = key
+        self.subscription = subscription
+        self.source = source
+        self.render = render
+        self.members = {}
+        self.render_count = 0
+        self.task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        try:
+            async for payload in self.source:
+                result = await self.render(payload)
+                self.render_count += 1
+
+                for member in tuple(self.members):
+                    member.put(result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            for member in tuple(self.members):
+                member.put(_SourceError(error))
+        finally:
+            await self.source.aclose()
+
+    def add_member(self):
+        member = Subscriber(
+            max_queue_size=self.subscription._meta.max_queue_size,
+            overflow_policy=self.subscription._meta.queue_overflow_policy,
+        )
+        self.members[member] = None
+        return member
+
+    def remove_member(self, member):
+        self.members.pop(member, None)
+
+        if not self.members:
+            _groups.pop(self.key, None)
+            self.task.cancel()
+
+    async def iterate(self, member):
+        try:
+            while True:
+                result = await member.get()
+                if isinstance(result, _SourceError):
+                    raise result.error
+
+                yield result
+        finally:
+            self.remove_member(member)
+
+
+def _get_root_field(context):
+    schema = context.schema
+    root_type = schema.subscription_type
+    if root_type is None:
+        return None
+
+    root_fields = collect_fields(
+        schema, context.fragments, context.variable_values, root_type, context.operation.selection_set
+    )
+    response_name, field_nodes = next(iter(root_fields.items()))
+    field_def = get_field_def(schema, root_type, field_nodes[0])
+    if field_def is None:
+        return None
+
+    path = Path(None, response_name, root_type.name)
+    return field_def, field_nodes, context.build_resolve_info(field_def, field_nodes, root_type, path), path
+
+
+async def subscribe_with_shared_payloads(
+    schema,
+    document,
+    root_value=None,
+    context_value=None,
+    variable_values=None,
+    operation_name=None,
+    field_resolver=None,
+    subscribe_field_resolver=None,
+    max_coercion_errors=50,
+):
+    """
+    A replacement for `graphql.subscribe`. Subscriptions with the `share_payloads` meta option, and the
+    same payload fingerprint (see `DjangoCudSubscriptionBase.get_payload_fingerprint`), share a single
+    source event stream, and each event is executed once for all of them. Other subscriptions are
+    passed on to `graphql.subscribe`.
+    """
+    assert_valid_execution_arguments(schema, document, variable_values)
+
+    context = ExecutionContext.build(
+        schema,
+        document,
+        root_value,
+        context_value,
+        variable_values,
+        operation_name,
+        subscribe_field_resolver=subscribe_field_resolver,
+        max_coercion_errors=max_coercion_errors,
+    )
+
+    root_field = None if isinstance(context, list) else _get_root_field(context)
+    subscription = getattr(root_field[0].subscribe, "__self__", None) if root_field else None
+
+    if not (
+        isinstance(subscription, type)
+        and issubclass(subscription, DjangoCudSubscriptionBase)
+        and subscription._meta.share_payloads
+    ):
+        return await subscribe(
+            schema,
+            document,
+            root_value,
+            context_value,
+            variable_values,
+            operation_name,
+            field_resolver,
+            subscribe_field_resolver,
+            max_coercion_errors,
+        )
+
+    field_def, field_nodes, info, path = root_field
+
+    try:
+        args = get_argument_values(field_def, field_nodes[0], context.variable_values)
+
+        # The permissions of every member are checked, while the source stream is the one of the first member.
+        subscription.check_permissions(context.root_value, info, **args)
+        key = (asyncio.get_running_loop(), subscription.get_payload_fingerprint(context.root_value, info, **args))
+
+        group = _groups.get(key)
+        if group is None:
+
+            async def render(payload):
+                result = execute(
+                    schema, document, payload, context_value, variable_values, operation_name, field_resolver
+                )
+                return await result if isawaitable(result) else result
+
+            source = field_def.subscribe(context.root_value, info, **args)
+            group = _groups[key] = SharedPayloadGroup(key, subscription, source, render)
+    except Exception as error:
+        return ExecutionResult(data=None, errors=[located_error(error, field_nodes, path.as_list())])
+
+    return group.iterate(group.add_member())
+
+
+def get_shared_payload_groups():
+    """Returns the active shared payload groups of the current event loop."""
+    loop = asyncio.get_running_loop()
+    return [group for (group_loop, _), group in _groups.items() if group_loop is loop]
+
+
+class SharedPayloadSchema(graphene.Schema):
+    """A schema which executes subscriptions with `subscribe_with_shared_payloads`."""
+
+    async def subscribe(self, query, *args, **kwargs):
+        try:
+            document = parse(query)
+        except GraphQLError as error:
+            return ExecutionResult(data=None, errors=[error])
+
+        validation_errors = validate(self.graphql_schema, document)
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        kwargs = normalize_execute_kwargs(kwargs)
+        return await subscribe_with_shared_payloads(self.graphql_schema, document, *args, **kwargs)
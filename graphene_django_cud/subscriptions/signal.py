@@ -1,23 +1,30 @@
-import asyncio
 from typing import Optional
 
-from asgiref.sync import async_to_sync
 from django.dispatch import Signal
 from graphene import Field
 from graphene.types.objecttype import ObjectTypeOptions
 from graphene.types.utils import yank_fields_from_attrs
 
-from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase
+from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase, SubscriberRegistry
 
 
 class DjangoSignalSubscriptionOptions(ObjectTypeOptions):
     permissions = None
+    max_queue_size = None
+    queue_overflow_policy = None
+    share_payloads = False
+    coalesce_window_ms = None
+    coalesce_as_list = False
+    event_log = None
+    channel = None
     signal: Optional[Signal] = None
     sender = None
 
 
 class DjangoSignalSubscription(DjangoCudSubscriptionBase):
-    subscribers = set()
+    # The registries of active subscribers, by (signal, sender). Each subclass is given its own dictionary,
+    # so that a signal is only delivered to the subscribers of the subscriptions connected to it.
+    subscribers = {}
 
     @classmethod
     def __init_subclass_with_meta__(
@@ -35,6 +42,15 @@ class DjangoSignalSubscription(DjangoCudSubscriptionBase):
         if not signal:
             raise ValueError("You must specify a signal to subscribe to")
 
+        if kwargs.get("coalesce_as_list"):
+            raise ValueError("coalesce_as_list is not supported by DjangoSignalSubscription")
+
+        if kwargs.get("replay_buffer_size"):
+            raise ValueError("replay_buffer_size is not supported by DjangoSignalSubscription")
+
+        # Signal data has no key to be replayed by, regardless of the replay settings.
+        kwargs["replay_buffer_size"] = 0
+
         output = output or getattr(cls, "Output", None)
 
         if not output:
@@ -44,8 +60,11 @@ class DjangoSignalSubscription(DjangoCudSubscriptionBase):
                 fields.update(yank_fields_from_attrs(base.__dict__, _as=Field))
             output = cls
 
+        cls.subscribers = {(signal, sender): SubscriberRegistry()}
+
         _meta.permissions = permissions
         _meta.signal = signal
+        _meta.sender = sender
         _meta.output = output
 
         # Importantly, this needs to be set to either nothing or the identity.
@@ -64,11 +83,28 @@ class DjangoSignalSubscription(DjangoCudSubscriptionBase):
 
     @classmethod
     def handle_signal(cls, **kwargs):
-        data_item = {
-            **kwargs,
-        }
-        for subscriber in cls.subscribers:
-            async_to_sync(subscriber)(data_item)
+        # The signal itself cannot be serialized, and is added back when the data is received.
+        data_item = {key: value for key, value in kwargs.items() if key != "signal"}
+        cls.broadcast([data_item])
+
+    @classmethod
+    def receive_events(cls, events):
+        cls.get_subscriber_registry().publish_many(
+            [{"signal": cls._meta.signal, **data_item} for data_item in events]
+        )
+
+    @classmethod
+    def get_subscriber_registry(cls):
+        return cls.subscribers[(cls._meta.signal, cls._meta.sender)]
+
+    @classmethod
+    def get_subscriber_registries(cls):
+        return [cls.get_subscriber_registry()]
+
+    @classmethod
+    def get_event_key(cls, item):
+        # Signal data cannot be coalesced
+        return None
 
     @classmethod
     def transform_signal_data(cls, data):
@@ -81,17 +117,16 @@ class DjangoSignalSubscription(DjangoCudSubscriptionBase):
         """Subscribe to the model creation events asynchronously"""
         cls.check_permissions(root, info, *args, **kwargs)
 
-        queue = asyncio.Queue()
-
-        # Add the queue's put method to the subscribers for this model
-        cls.subscribers.add(queue.put)
+        subscriber = cls.create_subscriber()
+        registry = cls.get_subscriber_registry()
+        registry.add(subscriber)
 
         try:
             while True:
                 # Wait for the next signal to be fired.
-                signal_data = await queue.get()
+                signal_data = await subscriber.get()
                 data = cls.transform_signal_data(signal_data)
                 yield cls(**data)
         finally:
             # Clean up the subscriber when the subscription ends
-            cls.subscribers.remove(queue.put)
+            registry.remove(subscriber)
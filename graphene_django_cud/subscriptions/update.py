@@ -1,30 +1,58 @@
-import asyncio
 from collections import OrderedDict
 
 import graphene
-from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models.signals import post_save
+from graphene.types.generic import GenericScalar
 from graphene.types.objecttype import ObjectTypeOptions
 from graphene_django.registry import get_global_registry
 
 from graphene_django_cud.consts import USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS_KEY
 from graphene_django_cud.signals import post_update_mutation
-from graphene_django_cud.subscriptions.core import DjangoCudSubscriptionBase
-from graphene_django_cud.util import to_snake_case
+from graphene_django_cud.subscriptions.core import RESYNC_REQUIRED, DjangoCudSubscriptionBase, SubscriberRegistry
+from graphene_django_cud.subscriptions.replay import SubscriptionEvent, get_event_changed_fields, unwrap_event
+from graphene_django_cud.util import get_filter_fields_input_args, to_snake_case
+
+
+def _to_json_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    try:
+        return DjangoJSONEncoder().default(value)
+    except TypeError:
+        return str(value)
+
+
+class FieldChange(graphene.ObjectType):
+    """A field changed by an update, with its value before and after the update."""
+
+    field = graphene.String(required=True)
+    old_value = GenericScalar()
+    new_value = GenericScalar()
 
 
 class DjangoUpdateSubscriptionOptions(ObjectTypeOptions):
     model = None
     return_field_name = None
     permissions = None
+    filter_fields = None
+    arguments = None
+    include_changed_fields = False
+    max_queue_size = None
+    queue_overflow_policy = None
+    share_payloads = False
+    coalesce_window_ms = None
+    coalesce_as_list = False
+    event_log = None
+    channel = None
     signal = None
 
 
 class DjangoUpdateSubscription(DjangoCudSubscriptionBase):
-    # All active subscriptions are stored in this centralized dictionary.
-    # We need to do this to keep track of which subscriptions are listening to
-    # which signals.
+    # The registries of active subscribers, by model. Each subclass is given its own dictionary,
+    # so that the events of one subscription are never delivered to the subscribers of another.
     subscribers = {}
 
     @classmethod
@@ -34,6 +62,9 @@ class DjangoUpdateSubscription(DjangoCudSubscriptionBase):
         model=None,
         permissions=None,
         return_field_name=None,
+        filter_fields=(),
+        include_changed_fields=False,
+        coalesce_as_list=False,
         signal=post_update_mutation
         if getattr(settings, USE_MUTATION_SIGNALS_FOR_SUBSCRIPTIONS_KEY, False)
         else post_save,
@@ -45,17 +76,34 @@ class DjangoUpdateSubscription(DjangoCudSubscriptionBase):
         if not _meta:
             _meta = DjangoUpdateSubscriptionOptions(cls)
 
-        if not return_field_name:
-            return_field_name = to_snake_case(model.__name__)
-
         output_fields = OrderedDict()
-        output_fields[return_field_name] = graphene.Field(model_type)
+        if coalesce_as_list:
+            # Each payload is a list of instances
+            return_field_name = return_field_name or to_snake_case(model.__name__) + "s"
+            output_fields[return_field_name] = graphene.Field(graphene.List(model_type))
+        else:
+            return_field_name = return_field_name or to_snake_case(model.__name__)
+            output_fields[return_field_name] = graphene.Field(model_type)
+
+        if include_changed_fields:
+            if coalesce_as_list:
+                raise ValueError("include_changed_fields cannot be combined with coalesce_as_list")
+
+            output_fields["changed_fields"] = graphene.Field(graphene.List(graphene.NonNull(FieldChange)))
+
+        cls.subscribers = {model: SubscriberRegistry()}
 
         _meta.model = model
         _meta.model_type = model_type
         _meta.fields = output_fields
         _meta.output = cls
         _meta.permissions = permissions
+        _meta.filter_fields = filter_fields
+        _meta.include_changed_fields = include_changed_fields
+        _meta.arguments = {
+            **get_filter_fields_input_args(filter_fields, model),
+            "watch_fields": graphene.List(graphene.NonNull(graphene.String)),
+        }
 
         # Importantly, this needs to be set to either nothing or the identity.
         # Internally in graphene it will be defaulted to the identity function. If it
@@ -71,31 +119,65 @@ class DjangoUpdateSubscription(DjangoCudSubscriptionBase):
         # Connect to the model's post_save (or your custom) signal
         signal.connect(cls._model_updated_handler, sender=model)
 
-        super().__init_subclass_with_meta__(_meta=_meta, **kwargs)
+        super().__init_subclass_with_meta__(_meta=_meta, coalesce_as_list=coalesce_as_list, **kwargs)
 
     @classmethod
-    def _model_updated_handler(cls, sender, instance, created=None, **kwargs):
-        """Handle model updating and notify subscribers"""
-
-        if created is not None and not created:
+    def _model_updated_handler(
+        cls, sender, instance=None, created=None, instances=None, changed_fields=None, **kwargs
+    ):
+        """
+        Handle model updating and notify subscribers. The `instances` of a batch, as sent by
+        `post_batch_update_mutation`, are published together. The `changed_fields` sent by the
+        update mutations are published with the instances.
+        """
+
+        # post_save is sent for created instances as well
+        if created:
             return
 
-        new_instance = cls.handle_object_updated(sender, instance, **kwargs)
+        if instances is None:
+            instances, changed_fields = [instance], [changed_fields]
+        elif changed_fields is None:
+            changed_fields = [None] * len(instances)
+
+        updated_instances = []
+        for instance, instance_changed_fields in zip(instances, changed_fields):
+            new_instance = cls.handle_object_updated(sender, instance, **kwargs)
 
-        assert new_instance is None or isinstance(new_instance, cls._meta.model)
+            assert new_instance is None or isinstance(new_instance, cls._meta.model)
 
-        if new_instance:
-            instance = new_instance
+            instance = new_instance or instance
+            updated_instances.append(
+                instance
+                if instance_changed_fields is None
+                else SubscriptionEvent(None, instance, instance_changed_fields)
+            )
 
-        # Notify all subscribers for the model
-        for subscriber in cls.subscribers.get(sender, []):
-            async_to_sync(subscriber)(instance)
+        # Notify all subscribers for the model, in all processes
+        if updated_instances:
+            cls.broadcast(updated_instances)
 
     @classmethod
     def handle_object_updated(cls, sender, instance, **kwargs):
         """Handle and modify any instance created"""
         pass
 
+    @classmethod
+    def get_field_changes(cls, event):
+        """Returns the `FieldChange`s of an event, or None if the changed fields are not known."""
+        changed_fields = get_event_changed_fields(event)
+        if changed_fields is None:
+            return None
+
+        return [
+            FieldChange(field=name, old_value=_to_json_value(old_value), new_value=_to_json_value(new_value))
+            for name, (old_value, new_value) in changed_fields.items()
+        ]
+
+    @classmethod
+    def get_subscriber_registries(cls):
+        return [cls.subscribers[cls._meta.model]]
+
     @classmethod
     def check_permissions(cls, root, info, *args, **kwargs) -> None:
         return super().check_permissions(root, info, *args, **kwargs)
@@ -106,22 +188,28 @@ class DjangoUpdateSubscription(DjangoCudSubscriptionBase):
 
         cls.check_permissions(root, info, *args, **kwargs)
 
+        since = kwargs.pop("since", None)
         model = cls._meta.model
-        queue = asyncio.Queue()
-
-        # Ensure there's a list of subscribers for the model
-        if model not in cls.subscribers:
-            cls.subscribers[model] = []
+        subscriber = cls.create_subscriber(filter=cls.get_subscriber_filter(root, info, **kwargs))
 
-        # Add the queue's put method to the subscribers for this model
-        cls.subscribers[model].append(queue.put)
+        registry = cls.subscribers[model]
+        registry.add(subscriber)
 
         try:
-            while True:
-                # Wait for the next model instance to be updated
-                instance = await queue.get()
-                data = {cls._meta.return_field_name: instance}
-                yield cls(**data)
+            async for event_id, event in cls.iterate_events(subscriber, since, unwrap=False):
+                if event is RESYNC_REQUIRED:
+                    yield cls.create_payload(event_id, resync_required=True)
+                    continue
+
+                if cls._meta.coalesce_as_list:
+                    data = {cls._meta.return_field_name: [unwrap_event(item) for item in event]}
+                else:
+                    data = {cls._meta.return_field_name: unwrap_event(event)}
+
+                if cls._meta.include_changed_fields:
+                    data["changed_fields"] = cls.get_field_changes(event)
+
+                yield cls.create_payload(event_id, **data)
         finally:
             # Clean up the subscriber when the subscription ends
-            cls.subscribers[model].remove(queue.put)
+            registry.remove(subscriber)
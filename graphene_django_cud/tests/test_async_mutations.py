@@ -0,0 +1,398 @@
+import graphene
+from addict import Dict
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from graphene import Schema
+from graphql_relay import to_global_id
+
+from graphene_django_cud.mutations import (
+    DjangoBatchCreateMutation,
+    DjangoBatchDeleteMutation,
+    DjangoCreateMutation,
+    DjangoDeleteMutation,
+    DjangoFilterDeleteMutation,
+    DjangoFilterUpdateMutation,
+    DjangoPatchMutation,
+)
+from graphene_django_cud.signals import post_create_mutation
+from graphene_django_cud.tests.dummy_query import DummyQuery
+from graphene_django_cud.tests.factories import DogFactory, FishFactory, UserFactory
+from graphene_django_cud.tests.models import Dog, Fish
+
+
+def execute_async(schema, mutation, **kwargs):
+    return async_to_sync(schema.execute_async)(mutation, **kwargs)
+
+
+class TestAsyncMutations(TestCase):
+    def test__create_mutation__runs_mutate_async(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        calls = []
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+
+            @classmethod
+            async def before_mutate(cls, root, info, input):
+                calls.append("before_mutate")
+
+            @classmethod
+            async def before_save(cls, root, info, input, obj):
+                calls.append("before_save")
+
+            @classmethod
+            def after_mutate(cls, root, info, input, obj, return_data):
+                calls.append("after_mutate")
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        received = []
+
+        def receiver(sender, instance, **kwargs):
+            received.append(instance)
+
+        post_create_mutation.connect(receiver)
+        self.addCleanup(post_create_mutation.disconnect, receiver)
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation CreateFish(
+                $input: CreateFishInput!
+            ){
+                createFish(input: $input) {
+                    fish {
+                        id
+                        name
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"input": {"name": "Nemo"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual("Nemo", result.data["createFish"]["fish"]["name"])
+        self.assertEqual(["before_mutate", "before_save", "after_mutate"], calls)
+        self.assertEqual(1, len(received))
+        self.assertEqual(1, Fish.objects.filter(name="Nemo").count())
+
+    def test__create_mutation__login_required__raises_error(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                login_required = True
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation CreateFish(
+                $input: CreateFishInput!
+            ){
+                createFish(input: $input) {
+                    fish {
+                        id
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"input": {"name": "Nemo"}},
+            context_value=Dict(user=Dict(is_authenticated=False)),
+        )
+        self.assertIsNotNone(result.errors)
+        self.assertEqual(0, Fish.objects.count())
+
+    def test__patch_mutation__updates_object(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class PatchFishMutation(DjangoPatchMutation):
+            class Meta:
+                model = Fish
+
+        class Mutations(graphene.ObjectType):
+            patch_fish = PatchFishMutation.Field()
+
+        fish = FishFactory.create(name="Nemo")
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation PatchFish(
+                $id: ID!,
+                $input: PatchFishInput!
+            ){
+                patchFish(id: $id, input: $input) {
+                    fish {
+                        name
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"id": to_global_id("FishNode", fish.id), "input": {"name": "Dory"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual("Dory", result.data["patchFish"]["fish"]["name"])
+
+        fish.refresh_from_db()
+        self.assertEqual("Dory", fish.name)
+
+    def test__batch_create_mutation__creates_objects(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class BatchCreateFishMutation(DjangoBatchCreateMutation):
+            class Meta:
+                model = Fish
+
+        class Mutations(graphene.ObjectType):
+            batch_create_fish = BatchCreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation BatchCreateFish(
+                $input: [BatchCreateFishInput]!
+            ){
+                batchCreateFish(input: $input) {
+                    fishs {
+                        name
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"input": [{"name": "Nemo"}, {"name": "Dory"}]},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(2, Fish.objects.count())
+
+    def test__delete_mutation__deletes_object(self):
+        # This registers the DogNode type
+        from .schema import DogNode  # noqa: F401
+
+        class DeleteDogMutation(DjangoDeleteMutation):
+            class Meta:
+                model = Dog
+
+        class Mutations(graphene.ObjectType):
+            delete_dog = DeleteDogMutation.Field()
+
+        dog = DogFactory.create()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation DeleteDog(
+                $id: ID!
+            ){
+                deleteDog(id: $id) {
+                    found
+                    deletedId
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"id": to_global_id("DogNode", dog.id)},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertTrue(result.data["deleteDog"]["found"])
+        self.assertFalse(Dog.objects.filter(pk=dog.pk).exists())
+
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"id": to_global_id("DogNode", dog.id)},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertFalse(result.data["deleteDog"]["found"])
+
+    def test__batch_delete_mutation__deletes_objects(self):
+        # This registers the DogNode type
+        from .schema import DogNode  # noqa: F401
+
+        class BatchDeleteDogMutation(DjangoBatchDeleteMutation):
+            class Meta:
+                model = Dog
+
+        class Mutations(graphene.ObjectType):
+            batch_delete_dog = BatchDeleteDogMutation.Field()
+
+        dogs = DogFactory.create_batch(2)
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation BatchDeleteDog(
+                $ids: [ID]!
+            ){
+                batchDeleteDog(ids: $ids) {
+                    deletedIds
+                    missedIds
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"ids": [to_global_id("DogNode", dog.id) for dog in dogs] + [to_global_id("DogNode", 0)]},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(2, len(result.data["batchDeleteDog"]["deletedIds"]))
+        self.assertEqual(1, len(result.data["batchDeleteDog"]["missedIds"]))
+        self.assertEqual(0, Dog.objects.count())
+
+    def test__filter_update_and_delete_mutations__use_async_orm(self):
+        # This registers the DogNode type
+        from .schema import DogNode  # noqa: F401
+
+        class FilterUpdateDogMutation(DjangoFilterUpdateMutation):
+            class Meta:
+                model = Dog
+                filter_fields = ("name__startswith",)
+
+        class FilterDeleteDogMutation(DjangoFilterDeleteMutation):
+            class Meta:
+                model = Dog
+                filter_fields = ("tag",)
+
+        class Mutations(graphene.ObjectType):
+            filter_update_dogs = FilterUpdateDogMutation.Field()
+            filter_delete_dogs = FilterDeleteDogMutation.Field()
+
+        DogFactory.create(name="Simen")
+        DogFactory.create(name="Tormod")
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        result = execute_async(
+            schema,
+            """
+            mutation FilterUpdateDog(
+                $filter: FilterUpdateDogFilterInput!,
+                $data: FilterUpdateDogDataInput!
+            ){
+                filterUpdateDogs(filter: $filter, data: $data){
+                    updatedCount
+                    updatedObjects{
+                        tag
+                    }
+                }
+            }
+            """,
+            variables={"filter": {"name_Startswith": "Sim"}, "data": {"tag": "Sim-1"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(1, result.data["filterUpdateDogs"]["updatedCount"])
+        self.assertEqual("Sim-1", result.data["filterUpdateDogs"]["updatedObjects"][0]["tag"])
+
+        result = execute_async(
+            schema,
+            """
+            mutation FilterDeleteDog(
+                $input: BatchDeleteDogInput!
+            ){
+                filterDeleteDogs(input: $input){
+                    deletionCount
+                    deletedIds
+                }
+            }
+            """,
+            variables={"input": {"tag": "Sim-1"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(1, result.data["filterDeleteDogs"]["deletionCount"])
+        self.assertEqual(["Tormod"], list(Dog.objects.values_list("name", flat=True)))
+
+    def test__custom_sync_mutate__is_run_in_thread(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+
+            @classmethod
+            def mutate(cls, root, info, input):
+                return cls(fish=Fish.objects.create(name=input["name"].upper()))
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation CreateFish(
+                $input: CreateFishInput!
+            ){
+                createFish(input: $input) {
+                    fish {
+                        name
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"input": {"name": "Nemo"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual("NEMO", result.data["createFish"]["fish"]["name"])
+
+    def test__create_mutation__over_query_budget__is_aborted(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                max_queries = 0
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation CreateFish(
+                $input: CreateFishInput!
+            ){
+                createFish(input: $input) {
+                    fish {
+                        id
+                    }
+                }
+            }
+        """
+        result = execute_async(
+            schema,
+            mutation,
+            variables={"input": {"name": "Nemo"}},
+            context_value=Dict(user=UserFactory.create()),
+        )
+        self.assertEqual(1, len(result.errors))
+        self.assertIn("exceeded its budget of 0 database queries", result.errors[0].message)
+        self.assertFalse(Fish.objects.filter(name="Nemo").exists())
@@ -1,6 +1,10 @@
+import threading
+
 import graphene
 from addict import Dict
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
 from graphene import Schema
 from graphql_relay import to_global_id
 
@@ -211,3 +215,198 @@ class TestBatchUpdateMutation(TestCase):
         second_mouse_predators = list(map(lambda edge: edge.node, second_mouse.predators.edges))
         self.assertEqual(1, len(second_mouse_predators))
         self.assertEqual(to_global_id("CatNode", cat_two.id), second_mouse_predators[0].id)
+
+
+SKIP_LOCKED_MUTATION = """
+    mutation BatchUpdateMouse(
+        $input: [BatchUpdateMouseLockingInput]!
+    ){
+        batchUpdateMouse(input: $input){
+            mouses{
+                name
+            }
+            skippedIds
+        }
+    }
+"""
+
+
+class TestBatchUpdateMutationLocking(TestCase):
+    def setUp(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        self.user = UserFactory.create()
+        self.mouse_one = MouseFactory.create(name="Mickey")
+        self.mouse_two = MouseFactory.create(name="Minnie")
+
+    def test_select_for_update__nowait_and_skip_locked__raises(self):
+        with self.assertRaises(Exception):
+
+            class BatchUpdateMouseMutation(DjangoBatchUpdateMutation):
+                class Meta:
+                    model = Mouse
+                    type_name = "BatchUpdateMouseLockingInput"
+                    select_for_update_nowait = True
+                    select_for_update_skip_locked = True
+
+    def test_mutate__rows_given_out_of_order__locks_rows_in_pk_order_with_single_query(self):
+        class BatchUpdateMouseMutation(DjangoBatchUpdateMutation):
+            class Meta:
+                model = Mouse
+                type_name = "BatchUpdateMouseLockingInput"
+                use_select_for_update = True
+
+        class Mutations(graphene.ObjectType):
+            batch_update_mouse = BatchUpdateMouseMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation BatchUpdateMouse(
+                $input: [BatchUpdateMouseLockingInput]!
+            ){
+                batchUpdateMouse(input: $input){
+                    mouses{
+                        name
+                    }
+                }
+            }
+        """
+
+        with CaptureQueriesContext(connection) as context:
+            result = schema.execute(
+                mutation,
+                variables={
+                    "input": [
+                        {"id": to_global_id("MouseNode", self.mouse_two.id), "name": "Minnie 2"},
+                        {"id": to_global_id("MouseNode", self.mouse_one.id), "name": "Mickey 2"},
+                    ]
+                },
+                context=Dict(user=self.user),
+            )
+        self.assertIsNone(result.errors)
+
+        lock_queries = [query["sql"] for query in context.captured_queries if "IN (" in query["sql"]]
+        self.assertEqual(1, len(lock_queries))
+        self.assertIn("ORDER BY", lock_queries[0])
+
+        self.mouse_one.refresh_from_db()
+        self.mouse_two.refresh_from_db()
+        self.assertEqual("Mickey 2", self.mouse_one.name)
+        self.assertEqual("Minnie 2", self.mouse_two.name)
+
+    def test_mutate__default_options__does_not_lock_rows(self):
+        class BatchUpdateMouseMutation(DjangoBatchUpdateMutation):
+            class Meta:
+                model = Mouse
+                type_name = "BatchUpdateMouseLockingInput"
+
+        class Mutations(graphene.ObjectType):
+            batch_update_mouse = BatchUpdateMouseMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        with CaptureQueriesContext(connection) as context:
+            result = schema.execute(
+                """
+                mutation BatchUpdateMouse($input: [BatchUpdateMouseLockingInput]!){
+                    batchUpdateMouse(input: $input){
+                        mouses{
+                            name
+                        }
+                    }
+                }
+                """,
+                variables={"input": [{"id": to_global_id("MouseNode", self.mouse_one.id), "name": "Mickey 2"}]},
+                context=Dict(user=self.user),
+            )
+        self.assertIsNone(result.errors)
+        self.assertFalse(any("IN (" in query["sql"] for query in context.captured_queries))
+
+    def test_mutate__skip_locked_and_row_missing__raises(self):
+        class BatchUpdateMouseMutation(DjangoBatchUpdateMutation):
+            class Meta:
+                model = Mouse
+                type_name = "BatchUpdateMouseLockingInput"
+                select_for_update_skip_locked = True
+
+        class Mutations(graphene.ObjectType):
+            batch_update_mouse = BatchUpdateMouseMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        result = schema.execute(
+            SKIP_LOCKED_MUTATION,
+            variables={
+                "input": [
+                    {"id": to_global_id("MouseNode", self.mouse_one.id), "name": "Mickey 2"},
+                    {"id": to_global_id("MouseNode", self.mouse_two.id + 1000), "name": "Nobody"},
+                ]
+            },
+            context=Dict(user=self.user),
+        )
+        self.assertEqual(1, len(result.errors))
+        self.assertIn("does not exist", result.errors[0].message)
+
+        self.mouse_one.refresh_from_db()
+        self.assertEqual("Mickey", self.mouse_one.name)
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class TestBatchUpdateMutationSkipLocked(TransactionTestCase):
+    def test_mutate__row_locked_by_other_connection__reports_skipped_ids(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        user = UserFactory.create()
+        mouse_one = MouseFactory.create(name="Mickey")
+        mouse_two = MouseFactory.create(name="Minnie")
+
+        class BatchUpdateMouseMutation(DjangoBatchUpdateMutation):
+            class Meta:
+                model = Mouse
+                type_name = "BatchUpdateMouseLockingInput"
+                select_for_update_skip_locked = True
+
+        class Mutations(graphene.ObjectType):
+            batch_update_mouse = BatchUpdateMouseMutation.Field()
+
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            # Threads have their own database connection.
+            try:
+                with transaction.atomic():
+                    list(Mouse.objects.filter(pk=mouse_two.pk).select_for_update())
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(10))
+
+            schema = Schema(query=DummyQuery, mutation=Mutations)
+            result = schema.execute(
+                SKIP_LOCKED_MUTATION,
+                variables={
+                    "input": [
+                        {"id": to_global_id("MouseNode", mouse_one.id), "name": "Mickey 2"},
+                        {"id": to_global_id("MouseNode", mouse_two.id), "name": "Minnie 2"},
+                    ]
+                },
+                context=Dict(user=user),
+            )
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertIsNone(result.errors)
+
+        data = Dict(result.data)
+        self.assertEqual(["Mickey 2"], [mouse.name for mouse in data.batchUpdateMouse.mouses])
+        self.assertEqual([to_global_id("MouseNode", mouse_two.id)], data.batchUpdateMouse.skippedIds)
+
+        mouse_two.refresh_from_db()
+        self.assertEqual("Minnie", mouse_two.name)
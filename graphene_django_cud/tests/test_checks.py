@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+import graphene
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+from graphene_django.registry import get_global_registry
+
+from graphene_django_cud import converter
+from graphene_django_cud.checks import check_input_type_references
+from graphene_django_cud.util import lazy
+from graphene_django_cud.util.lazy import create_input_type, warm_up
+
+
+class TestCheckInputTypeReferences(SimpleTestCase):
+    def setUp(self):
+        patcher = patch.object(lazy, "_input_type_references", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(GRAPHENE={})
+    def test__missing_input_types__are_all_reported(self):
+        converter.create_dynamic_reference("CheckMissingInput", "", False)
+        converter.create_dynamic_reference("CheckOtherMissingInput", "", True, many=True)
+
+        errors = check_input_type_references()
+
+        self.assertEqual([error.id for error in errors], ["graphene_django_cud.E001"] * 2)
+        self.assertEqual([error.obj for error in errors], ["CheckMissingInput", "CheckOtherMissingInput"])
+
+    @override_settings(GRAPHENE={})
+    def test__lazy_input_types__are_built_and_resolved(self):
+        built = []
+
+        def build():
+            InputType = type("CheckLazyInput", (graphene.InputObjectType,), {"name": graphene.String()})
+            get_global_registry().register_converted_field("CheckLazyInput", InputType)
+            built.append(InputType)
+            return InputType
+
+        create_input_type("CheckLazyInput", build, lazy=True)
+        converter.create_dynamic_reference("CheckLazyInput", "", False)
+
+        self.assertEqual(check_input_type_references(), [])
+        self.assertEqual(len(built), 1)
+
+    @override_settings(GRAPHENE={"SCHEMA": "graphene_django_cud.tests.missing_schema.schema"})
+    def test__schema_import_error__is_reported(self):
+        converter.create_dynamic_reference("CheckMissingInput", "", False)
+
+        errors = check_input_type_references()
+
+        self.assertEqual([error.id for error in errors], ["graphene_django_cud.E002", "graphene_django_cud.E001"])
+
+
+class TestWarmUp(SimpleTestCase):
+    def setUp(self):
+        patcher = patch.object(lazy, "_lazy_input_types", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(GRAPHENE={"SCHEMA": "graphene_django_cud.tests.schema.schema"})
+    def test__warm_up__imports_schema_and_builds_lazy_input_types(self):
+        built = []
+
+        def build():
+            InputType = type("WarmUpLazyInput", (graphene.InputObjectType,), {"name": graphene.String()})
+            get_global_registry().register_converted_field("WarmUpLazyInput", InputType)
+            built.append(InputType)
+            return InputType
+
+        create_input_type("WarmUpLazyInput", build, lazy=True)
+
+        with patch.object(lazy, "import_string") as import_string:
+            warm_up()
+
+        import_string.assert_called_once_with("graphene_django_cud.tests.schema.schema")
+        self.assertEqual(len(built), 1)
+
+    @override_settings(GRAPHENE={"SCHEMA": "graphene_django_cud.tests.missing_schema.schema"})
+    def test__schema_import_error__is_logged(self):
+        with self.assertLogs("graphene_django_cud.util.lazy", "WARNING"):
+            warm_up()
+
+    def test__ready__warms_up_with_setting(self):
+        app_config = apps.get_app_config("graphene_django_cud")
+
+        with patch.object(lazy, "warm_up") as mock_warm_up:
+            app_config.ready()
+            mock_warm_up.assert_not_called()
+
+            with override_settings(GRAPHENE_DJANGO_CUD_WARM_UP_ON_READY=True):
+                app_config.ready()
+
+            mock_warm_up.assert_called_once_with()
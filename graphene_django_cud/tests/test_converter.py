@@ -1,9 +1,13 @@
+from unittest.mock import patch
+
 import graphene
 from django.db import models
 from django.test import TestCase
 from graphene_django.registry import get_global_registry
 
+from graphene_django_cud import converter
 from graphene_django_cud.converter import (
+    clear_conversion_cache,
     convert_choices_field,
     convert_django_field_with_choices,
     convert_django_field_to_input,
@@ -115,3 +119,90 @@ class ConvertDjangoFieldWithChoices(TestCase):
         result = convert_django_field_with_choices(field, registry=registry)
 
         self.assertIsInstance(result, graphene.types.ID)
+
+
+class TestConversionCache(TestCase):
+    def test__same_field_converted_twice__is_converted_once_with_new_creation_counters(self):
+        class MockCachedModel(models.Model):
+            name = models.CharField(max_length=16)
+
+        registry = get_global_registry()
+        field = MockCachedModel._meta.get_field("name")
+
+        with patch.object(
+            converter, "_convert_django_field_with_choices", wraps=converter._convert_django_field_with_choices
+        ) as convert:
+            first = convert_django_field_with_choices(field, registry)
+            second = convert_django_field_with_choices(field, registry)
+            optional = convert_django_field_with_choices(field, registry, required=False)
+
+        self.assertEqual(convert.call_count, 2)
+        self.assertIsInstance(second, graphene.String)
+        self.assertIsNot(first, second)
+        self.assertLess(first.creation_counter, second.creation_counter)
+        self.assertEqual(second.kwargs.get("required"), True)
+        self.assertEqual(optional.kwargs.get("required"), False)
+
+    def test__choices_field__enum_is_reused_by_name(self):
+        class MockCachedChoicesModel(models.Model):
+            field_with_choices = models.CharField(max_length=16, choices=(("A", "Choice a"), ("B", "Choice b")))
+
+        registry = get_global_registry()
+        field = MockCachedChoicesModel._meta.get_field("field_with_choices")
+
+        first = convert_django_field_with_choices(field, registry)
+        clear_conversion_cache()
+        second = convert_django_field_with_choices(field, registry, required=False)
+
+        self.assertIs(type(first), type(second))
+        self.assertEqual(second.kwargs.get("required"), False)
+
+    def test__modifying_converted_field__does_not_change_later_conversions(self):
+        class MockCopiedModel(models.Model):
+            name = models.CharField(max_length=16)
+            tags = models.ManyToManyField("self")
+
+        registry = get_global_registry()
+        name_field = MockCopiedModel._meta.get_field("name")
+        tags_field = MockCopiedModel._meta.get_field("tags")
+
+        first = convert_django_field_with_choices(name_field, registry)
+        first.kwargs["description"] = "Changed"
+        first_tags = convert_django_field_with_choices(tags_field, registry)
+        first_tags.kwargs["description"] = "Changed"
+
+        second = convert_django_field_with_choices(name_field, registry)
+        second_tags = convert_django_field_with_choices(tags_field, registry)
+
+        self.assertNotEqual(second.kwargs.get("description"), "Changed")
+        self.assertNotEqual(second_tags.kwargs.get("description"), "Changed")
+        self.assertIsNot(first_tags.kwargs, second_tags.kwargs)
+
+    def test__nested_structure__is_created_anew(self):
+        converted = graphene.List(graphene.NonNull(graphene.String), required=True)
+
+        created = converter._get_conversion_factory(converted)()
+
+        self.assertIsInstance(created, graphene.List)
+        self.assertIsInstance(created.of_type, graphene.NonNull)
+        self.assertIsNot(converted.of_type, created.of_type)
+        self.assertIs(created.of_type.of_type, graphene.String)
+        self.assertEqual(created.kwargs, {"required": True})
+        self.assertIsNot(converted.kwargs, created.kwargs)
+
+    def test__cache_over_max_size__evicts_oldest_conversions(self):
+        class MockEvictedModel(models.Model):
+            first = models.CharField(max_length=16)
+            second = models.CharField(max_length=16)
+            third = models.CharField(max_length=16)
+
+        registry = get_global_registry()
+        clear_conversion_cache()
+
+        with patch.object(converter, "CONVERSION_CACHE_MAX_SIZE", 2):
+            for name in ("first", "second", "third"):
+                convert_django_field_with_choices(MockEvictedModel._meta.get_field(name), registry)
+
+            self.assertEqual(2, len(converter._conversion_cache))
+            cached_fields = {field for field, _ in converter._conversion_cache.values()}
+            self.assertNotIn(MockEvictedModel._meta.get_field("first"), cached_fields)
@@ -1,11 +1,14 @@
+import threading
 from unittest.mock import patch
 
 import graphene
 from addict import Dict
 from django.conf import settings
-from django.test import TestCase
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
 from graphene import ResolveInfo
 from graphene import Schema
+from graphene_django.registry import get_global_registry
 from graphql_relay import to_global_id
 
 from graphene_django_cud.mutations import DjangoCreateMutation
@@ -18,6 +21,8 @@ from graphene_django_cud.tests.factories import (
 )
 from graphene_django_cud.tests.models import User, Cat, Dog, DogRegistration, Fish, Mouse
 from graphene_django_cud.util import disambiguate_id
+from graphene_django_cud.util.lazy import create_input_type, is_lazy_input_type
+from graphene_django_cud.util.transaction import retry_safe
 
 
 def mock_info(context=None):
@@ -1115,3 +1120,321 @@ class TestCreateUuidPk(TestCase):
         cat = Cat.objects.get(pk=disambiguate_id(data.createCat.cat.id))
         self.assertEqual(cat.owner.id, user.id)
         self.assertEqual(cat.name, "Felix")
+
+
+class TestCreateMutationLazyInputTypes(TestCase):
+    def test__lazy_input_types__are_built_with_schema(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        registry = get_global_registry()
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                type_name = "LazyCreateFishInput"
+                lazy_input_types = True
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        self.assertIsNone(registry.get_converted_field("LazyCreateFishInput"))
+        self.assertTrue(is_lazy_input_type(CreateFishMutation._meta.InputType))
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        self.assertIs(CreateFishMutation._meta.InputType(), registry.get_converted_field("LazyCreateFishInput"))
+
+        result = schema.execute(
+            """
+            mutation CreateFish($input: LazyCreateFishInput!){
+                createFish(input: $input) {
+                    fish {
+                        name
+                    }
+                }
+            }
+            """,
+            variables={"input": {"name": "Nemo"}},
+            context=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual("Nemo", result.data["createFish"]["fish"]["name"])
+
+    def test__lazy_input_type__is_built_once_across_threads(self):
+        build_count = []
+
+        def build():
+            build_count.append(1)
+            return object()
+
+        lazy_input_type = create_input_type("ThreadedLazyInput", build, lazy=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(lazy_input_type())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(build_count))
+        self.assertEqual(1, len({id(result) for result in results}))
+
+
+class TestCreateMutationQueryBudget(TestCase):
+    def get_schema(self, budget, query_counts=None):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class CreateMouseMutation(DjangoCreateMutation):
+            class Meta:
+                model = Mouse
+                max_queries = budget
+
+            @classmethod
+            def after_mutate(cls, root, info, input, obj, return_data):
+                if query_counts is not None:
+                    query_counts.append(cls.get_query_count())
+
+        class Mutations(graphene.ObjectType):
+            create_mouse = CreateMouseMutation.Field()
+
+        return Schema(query=DummyQuery, mutation=Mutations)
+
+    def execute(self, schema, predators):
+        return schema.execute(
+            """
+            mutation CreateMouse($input: CreateMouseInput!){
+                createMouse(input: $input){
+                    mouse{
+                        name
+                    }
+                }
+            }
+            """,
+            variables={
+                "input": {"name": "Mickey", "predators": [to_global_id("CatNode", cat.id) for cat in predators]}
+            },
+            context=Dict(user=UserFactory.create()),
+        )
+
+    def test__mutation_within_budget__reports_query_count(self):
+        query_counts = []
+        schema = self.get_schema(20, query_counts)
+
+        result = self.execute(schema, CatFactory.create_batch(2))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(query_counts), 1)
+        self.assertGreater(query_counts[0], 0)
+        self.assertLessEqual(query_counts[0], 20)
+
+    def test__mutation_over_budget__is_aborted(self):
+        schema = self.get_schema(3)
+
+        result = self.execute(schema, CatFactory.create_batch(5))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("exceeded its budget of 3 database queries", result.errors[0].message)
+        self.assertFalse(Mouse.objects.filter(name="Mickey").exists())
+
+    @override_settings(GRAPHENE_DJANGO_CUD_MAX_QUERIES=3)
+    def test__max_queries_setting__is_used_by_default(self):
+        schema = self.get_schema(None)
+
+        result = self.execute(schema, CatFactory.create_batch(5))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertFalse(Mouse.objects.filter(name="Mickey").exists())
+
+
+class TestCreateMutationCostLimits(TestCase):
+    def get_schema(self, statements=None, rows=None, estimates=None):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class CreateMouseMutation(DjangoCreateMutation):
+            class Meta:
+                model = Mouse
+                max_estimated_statements = statements
+                max_estimated_rows = rows
+
+            @classmethod
+            def before_mutate(cls, root, info, input):
+                if estimates is not None:
+                    estimates.append(cls.get_cost_estimate())
+
+        class Mutations(graphene.ObjectType):
+            create_mouse = CreateMouseMutation.Field()
+
+        return Schema(query=DummyQuery, mutation=Mutations)
+
+    def execute(self, schema, predators):
+        return schema.execute(
+            """
+            mutation CreateMouse($input: CreateMouseInput!){
+                createMouse(input: $input){
+                    mouse{
+                        name
+                    }
+                }
+            }
+            """,
+            variables={
+                "input": {"name": "Mickey", "predators": [to_global_id("CatNode", cat.id) for cat in predators]}
+            },
+            context=Dict(user=UserFactory.create()),
+        )
+
+    def test__mutation_within_limits__estimate_is_available_in_before_mutate(self):
+        estimates = []
+        schema = self.get_schema(statements=20, estimates=estimates)
+
+        result = self.execute(schema, CatFactory.create_batch(5))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(len(estimates), 1)
+        # Saving the mouse, setting its predators, and looking up and linking each predator
+        self.assertEqual(estimates[0].statements, 7)
+        self.assertEqual(estimates[0].rows, 6)
+
+    def test__mutation_over_limit__is_rejected_before_it_runs(self):
+        estimates = []
+        schema = self.get_schema(statements=5, estimates=estimates)
+
+        result = self.execute(schema, CatFactory.create_batch(5))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("estimated to run 7 database statements, more than the limit of 5", result.errors[0].message)
+        self.assertEqual(estimates, [])
+        self.assertFalse(Mouse.objects.filter(name="Mickey").exists())
+
+    @override_settings(GRAPHENE_DJANGO_CUD_MAX_ESTIMATED_ROWS=3)
+    def test__max_estimated_rows_setting__is_used_by_default(self):
+        schema = self.get_schema()
+
+        result = self.execute(schema, CatFactory.create_batch(5))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("estimated to write 6 database rows, more than the limit of 3", result.errors[0].message)
+        self.assertFalse(Mouse.objects.filter(name="Mickey").exists())
+
+
+class TestCreateMutationTransactionRetry(TransactionTestCase):
+    mutation = """
+        mutation CreateFish(
+            $input: CreateFishInput!
+        ){
+            createFish(input: $input) {
+                fish {
+                    id
+                    name
+                }
+            }
+        }
+    """
+
+    @patch("graphene_django_cud.util.transaction.time.sleep")
+    def test__transient_error_in_retry_safe_hook__retries_transaction(self, sleep):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        attempts = []
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                transaction_max_attempts = 3
+
+            @classmethod
+            @retry_safe
+            def before_save(cls, root, info, input, obj):
+                attempts.append(obj.pk)
+                if len(attempts) < 3:
+                    raise OperationalError("database is locked")
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        result = schema.execute(
+            self.mutation,
+            variables={"input": {"name": "Nemo"}},
+            context=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(3, len(attempts))
+        self.assertEqual(2, sleep.call_count)
+
+        # The rows created by the failed attempts were rolled back
+        self.assertEqual(1, Fish.objects.count())
+
+    @patch("graphene_django_cud.util.transaction.time.sleep")
+    def test__transient_error_with_custom_permissions__retries_transaction(self, sleep):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        attempts = []
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                transaction_max_attempts = 3
+
+            @classmethod
+            def check_permissions(cls, root, info, input):
+                return None
+
+            @classmethod
+            @retry_safe
+            def before_save(cls, root, info, input, obj):
+                attempts.append(obj.pk)
+                if len(attempts) < 2:
+                    raise OperationalError("database is locked")
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        self.assertEqual([], CreateFishMutation.get_retry_unsafe_hooks())
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        result = schema.execute(
+            self.mutation,
+            variables={"input": {"name": "Nemo"}},
+            context=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(2, len(attempts))
+        self.assertEqual(1, sleep.call_count)
+        self.assertEqual(1, Fish.objects.count())
+
+    @patch("graphene_django_cud.util.transaction.time.sleep")
+    def test__transient_error_in_unmarked_hook__is_not_retried(self, sleep):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        attempts = []
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+                transaction_max_attempts = 3
+
+            @classmethod
+            def before_save(cls, root, info, input, obj):
+                attempts.append(obj.pk)
+                raise OperationalError("database is locked")
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        with self.assertWarns(UserWarning):
+            result = schema.execute(
+                self.mutation,
+                variables={"input": {"name": "Nemo"}},
+                context=Dict(user=UserFactory.create()),
+            )
+
+        self.assertIsNotNone(result.errors)
+        self.assertEqual(1, len(attempts))
+        self.assertEqual(0, sleep.call_count)
+        self.assertEqual(0, Fish.objects.count())
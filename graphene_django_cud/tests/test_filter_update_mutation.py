@@ -1,6 +1,6 @@
 import graphene
 from addict import Dict
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from graphene import Schema
 
 from graphene_django_cud.mutations.filter_update import DjangoFilterUpdateMutation
@@ -59,3 +59,53 @@ class TestFilterUpdateMutation(TestCase):
 
         dog.refresh_from_db()
         self.assertEqual("New tag", dog.tag)
+
+    @override_settings(GRAPHENE_DJANGO_CUD_MAX_ESTIMATED_ROWS=10)
+    def test__unbounded_filter__is_rejected_under_max_estimated_rows(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class FilterUpdateDogMutation(DjangoFilterUpdateMutation):
+            class Meta:
+                model = Dog
+                filter_fields = ("id__in", "name__startswith")
+
+        class Mutations(graphene.ObjectType):
+            filter_update_dogs = FilterUpdateDogMutation.Field()
+
+        dog = DogFactory.create(name="Simen", tag="Old tag")
+        user = UserFactory.create()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation FilterUpdateDog(
+                $filter: FilterUpdateDogFilterInput!,
+                $data: FilterUpdateDogDataInput!
+            ){
+                filterUpdateDogs(filter: $filter, data: $data){
+                    updatedCount
+                }
+            }
+        """
+
+        for filter in ({}, {"name_Startswith": "Sim"}):
+            result = schema.execute(
+                mutation,
+                variables={"filter": filter, "data": {"tag": "New tag"}},
+                context=Dict(user=user),
+            )
+
+            self.assertIsNotNone(result.errors)
+            self.assertIn("may write any number of database rows", result.errors[0].message)
+
+        dog.refresh_from_db()
+        self.assertEqual("Old tag", dog.tag)
+
+        result = schema.execute(
+            mutation,
+            variables={"filter": {"id_In": [dog.id]}, "data": {"tag": "New tag"}},
+            context=Dict(user=user),
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(1, result.data["filterUpdateDogs"]["updatedCount"])
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules which must not be imported as a side effect of importing the package.
+HEAVY_MODULES = ("requests", "luna_ws", "django_ws", "channels", "redis", "uvicorn")
+
+# The entry points of the development project, which are not part of the library.
+PROJECT_MODULES = ("graphene_django_cud.asgi", "graphene_django_cud.urls", "graphene_django_cud.ws_urls")
+
+
+class TestImportWeight(SimpleTestCase):
+    def get_imported_modules(self):
+        """Imports every module of the package in a new interpreter, and returns all modules imported."""
+        code = (
+            "import django, json, pkgutil, sys; django.setup(); import graphene_django_cud; "
+            "[__import__(module.name) for module in pkgutil.walk_packages(graphene_django_cud.__path__, "
+            f"'graphene_django_cud.') if '.tests' not in module.name and module.name not in {PROJECT_MODULES!r}]; "
+            "print(json.dumps(sorted(sys.modules)))"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT_PATH, env=env, capture_output=True, text=True, check=True
+        )
+        return set(json.loads(result.stdout))
+
+    def test__package__does_not_import_heavy_modules(self):
+        imported = self.get_imported_modules()
+
+        self.assertIn("graphene_django_cud.subscriptions.delete", imported)
+        self.assertEqual([module for module in HEAVY_MODULES if module in imported], [])
@@ -0,0 +1,159 @@
+import graphene
+from addict import Dict
+from django.test import TestCase
+from graphene import Schema
+from graphql_relay import to_global_id
+
+from graphene_django_cud.mutations import (
+    DjangoBatchCreateMutation,
+    DjangoCreateMutation,
+    DjangoCudMutationSet,
+    DjangoDeleteMutation,
+)
+from graphene_django_cud.tests.dummy_query import DummyQuery
+from graphene_django_cud.tests.factories import UserFactory
+from graphene_django_cud.tests.models import Mouse
+
+
+class TestDjangoCudMutationSet(TestCase):
+    def test__mutation_set__generates_mutations(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class MouseMutations(DjangoCudMutationSet):
+            class Meta:
+                model = Mouse
+                operations = ("create", "delete", "batch_create")
+                fields = ("name", "keeper")
+                operation_options = {
+                    "create": {"permissions": ("tests.add_mouse",)},
+                    "delete": {"permissions": ("tests.delete_mouse",)},
+                }
+
+        self.assertTrue(issubclass(MouseMutations.create, DjangoCreateMutation))
+        self.assertTrue(issubclass(MouseMutations.delete, DjangoDeleteMutation))
+        self.assertTrue(issubclass(MouseMutations.batch_create, DjangoBatchCreateMutation))
+        self.assertEqual(MouseMutations.create.__name__, "MouseMutationsCreate")
+        self.assertEqual(MouseMutations.create._meta.input_type_name, "MouseMutationsCreateInput")
+        self.assertEqual(MouseMutations.create._meta.permissions, ("tests.add_mouse",))
+        self.assertEqual(MouseMutations.delete._meta.permissions, ("tests.delete_mouse",))
+        self.assertIsNone(MouseMutations.batch_create._meta.permissions)
+        self.assertEqual(list(MouseMutations.get_fields()), ["create_mouse", "delete_mouse", "batch_create_mouse"])
+
+        # The batch create mutation shares the input type of the create mutation.
+        self.assertIs(MouseMutations.batch_create._meta.InputType, MouseMutations.create._meta.InputType)
+
+    def test__mutation_set__mutations_can_be_called(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class MouseMutations(DjangoCudMutationSet):
+            class Meta:
+                model = Mouse
+                operations = ("create", "batch_create")
+                use_id_suffixes_for_fk = True
+
+        Mutations = type("Mutations", (graphene.ObjectType,), MouseMutations.get_fields())
+
+        user = UserFactory.create()
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation BatchCreateMouse($input: [MouseMutationsCreateInput]!){
+                batchCreateMouse(input: $input){
+                    mouses{
+                        name
+                        keeper{
+                            id
+                        }
+                    }
+                }
+            }
+        """
+        result = schema.execute(
+            mutation,
+            variables={"input": [{"name": "Mickey", "keeperId": to_global_id("UserNode", user.id)}]},
+            context=Dict(user=user),
+        )
+        self.assertIsNone(result.errors)
+
+        data = Dict(result.data)
+        self.assertEqual(data.batchCreateMouse.mouses[0].name, "Mickey")
+        self.assertEqual(data.batchCreateMouse.mouses[0].keeper.id, to_global_id("UserNode", user.id))
+
+    def test__unknown_operation__raises_error(self):
+        with self.assertRaises(ValueError):
+
+            class MouseMutations(DjangoCudMutationSet):
+                class Meta:
+                    model = Mouse
+                    operations = ("create", "upsert")
+
+    def test__mutation_set__shares_input_types(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class MouseMutationsWithKeeper(DjangoCudMutationSet):
+            class Meta:
+                model = Mouse
+                operations = ("create", "update", "patch", "batch_patch")
+                fields = ("name", "keeper")
+                foreign_key_extras = {"keeper": {"type": "auto", "fields": ("username",)}}
+
+        create_input = MouseMutationsWithKeeper.create._meta.InputType
+        patch_input = MouseMutationsWithKeeper.patch._meta.InputType
+
+        # The update mutation takes the same input object as the create mutation.
+        self.assertIs(MouseMutationsWithKeeper.update._meta.InputType, create_input)
+        self.assertEqual(MouseMutationsWithKeeper.update._meta.input_type_name, "MouseMutationsWithKeeperCreateInput")
+
+        # The patch mutations have input types of their own, sharing the nested input types.
+        self.assertIsNot(patch_input, create_input)
+
+        def get_keeper_type(input_type):
+            keeper_type = input_type._meta.fields["keeper"].get_type().type
+            return getattr(keeper_type, "of_type", keeper_type)
+
+        keeper_type = get_keeper_type(create_input)
+        self.assertIs(get_keeper_type(patch_input), keeper_type)
+        self.assertIs(get_keeper_type(MouseMutationsWithKeeper.batch_patch._meta.InputType), keeper_type)
+
+    def test__mutation_sets_of_the_same_model__do_not_clash(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class MouseMutations(DjangoCudMutationSet):
+            class Meta:
+                model = Mouse
+                operations = ("create", "patch", "filter_update")
+                operation_options = {"filter_update": {"filter_fields": ("name",)}}
+
+        class StaffMouseMutations(DjangoCudMutationSet):
+            class Meta:
+                model = Mouse
+                name_prefix = "Staff"
+                operations = ("create", "patch")
+                fields = ("name",)
+
+        class CreateMouseMutation(DjangoCreateMutation):
+            class Meta:
+                model = Mouse
+
+        fields = {
+            **MouseMutations.get_fields(),
+            "staff_create_mouse": StaffMouseMutations.create.Field(),
+            "staff_patch_mouse": StaffMouseMutations.patch.Field(),
+            "plain_create_mouse": CreateMouseMutation.Field(),
+        }
+        Mutations = type("Mutations", (graphene.ObjectType,), fields)
+
+        self.assertEqual(StaffMouseMutations.create.__name__, "StaffCreate")
+        self.assertEqual(StaffMouseMutations.patch._meta.input_type_name, "StaffPatchInput")
+        Schema(query=DummyQuery, mutation=Mutations).graphql_schema
+
+    def test__operation_only_option_for_every_operation__raises_error(self):
+        with self.assertRaises(ValueError):
+
+            class MouseMutations(DjangoCudMutationSet):
+                class Meta:
+                    model = Mouse
+                    type_name = "MouseInput"
@@ -0,0 +1,67 @@
+from django.test import SimpleTestCase
+
+from graphene_django_cud.registry import TypeMeta, TypeMetaRegistry
+
+
+class TestTypeMetaRegistry(SimpleTestCase):
+    def test__register_dict__stores_type_meta(self):
+        registry = TypeMetaRegistry()
+        registry.register(
+            "CreateCatInput",
+            {"type": "auto", "auto_context_fields": {"owner": "user"}, "optional_fields": ("name",)},
+        )
+
+        meta = registry.get_meta_for_type("CreateCatInput")
+
+        self.assertIsInstance(meta, TypeMeta)
+        self.assertEqual(meta.auto_context_fields, {"owner": "user"})
+        self.assertEqual(meta.get("optional_fields"), ("name",))
+        self.assertEqual(meta.many_to_many_extras, {})
+        self.assertEqual(registry.get_meta_for_type("UnknownInput").foreign_key_extras, {})
+
+    def test__type_meta__is_immutable(self):
+        meta = TypeMeta()
+
+        with self.assertRaises(AttributeError):
+            meta.auto_context_fields = {}
+
+        with self.assertRaises(AttributeError):
+            meta.extra = True
+
+
+class TestTypeMetaMerge(SimpleTestCase):
+    def test__merge__extras_take_precedence(self):
+        meta = TypeMeta(auto_context_fields={"owner": "user", "creator": "user"})
+        extras = {"type": "CreateCatInput", "auto_context_fields": {"owner": "other"}}
+
+        merged = meta.merge(extras)
+
+        self.assertEqual(merged.auto_context_fields, {"owner": "other", "creator": "user"})
+        self.assertEqual(meta.auto_context_fields, {"owner": "user", "creator": "user"})
+
+    def test__merge__is_computed_once_per_extras_contents(self):
+        meta = TypeMeta(foreign_key_extras={"owner": {"type": "ID"}})
+        extras = {"type": "CreateCatInput", "foreign_key_extras": {"keeper": {"type": "ID", "fields": ["name"]}}}
+
+        equal_extras = {"foreign_key_extras": {"keeper": {"type": "ID", "fields": ["name"]}}}
+        other_extras = {"foreign_key_extras": {"keeper": {"type": "CreateUserInput"}}}
+
+        self.assertIs(meta.merge(extras), meta.merge(extras))
+        self.assertIs(meta.merge(extras), meta.merge(equal_extras))
+        self.assertIsNot(meta.merge(extras), meta.merge(other_extras))
+        self.assertIsNot(meta.merge(extras), TypeMeta(foreign_key_extras={"owner": {"type": "ID"}}).merge(extras))
+
+    def test__merge_with_unhashable_extras__is_not_cached(self):
+        meta = TypeMeta()
+        extras = {"auto_context_fields": {"owner": bytearray(b"user")}}
+
+        merged = meta.merge(extras)
+
+        self.assertEqual(merged.auto_context_fields, {"owner": bytearray(b"user")})
+        self.assertIsNot(meta.merge(extras), merged)
+
+    def test__merge_without_extras__returns_type_meta(self):
+        meta = TypeMeta(auto_context_fields={"owner": "user"})
+
+        self.assertIs(meta.merge({"type": "CreateCatInput"}), meta)
+        self.assertIs(meta.merge({}), meta)
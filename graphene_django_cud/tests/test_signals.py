@@ -0,0 +1,185 @@
+import graphene
+from addict import Dict
+from django.db import transaction
+from django.test import TestCase, override_settings
+from graphene import Schema
+from graphql_relay import to_global_id
+
+from graphene_django_cud.mutations import DjangoBatchPatchMutation, DjangoCreateMutation, DjangoPatchMutation
+from graphene_django_cud.signals import (
+    post_batch_update_mutation,
+    post_create_mutation,
+    post_delete_mutation,
+    post_update_mutation,
+)
+from graphene_django_cud.tests.dummy_query import DummyQuery
+from graphene_django_cud.tests.factories import DogFactory, UserFactory
+from graphene_django_cud.tests.models import Dog, Fish
+
+
+class TestDeferSignalsUntilCommit(TestCase):
+    def setUp(self):
+        self.received = []
+
+        def receiver(sender, **kwargs):
+            self.received.append((sender, kwargs))
+
+        self.receiver = receiver
+        post_create_mutation.connect(receiver)
+        post_delete_mutation.connect(receiver)
+
+    def tearDown(self):
+        post_create_mutation.disconnect(self.receiver)
+        post_delete_mutation.disconnect(self.receiver)
+
+    def test__setting_disabled__sends_immediately(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            post_create_mutation.send(sender=Fish, instance=None)
+
+        self.assertEqual(1, len(self.received))
+        self.assertEqual(0, len(callbacks))
+
+    @override_settings(GRAPHENE_DJANGO_CUD_DEFER_SIGNALS_UNTIL_COMMIT=True)
+    def test__mutation__sends_signal_on_commit(self):
+        # This registers the FishNode type
+        from .schema import FishNode  # noqa: F401
+
+        class CreateFishMutation(DjangoCreateMutation):
+            class Meta:
+                model = Fish
+
+        class Mutations(graphene.ObjectType):
+            create_fish = CreateFishMutation.Field()
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation CreateFish(
+                $input: CreateFishInput!
+            ){
+                createFish(input: $input) {
+                    fish {
+                        id
+                    }
+                }
+            }
+        """
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result = schema.execute(
+                mutation,
+                variables={"input": {"name": "Nemo"}},
+                context=Dict(user=UserFactory.create()),
+            )
+            self.assertIsNone(result.errors)
+            self.assertEqual(0, len(self.received))
+
+        self.assertEqual(1, len(callbacks))
+        self.assertEqual(1, len(self.received))
+        self.assertEqual("Nemo", self.received[0][1]["instance"].name)
+
+    @override_settings(GRAPHENE_DJANGO_CUD_DEFER_SIGNALS_UNTIL_COMMIT=True)
+    def test__multiple_sends__are_coalesced_in_order(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            post_create_mutation.send(sender=Fish, instance=1)
+            post_delete_mutation.send(sender=Fish, id=2)
+            post_create_mutation.send(sender=Fish, instance=3)
+
+        self.assertEqual(1, len(callbacks))
+        self.assertEqual([1, 2, 3], [kwargs.get("instance", kwargs.get("id")) for _, kwargs in self.received])
+
+    @override_settings(GRAPHENE_DJANGO_CUD_DEFER_SIGNALS_UNTIL_COMMIT=True)
+    def test__savepoint_rollback__discards_signals_sent_within(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post_create_mutation.send(sender=Fish, instance=1)
+
+            try:
+                with transaction.atomic():
+                    post_create_mutation.send(sender=Fish, instance=2)
+                    raise ValueError()
+            except ValueError:
+                pass
+
+            post_create_mutation.send(sender=Fish, instance=3)
+
+        self.assertEqual([1, 3], [kwargs["instance"] for _, kwargs in self.received])
+
+
+class TestChangedFields(TestCase):
+    def setUp(self):
+        # This registers the DogNode type
+        from .schema import DogNode  # noqa: F401
+
+        self.received = []
+
+        def receiver(sender, **kwargs):
+            self.received.append(kwargs["changed_fields"])
+
+        self.receiver = receiver
+        post_update_mutation.connect(receiver)
+        post_batch_update_mutation.connect(receiver)
+
+    def tearDown(self):
+        post_update_mutation.disconnect(self.receiver)
+        post_batch_update_mutation.disconnect(self.receiver)
+
+    def test__patch_mutation__sends_changed_fields(self):
+        class PatchDogMutation(DjangoPatchMutation):
+            class Meta:
+                model = Dog
+
+        class Mutations(graphene.ObjectType):
+            patch_dog = PatchDogMutation.Field()
+
+        dog = DogFactory.create(name="Lassie", bark_count=1)
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation PatchDog($id: ID!, $input: PatchDogInput!){
+                patchDog(id: $id, input: $input) {
+                    dog {
+                        id
+                    }
+                }
+            }
+        """
+
+        result = schema.execute(
+            mutation,
+            variables={"id": to_global_id("DogNode", dog.id), "input": {"name": "Lassie", "barkCount": 2}},
+            context=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual([{"bark_count": (1, 2)}], self.received)
+
+    def test__batch_patch_mutation__sends_changed_fields_per_instance(self):
+        class BatchPatchDogMutation(DjangoBatchPatchMutation):
+            class Meta:
+                model = Dog
+
+        class Mutations(graphene.ObjectType):
+            batch_patch_dog = BatchPatchDogMutation.Field()
+
+        dog_1 = DogFactory.create(name="Lassie")
+        dog_2 = DogFactory.create(name="Fido")
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        mutation = """
+            mutation BatchPatchDog($input: [BatchPatchDogInput]!){
+                batchPatchDog(input: $input) {
+                    dogs {
+                        id
+                    }
+                }
+            }
+        """
+
+        result = schema.execute(
+            mutation,
+            variables={
+                "input": [
+                    {"id": to_global_id("DogNode", dog_1.id), "name": "Lassie"},
+                    {"id": to_global_id("DogNode", dog_2.id), "name": "Rex"},
+                ]
+            },
+            context=Dict(user=UserFactory.create()),
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual([[{}, {"name": ("Fido", "Rex")}]], self.received)
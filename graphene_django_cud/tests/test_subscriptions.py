@@ -0,0 +1,937 @@
+import asyncio
+import os
+import pickle
+import queue
+import tempfile
+import threading
+from unittest.mock import patch
+
+import graphene
+from addict import Dict
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.dispatch import Signal
+from django.test import TestCase, override_settings
+from graphene import Schema
+from graphql import GraphQLError
+from graphql_relay import to_global_id
+
+from graphene_django_cud.signals import (
+    post_batch_create_mutation,
+    post_batch_delete_mutation,
+    post_batch_update_mutation,
+    post_update_mutation,
+)
+from graphene_django_cud.subscriptions.batch_create import DjangoBatchCreateSubscription
+from graphene_django_cud.subscriptions.batch_delete import DjangoBatchDeleteSubscription
+from graphene_django_cud.subscriptions.broadcast import (
+    InMemoryBroadcastBackend,
+    RedisBroadcastBackend,
+    UnixSocketBroadcastBackend,
+    get_broadcast_backend,
+)
+from graphene_django_cud.subscriptions.core import Subscriber, SubscriberDisconnected, SubscriberRegistry
+from graphene_django_cud.subscriptions.create import DjangoCreateSubscription
+from graphene_django_cud.subscriptions.filters import InstanceFilter
+from graphene_django_cud.subscriptions.replay import EventLog
+from graphene_django_cud.subscriptions.signal import DjangoSignalSubscription
+from graphene_django_cud.subscriptions.shared import SharedPayloadSchema, get_shared_payload_groups
+from graphene_django_cud.subscriptions.update import DjangoUpdateSubscription
+from graphene_django_cud.tests.dummy_query import DummyQuery
+from graphene_django_cud.tests.factories import DogFactory, UserFactory
+from graphene_django_cud.tests.models import Dog, Fish
+
+
+async def subscribe(schema, query, context=None):
+    iterator = await schema.subscribe(query, context_value=context or Dict(user=1))
+    assert not hasattr(iterator, "errors"), iterator.errors
+    return iterator
+
+
+async def next_event(iterator, trigger, timeout=1.0):
+    task = asyncio.ensure_future(iterator.__anext__())
+
+    # Let the subscription register its subscriber before triggering the event.
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    await sync_to_async(trigger)()
+    return await asyncio.wait_for(task, timeout)
+
+
+class TestSubscriberRegistry(TestCase):
+    def test__publish_from_other_thread__schedules_one_callback_per_loop(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            registry = SubscriberRegistry()
+            subscribers = [Subscriber() for _ in range(100)]
+            for subscriber in subscribers:
+                registry.add(subscriber)
+
+            with patch.object(loop, "call_soon_threadsafe", wraps=loop.call_soon_threadsafe) as call_soon_threadsafe:
+                thread = threading.Thread(target=registry.publish, args=("event",))
+                thread.start()
+                thread.join()
+
+                self.assertEqual(1, call_soon_threadsafe.call_count)
+
+            events = await asyncio.gather(*(asyncio.wait_for(subscriber.get(), 1) for subscriber in subscribers))
+            self.assertEqual(["event"] * 100, events)
+
+        async_to_sync(run)()
+
+    def test__removed_subscriber__receives_nothing(self):
+        async def run():
+            registry = SubscriberRegistry()
+            subscriber = Subscriber()
+            registry.add(subscriber)
+            registry.remove(subscriber)
+
+            self.assertEqual(0, len(registry))
+
+            registry.publish("event")
+            await asyncio.sleep(0)
+            self.assertTrue(subscriber.queue.empty())
+
+        async_to_sync(run)()
+
+
+class TestSubscriberFilters(TestCase):
+    def test__instance_filter__matches_field_lookups(self):
+        instance_filter = InstanceFilter(Dog, {"owner": "1", "name__startswith": "Sim", "tag": None})
+
+        self.assertEqual(("owner_id", 1), instance_filter.index_item)
+        self.assertTrue(instance_filter.matches(Dog(owner_id=1, name="Simen")))
+        self.assertFalse(instance_filter.matches(Dog(owner_id=2, name="Simen")))
+        self.assertFalse(instance_filter.matches(Dog(owner_id=1, name="Tormod")))
+        self.assertFalse(instance_filter.matches(Fish(name="Simen")))
+
+    def test__instance_filter__traverses_relations_with_query(self):
+        dog = DogFactory.create(owner=UserFactory.create(username="simen"))
+        instance_filter = InstanceFilter(Dog, {"owner__username": "simen"})
+
+        self.assertIsNone(instance_filter.index_item)
+        with self.assertNumQueries(1):
+            self.assertTrue(instance_filter.matches(dog))
+
+    def test__filter_by_query__matches_relation_lookups_with_single_query(self):
+        owner = UserFactory.create(username="simen")
+        dogs = [DogFactory.create(owner=owner), DogFactory.create(), DogFactory.create(owner=owner)]
+        instance_filter = InstanceFilter(Dog, {"owner__username": "simen"})
+
+        with self.assertNumQueries(1):
+            self.assertEqual([dogs[0], dogs[2]], instance_filter.filter_by_query(dogs))
+
+    def test__publish__does_not_query_relation_lookups(self):
+        dog = DogFactory.create(owner=UserFactory.create(username="simen"))
+
+        async def run():
+            registry = SubscriberRegistry()
+            subscriber = Subscriber(filter=InstanceFilter(Dog, {"owner__username": "simen"}))
+            registry.add(subscriber)
+
+            def publish():
+                with self.assertNumQueries(0):
+                    registry.publish(dog)
+
+            await sync_to_async(publish)()
+
+            # The relation lookups are matched when the subscriber consumes the event.
+            await asyncio.sleep(0)
+            self.assertEqual(dog, await asyncio.wait_for(subscriber.get(), 1))
+
+        async_to_sync(run)()
+
+    def test__publish__only_matches_indexed_subscribers(self):
+        async def run():
+            registry = SubscriberRegistry()
+            subscribers = {
+                owner_id: Subscriber(filter=InstanceFilter(Dog, {"owner": owner_id})) for owner_id in range(1, 101)
+            }
+            unfiltered_subscriber = Subscriber()
+            for subscriber in (*subscribers.values(), unfiltered_subscriber):
+                registry.add(subscriber)
+
+            self.assertEqual(101, len(registry))
+
+            with patch.object(InstanceFilter, "matches", autospec=True, side_effect=InstanceFilter.matches) as matches:
+                registry.publish(Dog(owner_id=42, name="Simen"))
+                self.assertEqual(1, matches.call_count)
+
+            await asyncio.sleep(0)
+            self.assertEqual("Simen", (await asyncio.wait_for(subscribers[42].get(), 1)).name)
+            self.assertEqual("Simen", (await asyncio.wait_for(unfiltered_subscriber.get(), 1)).name)
+            self.assertTrue(all(subscriber.queue.empty() for subscriber in subscribers.values()))
+
+            registry.remove(subscribers[42])
+            self.assertEqual(100, len(registry))
+
+        async_to_sync(run)()
+
+
+class FakeRedis:
+    """A stand-in for a Redis server and client, implementing the pub/sub methods used by the backend."""
+
+    def __init__(self):
+        self.pubsubs = []
+
+    def publish(self, channel, message):
+        for pubsub in self.pubsubs:
+            if channel in pubsub.channels:
+                pubsub.messages.put({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.channels.clear()
+
+
+class TestBroadcastBackends(TestCase):
+    def listen(self, backend):
+        received = queue.Queue()
+        backend.add_listener(lambda channel, events: received.put((channel, events)))
+        return received
+
+    def assert_broadcast(self, publisher, other):
+        publisher_received = self.listen(publisher)
+        other_received = self.listen(other)
+
+        publisher.publish("dogs", [1, 2, 3])
+
+        self.assertEqual(("dogs", [1, 2, 3]), publisher_received.get(timeout=1))
+        self.assertEqual(("dogs", [1, 2, 3]), other_received.get(timeout=1))
+
+        # Messages from the process itself are not delivered twice
+        with self.assertRaises(queue.Empty):
+            publisher_received.get(timeout=0.1)
+
+    def test__in_memory_backend__calls_listeners(self):
+        backend = InMemoryBroadcastBackend()
+        received = self.listen(backend)
+        backend.publish("dogs", (1, 2))
+
+        self.assertEqual(("dogs", [1, 2]), received.get_nowait())
+
+    def test__unix_socket_backend__broadcasts_to_other_processes(self):
+        with tempfile.TemporaryDirectory() as path:
+            publisher = UnixSocketBroadcastBackend(path=path)
+            other = UnixSocketBroadcastBackend(path=path)
+            self.addCleanup(publisher.close)
+            self.addCleanup(other.close)
+
+            self.assert_broadcast(publisher, other)
+
+    def test__unix_socket_backend__drops_unsigned_messages(self):
+        with tempfile.TemporaryDirectory() as path:
+            backend = UnixSocketBroadcastBackend(path=path)
+            self.addCleanup(backend.close)
+            received = self.listen(backend)
+
+            payload = pickle.dumps(("other", "dogs", [1]))
+            with patch("graphene_django_cud.subscriptions.broadcast.pickle.loads") as loads:
+                backend.send_socket.sendto(b"\0" * backend.SIGNATURE_SIZE + payload, backend.socket_path)
+
+                with self.assertRaises(queue.Empty):
+                    received.get(timeout=0.1)
+
+            loads.assert_not_called()
+
+    def test__unix_socket_backend__drops_messages_signed_with_other_secret(self):
+        with tempfile.TemporaryDirectory() as path:
+            publisher = UnixSocketBroadcastBackend(path=path, secret="other")
+            other = UnixSocketBroadcastBackend(path=path)
+            self.addCleanup(publisher.close)
+            self.addCleanup(other.close)
+            received = self.listen(other)
+
+            publisher.publish("dogs", [1])
+
+            with self.assertRaises(queue.Empty):
+                received.get(timeout=0.1)
+
+    def test__unix_socket_backend__rejects_directory_accessible_to_others(self):
+        with tempfile.TemporaryDirectory() as path:
+            os.chmod(path, 0o777)
+
+            with self.assertRaises(ImproperlyConfigured):
+                UnixSocketBroadcastBackend(path=path)
+
+            link_path = os.path.join(path, "link")
+            target_path = os.path.join(path, "target")
+            os.mkdir(target_path, 0o700)
+            os.symlink(target_path, link_path)
+
+            with self.assertRaises(ImproperlyConfigured):
+                UnixSocketBroadcastBackend(path=link_path)
+
+    def test__redis_backend__broadcasts_to_other_processes(self):
+        redis = FakeRedis()
+        publisher = RedisBroadcastBackend(client=redis, poll_timeout=0.05)
+        other = RedisBroadcastBackend(client=redis, poll_timeout=0.05)
+        self.addCleanup(publisher.close)
+        self.addCleanup(other.close)
+
+        self.assert_broadcast(publisher, other)
+
+    def test__backend_setting__delivers_events_from_other_processes(self):
+        with tempfile.TemporaryDirectory() as path:
+            with override_settings(
+                GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_BACKEND=(
+                    "graphene_django_cud.subscriptions.broadcast.UnixSocketBroadcastBackend"
+                ),
+                GRAPHENE_DJANGO_CUD_SUBSCRIPTION_BROADCAST_OPTIONS={"path": path},
+            ):
+                self.assertIsInstance(get_broadcast_backend(), UnixSocketBroadcastBackend)
+
+                from .schema import FishNode  # noqa: F401
+
+                class FishCreatedSubscription(DjangoCreateSubscription):
+                    class Meta:
+                        model = Fish
+
+                other_process = UnixSocketBroadcastBackend(path=path)
+                self.addCleanup(other_process.close)
+
+                async def run():
+                    generator = FishCreatedSubscription.subscribe(None, Dict(context=Dict(user=1)))
+                    task = asyncio.ensure_future(generator.__anext__())
+                    await asyncio.sleep(0)
+
+                    other_process.publish(FishCreatedSubscription._meta.channel, [Fish(name="Nemo")])
+
+                    result = await asyncio.wait_for(task, 1)
+                    self.assertEqual("Nemo", result.fish.name)
+                    await generator.aclose()
+
+                async_to_sync(run)()
+
+            self.assertIsInstance(get_broadcast_backend(), InMemoryBroadcastBackend)
+
+
+class TestEventLog(TestCase):
+    def test__get_since__returns_later_entries(self):
+        event_log = EventLog(max_size=10)
+        event_ids = [event_log.append(key) for key in (1, 2, 3)]
+
+        self.assertEqual([2, 3], [entry.key for entry in event_log.get_since(event_ids[0])])
+        self.assertEqual([], event_log.get_since(event_ids[2]))
+        self.assertEqual(event_ids[2], event_log.last_event_id)
+
+    def test__get_since__evicted_or_foreign_cursor__has_expired(self):
+        event_log = EventLog(max_size=2)
+        event_ids = [event_log.append(key) for key in (1, 2, 3, 4)]
+
+        self.assertIsNone(event_log.get_since(event_ids[0]))
+        self.assertEqual([3, 4], [entry.key for entry in event_log.get_since(event_ids[1])])
+        self.assertIsNone(event_log.get_since(EventLog(max_size=2).append(1)))
+        self.assertIsNone(event_log.get_since("not-an-id"))
+
+    def test__get_since__old_entries__have_expired(self):
+        event_log = EventLog(max_size=10, max_age=60)
+        with patch("graphene_django_cud.subscriptions.replay.time.time", return_value=1000):
+            event_ids = [event_log.append(key) for key in (1, 2)]
+
+        with patch("graphene_django_cud.subscriptions.replay.time.time", return_value=1100):
+            self.assertIsNone(event_log.get_since(event_ids[0]))
+            self.assertEqual([], event_log.get_since(event_ids[1]))
+
+
+class TestSubscriberQueueOverflow(TestCase):
+    def drain(self, subscriber):
+        items = []
+        while not subscriber.queue.empty():
+            items.append(subscriber.queue.get_nowait())
+        return items
+
+    def test__drop_oldest__keeps_newest_events(self):
+        async def run():
+            subscriber = Subscriber(max_queue_size=2, overflow_policy="drop_oldest")
+            for item in range(4):
+                subscriber.put(item)
+
+            self.assertEqual([2, 3], self.drain(subscriber))
+            self.assertEqual(2, subscriber.dropped_count)
+
+        async_to_sync(run)()
+
+    def test__drop_newest__keeps_oldest_events(self):
+        async def run():
+            subscriber = Subscriber(max_queue_size=2, overflow_policy="drop_newest")
+            for item in range(4):
+                subscriber.put(item)
+
+            self.assertEqual([0, 1], self.drain(subscriber))
+            self.assertEqual(2, subscriber.dropped_count)
+
+        async_to_sync(run)()
+
+    def test__coalesce__replaces_queued_event_for_same_key(self):
+        async def run():
+            subscriber = Subscriber(max_queue_size=2, overflow_policy="coalesce", get_key=lambda item: item[0])
+            subscriber.put(("a", 1))
+            subscriber.put(("b", 1))
+            subscriber.put(("a", 2))
+            subscriber.put(("c", 1))
+
+            self.assertEqual([("b", 1), ("c", 1)], self.drain(subscriber))
+            self.assertEqual(2, subscriber.dropped_count)
+
+        async_to_sync(run)()
+
+    def test__disconnect__ends_subscription_with_error(self):
+        async def run():
+            subscriber = Subscriber(max_queue_size=2, overflow_policy="disconnect")
+            for item in range(4):
+                subscriber.put(item)
+
+            self.assertTrue(subscriber.disconnected)
+            self.assertEqual(4, subscriber.dropped_count)
+            with self.assertRaises(SubscriberDisconnected):
+                await subscriber.get()
+
+        async_to_sync(run)()
+
+    def test__coalesce_window__keeps_latest_event_per_key(self):
+        async def run():
+            subscriber = Subscriber(coalesce_window=0.01, get_key=lambda item: item[0])
+            for item in (("a", 1), ("b", 1), ("a", 2)):
+                subscriber.put(item)
+
+            self.assertTrue(subscriber.queue.empty())
+            await asyncio.sleep(0.02)
+            self.assertEqual([("a", 2), ("b", 1)], self.drain(subscriber))
+
+        async_to_sync(run)()
+
+    def test__coalesce_as_list__queues_one_list_per_window(self):
+        async def run():
+            subscriber = Subscriber(coalesce_window=0.01, coalesce_as_list=True, get_key=lambda item: item[0])
+            for item in (("a", 1), ("b", 1), ("a", 2)):
+                subscriber.put(item)
+
+            await asyncio.sleep(0.02)
+            subscriber.put(("c", 1))
+            await asyncio.sleep(0.02)
+            self.assertEqual([[("a", 2), ("b", 1)], [("c", 1)]], self.drain(subscriber))
+
+        async_to_sync(run)()
+
+    def test__coalesce_as_list_without_window__queues_one_list_per_batch(self):
+        async def run():
+            subscriber = Subscriber(coalesce_as_list=True)
+            subscriber.put_many([1, 2, 3])
+            subscriber.put(4)
+            self.assertEqual([[1, 2, 3], [4]], self.drain(subscriber))
+
+        async_to_sync(run)()
+
+    def test__invalid_policy__raises_error(self):
+        with self.assertRaises(ValueError):
+
+            class FishCreatedSubscription(DjangoCreateSubscription):
+                class Meta:
+                    model = Fish
+                    queue_overflow_policy = "block"
+
+
+class TestSubscriptions(TestCase):
+    def test__create_subscription__receives_created_instance(self):
+        from .schema import schema
+
+        async def run():
+            iterator = await subscribe(schema, "subscription { fishCreated { fish { name } } }")
+            try:
+                result = await next_event(iterator, lambda: Fish.objects.create(name="Nemo"))
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual("Nemo", result.data["fishCreated"]["fish"]["name"])
+
+        async_to_sync(run)()
+
+    def test__signal_subscription__receives_signal_data(self):
+        from .schema import schema, test_signal
+
+        async def run():
+            iterator = await subscribe(schema, "subscription { testSignalFired { letsGo } }")
+            try:
+                result = await next_event(iterator, lambda: test_signal.send(sender=None, value=42))
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual("go 42", result.data["testSignalFired"]["letsGo"])
+
+        async_to_sync(run)()
+
+    def test__bounded_subscription__reports_dropped_events(self):
+        from .schema import FishNode  # noqa: F401
+
+        class BoundedFishCreatedSubscription(DjangoCreateSubscription):
+            class Meta:
+                model = Fish
+                max_queue_size = 1
+                queue_overflow_policy = "drop_newest"
+
+        async def run():
+            generator = BoundedFishCreatedSubscription.subscribe(None, Dict(context=Dict(user=1)))
+            task = asyncio.ensure_future(generator.__anext__())
+            await asyncio.sleep(0)
+
+            registry = BoundedFishCreatedSubscription.get_subscriber_registries()[0]
+            for name in ("Nemo", "Dory", "Marlin"):
+                registry.publish(Fish(name=name))
+            await asyncio.sleep(0)
+
+            result = await asyncio.wait_for(task, 1)
+            self.assertEqual("Nemo", result.fish.name)
+            self.assertEqual(
+                {"subscribers": 1, "queued": 0, "dropped": 2, "disconnected": 0},
+                BoundedFishCreatedSubscription.get_subscriber_stats(),
+            )
+
+            await generator.aclose()
+            self.assertEqual(0, BoundedFishCreatedSubscription.get_subscriber_stats()["subscribers"])
+
+        async_to_sync(run)()
+
+    def test__signal_subscriptions__have_own_registries(self):
+        signal_a = Signal()
+        signal_b = Signal()
+
+        # The broadcast channel of a subscription is named after its class, so the classes need distinct names.
+        class ValueASubscription(DjangoSignalSubscription):
+            value = graphene.Int()
+
+            class Meta:
+                signal = signal_a
+
+            @classmethod
+            def transform_signal_data(cls, data):
+                return {"value": data["value"]}
+
+        class ValueBSubscription(ValueASubscription):
+            class Meta:
+                signal = signal_b
+
+        self.assertIsNot(ValueASubscription.get_subscriber_registry(), ValueBSubscription.get_subscriber_registry())
+
+        async def run():
+            generator_a = ValueASubscription.subscribe(None, Dict(context=Dict(user=1)))
+            generator_b = ValueBSubscription.subscribe(None, Dict(context=Dict(user=1)))
+            task_b = asyncio.ensure_future(generator_b.__anext__())
+
+            result = await next_event(generator_a, lambda: signal_a.send(sender=None, value=1))
+            self.assertEqual(1, result.value)
+            self.assertFalse(task_b.done())
+            self.assertEqual(0, ValueBSubscription.get_subscriber_stats()["queued"])
+
+            task_b.cancel()
+            await generator_a.aclose()
+
+        async_to_sync(run)()
+
+    def test__create_subscriptions_of_same_model__deliver_once(self):
+        from .schema import FishNode  # noqa: F401
+
+        class FishCreatedSubscription(DjangoCreateSubscription):
+            class Meta:
+                model = Fish
+
+        class OtherFishCreatedSubscription(DjangoCreateSubscription):
+            class Meta:
+                model = Fish
+
+        async def run():
+            generator = FishCreatedSubscription.subscribe(None, Dict(context=Dict(user=1)))
+            result = await next_event(generator, lambda: Fish.objects.create(name="Nemo"))
+            self.assertEqual("Nemo", result.fish.name)
+            self.assertEqual(0, FishCreatedSubscription.get_subscriber_stats()["queued"])
+            await generator.aclose()
+
+        async_to_sync(run)()
+
+    def test__update_subscription__ignores_post_save_of_created_instances(self):
+        from .schema import FishNode  # noqa: F401
+
+        class FishUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Fish
+
+        fish = Fish.objects.create(name="Nemo")
+
+        def trigger():
+            Fish.objects.create(name="Dory")
+            fish.name = "Marlin"
+            fish.save()
+
+        async def run():
+            generator = FishUpdatedSubscription.subscribe(None, Dict(context=Dict(user=1)))
+            result = await next_event(generator, trigger)
+            await generator.aclose()
+
+            self.assertEqual("Marlin", result.fish.name)
+
+        async_to_sync(run)()
+
+    def test__update_subscription__coalesces_batch_update_signal(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogsUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+                signal = post_batch_update_mutation
+                coalesce_window_ms = 10
+                coalesce_as_list = True
+
+        class Subscriptions(graphene.ObjectType):
+            dogs_updated = DogsUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        dogs = DogFactory.create_batch(2, name="Simen")
+
+        def trigger():
+            post_batch_update_mutation.send(sender=Dog, instances=dogs)
+            dogs[0].name = "Tormod"
+            post_batch_update_mutation.send(sender=Dog, instances=[dogs[0]])
+
+        async def run():
+            iterator = await subscribe(schema, "subscription { dogsUpdated { dogs { name } } }")
+            try:
+                result = await next_event(iterator, trigger)
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual([{"name": "Tormod"}, {"name": "Simen"}], result.data["dogsUpdated"]["dogs"])
+
+        async_to_sync(run)()
+
+    def test__batch_create_subscription__pushes_one_payload_per_batch(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogsCreatedSubscription(DjangoBatchCreateSubscription):
+            class Meta:
+                model = Dog
+
+        class Subscriptions(graphene.ObjectType):
+            dogs_created = DogsCreatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        dogs = DogFactory.create_batch(3)
+
+        async def run():
+            iterator = await subscribe(schema, "subscription { dogsCreated { dogs { name } } }")
+            try:
+                result = await next_event(
+                    iterator, lambda: post_batch_create_mutation.send(sender=Dog, instances=dogs)
+                )
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual([{"name": dog.name} for dog in dogs], result.data["dogsCreated"]["dogs"])
+            self.assertEqual(0, DogsCreatedSubscription.get_subscriber_stats()["queued"])
+
+        async_to_sync(run)()
+
+    def test__batch_delete_subscription__pushes_deleted_ids(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogsDeletedSubscription(DjangoBatchDeleteSubscription):
+            class Meta:
+                model = Dog
+
+        def trigger():
+            post_batch_delete_mutation.send(
+                sender=Dog, ids=[1, 2], deletion_count=2, deleted_ids=[to_global_id("DogNode", 1), 2]
+            )
+
+        async def run():
+            generator = DogsDeletedSubscription.subscribe(None, Dict(context=Dict(user=1)))
+            result = await next_event(generator, trigger)
+            await generator.aclose()
+
+            self.assertEqual(["1", 2], result.ids)
+
+        async_to_sync(run)()
+
+    def test__batch_subscription__requires_coalesce_as_list(self):
+        with self.assertRaises(ValueError):
+
+            class DogsCreatedSubscription(DjangoBatchCreateSubscription):
+                class Meta:
+                    model = Dog
+                    coalesce_as_list = False
+
+    def test__update_subscription__sends_watched_changed_fields(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+                signal = post_update_mutation
+                include_changed_fields = True
+
+        class Subscriptions(graphene.ObjectType):
+            dog_updated = DogUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        dog = DogFactory.create(name="Lassie", bark_count=1)
+        query = """
+            subscription {
+                dogUpdated(watchFields: ["barkCount"]) {
+                    dog { name }
+                    changedFields { field oldValue newValue }
+                }
+            }
+        """
+
+        def trigger():
+            post_update_mutation.send(sender=Dog, instance=dog, changed_fields={"name": ("Fido", "Lassie")})
+            post_update_mutation.send(sender=Dog, instance=dog, changed_fields={"bark_count": (1, 2)})
+
+        async def run():
+            iterator = await subscribe(schema, query)
+            try:
+                result = await next_event(iterator, trigger)
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual(
+                [{"field": "bark_count", "oldValue": 1, "newValue": 2}], result.data["dogUpdated"]["changedFields"]
+            )
+            self.assertEqual(0, DogUpdatedSubscription.get_subscriber_stats()["queued"])
+
+        async_to_sync(run)()
+
+    def test__update_subscription__rejects_invalid_watch_fields(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+
+        class Subscriptions(graphene.ObjectType):
+            dog_updated = DogUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+
+        async def run():
+            iterator = await subscribe(schema, 'subscription { dogUpdated(watchFields: ["color"]) { dog { name } } }')
+            with self.assertRaisesRegex(GraphQLError, "watch_fields"):
+                await iterator.__anext__()
+
+        async_to_sync(run)()
+
+    def test__update_subscription__replays_events_since_cursor(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+                signal = post_update_mutation
+                replay_buffer_size = 10
+
+        class Subscriptions(graphene.ObjectType):
+            dog_updated = DogUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        dogs = DogFactory.create_batch(3)
+        for dog in dogs:
+            post_update_mutation.send(sender=Dog, instance=dog)
+
+        entries = list(DogUpdatedSubscription._meta.event_log.entries)
+        query = "subscription ($since: String) { dogUpdated(since: $since) { eventId resyncRequired dog { id } } }"
+
+        async def run():
+            iterator = await schema.subscribe(
+                query, variable_values={"since": entries[0].event_id}, context_value=Dict(user=1)
+            )
+            try:
+                replayed = [await asyncio.wait_for(iterator.__anext__(), 1) for _ in range(2)]
+                live = await next_event(iterator, lambda: DogUpdatedSubscription.receive_events([dogs[0]]))
+            finally:
+                await iterator.aclose()
+
+            self.assertEqual(
+                [(entry.event_id, to_global_id("DogNode", dog.id)) for entry, dog in zip(entries[1:], dogs[1:])],
+                [(result.data["dogUpdated"]["eventId"], result.data["dogUpdated"]["dog"]["id"]) for result in replayed],
+            )
+            self.assertEqual(
+                DogUpdatedSubscription._meta.event_log.last_event_id, live.data["dogUpdated"]["eventId"]
+            )
+
+            iterator = await schema.subscribe(query, variable_values={"since": "expired-1"}, context_value=Dict(user=1))
+            try:
+                result = await asyncio.wait_for(iterator.__anext__(), 1)
+            finally:
+                await iterator.aclose()
+
+            self.assertTrue(result.data["dogUpdated"]["resyncRequired"])
+            self.assertIsNone(result.data["dogUpdated"]["dog"])
+
+        async_to_sync(run)()
+
+    def test__update_subscription__filter_fields_arguments(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+                filter_fields = ("owner", "name__startswith")
+                signal = post_update_mutation
+
+        class Subscriptions(graphene.ObjectType):
+            dog_updated = DogUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        owner = UserFactory.create()
+        other_owner = UserFactory.create()
+        dogs = [
+            DogFactory.create(owner=other_owner, name="Simen"),
+            DogFactory.create(owner=owner, name="Tormod"),
+            DogFactory.create(owner=owner, name="Simen"),
+        ]
+
+        def trigger():
+            for dog in dogs:
+                post_update_mutation.send(sender=Dog, instance=dog)
+
+        async def run():
+            iterator = await subscribe(
+                schema,
+                'subscription { dogUpdated(owner: "%s", name_Startswith: "Sim") { dog { id } } }'
+                % to_global_id("DogNode", owner.id),
+            )
+            try:
+                result = await next_event(iterator, trigger)
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual(to_global_id("DogNode", dogs[2].id), result.data["dogUpdated"]["dog"]["id"])
+            self.assertEqual(0, DogUpdatedSubscription.get_subscriber_stats()["queued"])
+
+        async_to_sync(run)()
+
+    def test__update_subscription__filters_relation_lookups_when_consumed(self):
+        from .schema import DogNode  # noqa: F401
+
+        class DogUpdatedSubscription(DjangoUpdateSubscription):
+            class Meta:
+                model = Dog
+                filter_fields = ("owner__username",)
+                signal = post_update_mutation
+
+        class Subscriptions(graphene.ObjectType):
+            dog_updated = DogUpdatedSubscription.Field()
+
+        schema = Schema(query=DummyQuery, subscription=Subscriptions)
+        dogs = [
+            DogFactory.create(owner=UserFactory.create(username="tormod")),
+            DogFactory.create(owner=UserFactory.create(username="simen")),
+        ]
+
+        def trigger():
+            # Publishing runs no queries, however many subscribers there are.
+            with self.assertNumQueries(0):
+                for dog in dogs:
+                    post_update_mutation.send(sender=Dog, instance=dog)
+
+        async def run():
+            iterator = await subscribe(schema, 'subscription { dogUpdated(owner_Username: "simen") { dog { id } } }')
+            try:
+                result = await next_event(iterator, trigger)
+            finally:
+                await iterator.aclose()
+
+            self.assertIsNone(result.errors)
+            self.assertEqual(to_global_id("DogNode", dogs[1].id), result.data["dogUpdated"]["dog"]["id"])
+
+        async_to_sync(run)()
+
+
+class TestSharedPayloads(TestCase):
+    def create_schema(self, permissions=None):
+        from .schema import FishNode  # noqa: F401
+
+        permissions_ = permissions
+
+        class SharedFishCreatedSubscription(DjangoCreateSubscription):
+            class Meta:
+                model = Fish
+                share_payloads = True
+                permissions = permissions_
+
+        class Subscriptions(graphene.ObjectType):
+            fish_created = SharedFishCreatedSubscription.Field()
+
+        self.subscription = SharedFishCreatedSubscription
+        return SharedPayloadSchema(query=DummyQuery, subscription=Subscriptions)
+
+    def test__same_fingerprint__resolves_payload_once(self):
+        query = "subscription { fishCreated { fish { name } } }"
+        user = Dict(pk=1)
+        schema = self.create_schema()
+
+        async def run():
+            iterators = [await subscribe(schema, query, Dict(user=user)) for _ in range(3)]
+            other_user_iterator = await subscribe(schema, query, Dict(user=Dict(pk=2)))
+
+            groups = get_shared_payload_groups()
+            self.assertEqual(2, len(groups))
+
+            tasks = [asyncio.ensure_future(iterator.__anext__()) for iterator in iterators]
+            result = await next_event(
+                other_user_iterator, lambda: self.subscription.receive_events([Fish(name="Nemo")])
+            )
+            results = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+
+            self.assertEqual({"fishCreated": {"fish": {"name": "Nemo"}}}, result.data)
+            self.assertIs(results[0], results[1])
+            self.assertIs(results[0], results[2])
+            self.assertEqual([1, 1], [group.render_count for group in groups])
+            self.assertEqual(2, self.subscription.get_subscriber_stats()["subscribers"])
+
+            for iterator in (*iterators, other_user_iterator):
+                await iterator.aclose()
+
+            await asyncio.sleep(0)
+            self.assertEqual([], get_shared_payload_groups())
+            self.assertEqual(0, self.subscription.get_subscriber_stats()["subscribers"])
+
+        async_to_sync(run)()
+
+    def test__permission_denied__returns_error(self):
+        schema = self.create_schema(permissions=("tests.add_fish",))
+
+        async def run():
+            result = await schema.subscribe(
+                "subscription { fishCreated { fish { name } } }",
+                context_value=Dict(user=Dict(pk=1, has_perms=lambda permissions: False)),
+            )
+            self.assertEqual("Not permitted to access this subscription.", result.errors[0].message)
+            self.assertEqual([], get_shared_payload_groups())
+
+        async_to_sync(run)()
@@ -5,6 +5,7 @@ from graphene import Schema, ResolveInfo
 from graphql_relay import to_global_id
 
 from graphene_django_cud.mutations import DjangoUpdateMutation, DjangoCreateMutation
+from graphene_django_cud.util.fingerprint import create_input_object_type
 from graphene_django_cud.tests.factories import (
     UserFactory,
     CatFactory,
@@ -1883,3 +1884,100 @@ class TestUpdateWithOneToOneField(TestCase):
         dog.refresh_from_db()
 
         self.assertEqual(dog.breed, "LABRADOR")
+
+
+class TestUpdateMutationReuseInputTypes(TestCase):
+    def test__same_fields_as_create_mutation__reuses_input_types(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class CreateDogReusedMutation(DjangoCreateMutation):
+            class Meta:
+                model = Dog
+                type_name = "CreateDogReusedInput"
+                foreign_key_extras = {"owner": {"type": "auto", "exclude": ["password"]}}
+                reuse_input_types = True
+
+        class UpdateDogReusedMutation(DjangoUpdateMutation):
+            class Meta:
+                model = Dog
+                type_name = "UpdateDogReusedInput"
+                foreign_key_extras = {"owner": {"type": "auto", "exclude": ["password"]}}
+                reuse_input_types = True
+
+        class Mutations(graphene.ObjectType):
+            create_dog = CreateDogReusedMutation.Field()
+            update_dog = UpdateDogReusedMutation.Field()
+
+        self.assertIs(CreateDogReusedMutation._meta.InputType, UpdateDogReusedMutation._meta.InputType)
+
+        schema = Schema(query=DummyQuery, mutation=Mutations)
+        type_names = set(schema.graphql_schema.type_map)
+        self.assertIn("CreateDogReusedInput", type_names)
+        self.assertIn("CreateDogReusedInputCreateOwner", type_names)
+        self.assertNotIn("UpdateDogReusedInput", type_names)
+        self.assertNotIn("UpdateDogReusedInputCreateOwner", type_names)
+
+        dog = DogFactory.create()
+        user = UserFactory.create()
+        mutation = """
+            mutation UpdateDog($id: ID!, $input: CreateDogReusedInput!){
+                updateDog(id: $id, input: $input){
+                    dog{
+                        id
+                    }
+                }
+            }
+        """
+
+        result = schema.execute(
+            mutation,
+            variables={
+                "id": to_global_id("DogNode", dog.id),
+                "input": {
+                    "name": "Sparky",
+                    "tag": "tag",
+                    "breed": "HUSKY",
+                    "owner": {
+                        "username": "new-user",
+                        "email": "new-user@example.com",
+                        "firstName": "Tormod",
+                        "lastName": "Haugland",
+                    },
+                },
+            },
+            context=Dict(user=user),
+        )
+        self.assertIsNone(result.errors)
+
+        dog.refresh_from_db()
+        self.assertEqual("new-user@example.com", dog.owner.email)
+
+    def test__same_fields_of_other_model__does_not_reuse_input_type(self):
+        dog_input_type = create_input_object_type("DogNameReusedInput", {"name": graphene.String()}, True, Dog)
+        same_dog_input_type = create_input_object_type("DogNameReusedInput2", {"name": graphene.String()}, True, Dog)
+        cat_input_type = create_input_object_type("CatNameReusedInput", {"name": graphene.String()}, True, Cat)
+
+        self.assertIs(dog_input_type, same_dog_input_type)
+        self.assertIsNot(dog_input_type, cat_input_type)
+        self.assertEqual("CatNameReusedInput", cat_input_type._meta.name)
+
+    def test__different_fields__does_not_reuse_input_type(self):
+        # This registers the UserNode type
+        from .schema import UserNode  # noqa: F401
+
+        class CreateCatReusedMutation(DjangoCreateMutation):
+            class Meta:
+                model = Cat
+                type_name = "CreateCatReusedInput"
+                reuse_input_types = True
+
+        class UpdateCatReusedMutation(DjangoUpdateMutation):
+            class Meta:
+                model = Cat
+                type_name = "UpdateCatReusedInput"
+                exclude = ("targets",)
+                reuse_input_types = True
+
+        self.assertIsNot(CreateCatReusedMutation._meta.InputType, UpdateCatReusedMutation._meta.InputType)
+        self.assertEqual(UpdateCatReusedMutation._meta.InputType._meta.name, "UpdateCatReusedInput")
@@ -1,7 +1,17 @@
+import math
+from unittest.mock import patch
+
 import graphene
-from django.test import TestCase
+from django.db import IntegrityError, OperationalError, transaction
+from addict import Dict
+from django.contrib.auth.models import Permission
+from django.test import TestCase, TransactionTestCase, override_settings
 from graphene_django_cud.util import get_input_fields_for_model
-from graphene_django_cud.tests.models import Mouse
+from graphene_django_cud.tests.factories import UserFactory
+from graphene_django_cud.tests.models import Dog, Mouse, User
+from graphene_django_cud.util.cost import get_filter_row_bound
+from graphene_django_cud.util.permissions import get_user_permission_cache, user_has_perms
+from graphene_django_cud.util.transaction import is_transient_database_error, run_in_transaction
 
 
 class TestGetInputFieldsForModel(TestCase):
@@ -33,3 +43,138 @@ class TestGetInputFieldsForModel(TestCase):
         self.assertIn("name", fields)
         self.assertIn("keeper_id", fields)
         self.assertIn("predators_ids", fields)
+
+
+class TestGetFilterRowBound(TestCase):
+    def test__filter_on_ids__is_bounded_by_number_of_values(self):
+        self.assertEqual(get_filter_row_bound({"id__in": ["1", "2", "3"]}, Dog), 3)
+        self.assertEqual(get_filter_row_bound({"pk": "1"}, Dog), 1)
+        self.assertEqual(get_filter_row_bound({"id__in": ["1", "2"], "name__startswith": "Sim"}, Dog), 2)
+        self.assertEqual(get_filter_row_bound({"username": "simen"}, User), 1)
+
+    def test__empty_filter__is_unbounded(self):
+        self.assertEqual(get_filter_row_bound({}, Dog), math.inf)
+        self.assertEqual(get_filter_row_bound({"id__in": None}, Dog), math.inf)
+
+    def test__filter_on_non_unique_fields__is_unbounded(self):
+        self.assertEqual(get_filter_row_bound({"name": "Simen"}, Dog), math.inf)
+        self.assertEqual(get_filter_row_bound({"name__in": ["Simen"]}, Dog), math.inf)
+        self.assertEqual(get_filter_row_bound({"id__gt": "1"}, Dog), math.inf)
+        self.assertEqual(get_filter_row_bound({"owner__id": "1"}, Dog), math.inf)
+
+
+class TestIsTransientDatabaseError(TestCase):
+    def test__lock_and_deadlock_errors__are_transient(self):
+        self.assertTrue(is_transient_database_error(OperationalError("database is locked")))
+        self.assertTrue(is_transient_database_error(OperationalError("deadlock detected")))
+        self.assertTrue(is_transient_database_error(OperationalError(1213, "Deadlock found when trying to get lock")))
+
+    def test__serialization_failure_sqlstate__is_transient(self):
+        cause = Exception("error")
+        cause.pgcode = "40001"
+        error = OperationalError("error")
+        error.__cause__ = cause
+
+        self.assertTrue(is_transient_database_error(error))
+
+    def test__other_errors__are_not_transient(self):
+        self.assertFalse(is_transient_database_error(OperationalError("no such table: foo")))
+        self.assertFalse(is_transient_database_error(IntegrityError("database is locked")))
+
+
+@patch("graphene_django_cud.util.transaction.time.sleep")
+class TestRunInTransaction(TransactionTestCase):
+    def test__transient_error__retries_until_max_attempts(self, sleep):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise OperationalError("database is locked")
+
+        with self.assertRaises(OperationalError):
+            run_in_transaction(func, max_attempts=3)
+
+        self.assertEqual(3, len(calls))
+        self.assertEqual(2, sleep.call_count)
+
+    def test__non_transient_error__is_raised_immediately(self, sleep):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise OperationalError("no such table: foo")
+
+        with self.assertRaises(OperationalError):
+            run_in_transaction(func, max_attempts=3)
+
+        self.assertEqual(1, len(calls))
+
+    def test__inside_outer_transaction__does_not_retry(self, sleep):
+        calls = []
+
+        def func():
+            calls.append(1)
+            raise OperationalError("database is locked")
+
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                run_in_transaction(func, max_attempts=3)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(0, sleep.call_count)
+
+
+class TestUserHasPerms(TestCase):
+    def test__repeated_checks__are_cached_on_context(self):
+        calls = []
+
+        def has_perms(permissions):
+            calls.append(permissions)
+            return True
+
+        context = Dict(user=Dict(pk=1, has_perms=has_perms))
+        for _ in range(3):
+            self.assertTrue(user_has_perms(context, ["tests.add_cat"]))
+
+        self.assertTrue(user_has_perms(context, ["tests.add_cat", "tests.change_cat"]))
+        self.assertEqual(2, len(calls))
+
+        # A new user is not given the results of the previous one
+        context.user = Dict(pk=2, has_perms=lambda permissions: False)
+        self.assertFalse(user_has_perms(context, ["tests.add_cat"]))
+
+    def test__context_without_attributes__is_not_cached(self):
+        calls = []
+        user = Dict(pk=1, has_perms=lambda permissions: calls.append(permissions) or True)
+
+        class Context(dict):
+            __slots__ = ()
+            user = None
+
+        context = Context()
+        Context.user = user
+        self.assertTrue(user_has_perms(context, ["tests.add_cat"]))
+        self.assertTrue(user_has_perms(context, ["tests.add_cat"]))
+        self.assertEqual(2, len(calls))
+
+
+class TestUserPermissionCache(TestCase):
+    def test__setting_disabled__returns_none(self):
+        self.assertIsNone(get_user_permission_cache())
+
+    @override_settings(GRAPHENE_DJANGO_CUD_SUBSCRIPTION_PERMISSION_CACHE_TTL=60)
+    def test__cached_result__is_invalidated_when_permissions_change(self):
+        cache = get_user_permission_cache()
+        user = UserFactory.create()
+        permission = Permission.objects.get(codename="add_cat")
+
+        self.assertFalse(cache.has_perms(user, ["tests.add_cat"]))
+        with self.assertNumQueries(0):
+            self.assertFalse(cache.has_perms(user, ["tests.add_cat"]))
+
+        user.user_permissions.add(permission)
+        self.assertNotIn(user.pk, cache.entries)
+
+        # Django caches permissions on the user instance, so a fresh instance is checked.
+        user = type(user).objects.get(pk=user.pk)
+        self.assertTrue(cache.has_perms(user, ["tests.add_cat"]))
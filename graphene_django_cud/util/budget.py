@@ -0,0 +1,92 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from graphql import GraphQLError
+
+# The query budget of the mutation being run, if any.
+_current_budget = contextvars.ContextVar("graphene_django_cud_query_budget", default=None)
+
+# The query counter is only installed on connections once a query budget has been used.
+_enabled = False
+
+
+class QueryBudgetExceeded(GraphQLError):
+    pass
+
+
+class QueryBudget:
+    """Counts the database queries of a mutation, see `query_budget`."""
+
+    __slots__ = ("name", "max_queries", "count", "parent")
+
+    def __init__(self, name, max_queries, parent=None):
+        self.name = name
+        self.max_queries = max_queries
+        self.count = 0
+        self.parent = parent
+
+    def add_query(self):
+        budget = self
+        while budget is not None:
+            budget.count += 1
+            if budget.max_queries is not None and budget.count > budget.max_queries:
+                raise QueryBudgetExceeded(
+                    f"{budget.name} exceeded its budget of {budget.max_queries} database queries."
+                )
+
+            budget = budget.parent
+
+
+def _count_query(execute, sql, params, many, context):
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.add_query()
+
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection):
+    if _count_query not in connection.execute_wrappers:
+        # `connection.execute_wrapper()` pops the last wrapper when its block ends, so the counter, which stays
+        # installed, is inserted as the outermost wrapper.
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+def install_query_counters():
+    """Installs the query counter on the connections of the current thread."""
+    for connection in connections.all():
+        install_query_counter(connection)
+
+
+@receiver(connection_created)
+def _install_query_counter_on_connection_created(sender, connection, **kwargs):
+    # Connections are per thread, and queries of asynchronous mutations run in other threads.
+    if _enabled:
+        install_query_counter(connection)
+
+
+@contextmanager
+def query_budget(name, max_queries):
+    """
+    Counts the database queries within the block, raising `QueryBudgetExceeded` from the query going over
+    `max_queries` (if not None). The budget is available from `get_current_query_budget` while the block runs,
+    also in threads run with `sync_to_async`. Queries of nested budgets count towards the enclosing budgets.
+    """
+    global _enabled
+    _enabled = True
+
+    install_query_counters()
+
+    budget = QueryBudget(name, max_queries, parent=_current_budget.get())
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def get_current_query_budget():
+    return _current_budget.get()
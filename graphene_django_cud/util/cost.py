@@ -0,0 +1,167 @@
+import contextvars
+import math
+from contextlib import contextmanager
+
+from graphql import GraphQLError
+
+from graphene_django_cud.registry import get_type_meta_registry
+from graphene_django_cud.util.model import (
+    get_fk_all_extras_field_names,
+    get_m2m_all_extras_field_names,
+    get_model_field_or_none,
+)
+
+# The cost estimate of the mutation being run, if any.
+_current_estimate = contextvars.ContextVar("graphene_django_cud_cost_estimate", default=None)
+
+
+class MutationCostExceeded(GraphQLError):
+    pass
+
+
+class MutationCost:
+    """The estimated number of database statements and rows written by a mutation, see `estimate_object_cost`."""
+
+    __slots__ = ("statements", "rows")
+
+    def __init__(self, statements=0, rows=0):
+        self.statements = statements
+        self.rows = rows
+
+    def add(self, statements, rows):
+        self.statements += statements
+        self.rows += rows
+
+    def __repr__(self):
+        return f"{type(self).__name__}(statements={self.statements}, rows={self.rows})"
+
+
+def _get_m2m_like_extras_by_argument_name(extras):
+    """Returns the extras of the arguments of `many_to_many_extras` or `many_to_one_extras`, by argument name."""
+    result = {}
+    for name, field_extras in extras.items():
+        for extra_name, data in field_extras.items():
+            (argument_name,) = get_m2m_all_extras_field_names({name: {extra_name: data}})
+            result[argument_name] = (name, data if hasattr(data, "get") else {})
+
+    return result
+
+
+def _get_nested_type_meta(data):
+    return get_type_meta_registry().get_meta_for_type(data.get("type", "ID")).merge(data)
+
+
+def _estimate_related_list_cost(values, field, data, cost):
+    # Adding, setting or removing the related objects.
+    cost.add(1, 0)
+
+    for value in values:
+        if hasattr(value, "items"):
+            estimate_object_cost(value, field.related_model, _get_nested_type_meta(data), cost)
+        else:
+            # The related object is looked up by its id, and linked.
+            cost.add(1, 1)
+
+
+def estimate_object_cost(input, model, type_meta, cost=None):
+    """
+    Estimates the database statements and rows of creating or updating an object of `model` from `input`, including
+    the nested objects of its relations, as described by `type_meta` (see `TypeMeta`). Adds to `cost` if given, and
+    returns the cost.
+    """
+    if cost is None:
+        cost = MutationCost()
+
+    # Saving the object.
+    cost.add(1, 1)
+
+    reverse_field_name_mappings = {value: key for key, value in type_meta.field_name_mappings.items()}
+    m2m_like_extras = {
+        **_get_m2m_like_extras_by_argument_name(type_meta.many_to_many_extras),
+        **_get_m2m_like_extras_by_argument_name(type_meta.many_to_one_extras),
+    }
+    foreign_key_extras_field_names = get_fk_all_extras_field_names(type_meta.foreign_key_extras)
+
+    for name, value in input.items():
+        if value is None:
+            continue
+
+        if name in m2m_like_extras:
+            field_name, data = m2m_like_extras[name]
+            field = get_model_field_or_none(field_name, model)
+            if field is not None and isinstance(value, (list, tuple)):
+                _estimate_related_list_cost(value, field, data, cost)
+
+            continue
+
+        name = reverse_field_name_mappings.get(name, name)
+        field = get_model_field_or_none(name, model)
+        if field is None or not field.is_relation:
+            continue
+
+        if isinstance(value, (list, tuple)):
+            _estimate_related_list_cost(value, field, {}, cost)
+        elif hasattr(value, "items"):
+            if name in foreign_key_extras_field_names:
+                data = type_meta.foreign_key_extras[name]
+            else:
+                data = type_meta.one_to_one_extras.get(name, {})
+
+            estimate_object_cost(value, field.related_model, _get_nested_type_meta(data), cost)
+
+    return cost
+
+
+def get_filter_row_bound(filter, model):
+    """
+    Returns the most rows of `model` a filter input can match. Only lookups on the primary key or a unique field bound
+    the rows, to one for an exact lookup, and to the number of values for an `in` lookup. Returns `math.inf` if no
+    lookup bounds the rows, e.g. for an empty filter, or a filter on `name__contains`.
+    """
+    bound = math.inf
+    for name, value in filter.items():
+        if value is None:
+            continue
+
+        field_name, _, lookup = name.partition("__")
+        if lookup not in ("", "exact", "in"):
+            continue
+
+        field = model._meta.pk if field_name == "pk" else get_model_field_or_none(field_name, model)
+        if field is None or not (field.primary_key or field.unique):
+            continue
+
+        bound = min(bound, len(value) if lookup == "in" else 1)
+
+    return bound
+
+
+class CostEstimate:
+    """The cost estimate of a running mutation, which is computed on first use."""
+
+    __slots__ = ("estimate", "cost")
+
+    def __init__(self, estimate, cost=None):
+        self.estimate = estimate
+        self.cost = cost
+
+    def get(self):
+        if self.cost is None:
+            self.cost = self.estimate()
+
+        return self.cost
+
+
+@contextmanager
+def cost_estimate(estimate, cost=None):
+    """Makes the cost returned by `estimate` (or `cost`, if already computed) available within the block."""
+    token = _current_estimate.set(CostEstimate(estimate, cost))
+    try:
+        yield
+    finally:
+        _current_estimate.reset(token)
+
+
+def get_current_cost_estimate():
+    current = _current_estimate.get()
+    return current.get() if current is not None else None
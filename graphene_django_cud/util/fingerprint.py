@@ -0,0 +1,103 @@
+import inspect
+
+from django.conf import settings
+from graphene import Dynamic, InputField, InputObjectType
+from graphene.types.structures import Structure
+from graphene.types.unmountedtype import UnmountedType
+from graphene_django.registry import get_global_registry
+
+from graphene_django_cud.consts import REUSE_INPUT_TYPES_SETTINGS_KEY
+from graphene_django_cud.registry import get_type_meta_registry
+
+
+def _freeze(value):
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+
+    return value
+
+
+def _get_type_fingerprint(value):
+    """
+    Returns a hashable description of the GraphQL type of an input field, or None if it cannot be described,
+    e.g. for dynamic fields referencing types which are not registered yet.
+    """
+    if inspect.isclass(value):
+        # Named types are compared by identity. Input types which were reused are therefore the same class.
+        return value
+
+    if isinstance(value, Dynamic):
+        type_name = getattr(value, "referenced_type_name", None)
+        if type_name is None or get_global_registry().get_converted_field(type_name) is None:
+            return None
+
+        return _get_type_fingerprint(value.get_type())
+
+    if isinstance(value, InputField):
+        of_type = _get_type_fingerprint(value._type)
+        if of_type is None:
+            return None
+
+        return InputField, of_type, _freeze(value.default_value), value.description, value.deprecation_reason
+
+    if isinstance(value, Structure):
+        # `of_type` (and `InputField.type`) would call lazy types, building them.
+        of_type = _get_type_fingerprint(value._of_type)
+        if of_type is None:
+            return None
+
+        return type(value), of_type, tuple(sorted((key, _freeze(item)) for key, item in value.kwargs.items()))
+
+    if isinstance(value, UnmountedType):
+        return (
+            value.get_type(),
+            tuple(_freeze(arg) for arg in value.args),
+            tuple(sorted((key, _freeze(item)) for key, item in value.kwargs.items())),
+        )
+
+    return None
+
+
+def get_input_fields_fingerprint(input_fields):
+    """Returns a fingerprint of the fields of an input type, or None if any of the fields cannot be fingerprinted."""
+    fingerprints = []
+    for name, value in input_fields.items():
+        # Fields converted to None, e.g. `auto_now` date fields, are left out of the input type.
+        if value is None:
+            continue
+
+        fingerprint = _get_type_fingerprint(value)
+        if fingerprint is None:
+            return None
+
+        fingerprints.append((name, fingerprint))
+
+    return tuple(sorted(fingerprints, key=lambda item: item[0]))
+
+
+def create_input_object_type(name, input_fields, reuse=None, model=None):
+    """
+    Creates the input type `name` with `input_fields`, for `model`.
+
+    If `reuse` is True (by default, the `GRAPHENE_DJANGO_CUD_REUSE_INPUT_TYPES` setting), and an input type for the same
+    model with the same fields was created with `reuse` before, that type is returned instead, and `name` becomes an
+    alias of it. Input types of different models are never shared, so type names do not depend on the model order.
+    """
+    if reuse is None:
+        reuse = getattr(settings, REUSE_INPUT_TYPES_SETTINGS_KEY, False)
+
+    fingerprint = get_input_fields_fingerprint(input_fields) if reuse else None
+    if fingerprint is not None:
+        fingerprint = (model._meta.label if model is not None else None, fingerprint)
+        existing_type = get_type_meta_registry().get_input_type_for_fingerprint(fingerprint)
+        if existing_type is not None:
+            return existing_type
+
+    InputType = type(name, (InputObjectType,), input_fields)
+
+    if fingerprint is not None:
+        get_type_meta_registry().register_input_type_fingerprint(fingerprint, InputType)
+
+    return InputType
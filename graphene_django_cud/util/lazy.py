@@ -0,0 +1,112 @@
+import inspect
+import logging
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from graphene_django.registry import get_global_registry
+
+from graphene_django_cud.consts import LAZY_INPUT_TYPES_SETTINGS_KEY
+
+logger = logging.getLogger(__name__)
+
+# Input types which have not been built yet, by name.
+_lazy_input_types = {}
+
+# Building an input type may build the lazy input types it references, so a single reentrant lock is used for all
+# of them. Per-type locks could deadlock, with two threads building types referencing each other.
+_build_lock = threading.RLock()
+
+# The names of the input types referenced by dynamic fields, see `create_dynamic_reference`.
+_input_type_references = set()
+
+
+def create_input_type(name, build, lazy=None):
+    """
+    Calls `build`, which creates and registers the input type `name`, and returns the input type.
+
+    If `lazy` is True (by default, the `GRAPHENE_DJANGO_CUD_LAZY_INPUT_TYPES` setting), returns a thunk
+    instead, which calls `build` the first time it is called and returns the same input type afterwards.
+    Graphene calls the thunk when the schema is built.
+    """
+    if lazy is None:
+        lazy = getattr(settings, LAZY_INPUT_TYPES_SETTINGS_KEY, False)
+
+    if not lazy:
+        return build()
+
+    input_type = None
+
+    def lazy_input_type():
+        nonlocal input_type
+
+        if input_type is None:
+            with _build_lock:
+                if input_type is None:
+                    input_type = build()
+
+                    if _lazy_input_types.get(name) is lazy_input_type:
+                        del _lazy_input_types[name]
+
+        return input_type
+
+    lazy_input_type.input_type_name = name
+    _lazy_input_types[name] = lazy_input_type
+    return lazy_input_type
+
+
+def is_lazy_input_type(value):
+    return inspect.isfunction(value) and hasattr(value, "input_type_name")
+
+
+def get_input_type(name):
+    """Returns the registered input type `name`, building it first if it is lazy, or None if there is none."""
+    input_type = get_global_registry().get_converted_field(name)
+    if input_type is None:
+        lazy_input_type = _lazy_input_types.get(name)
+        if lazy_input_type is not None:
+            input_type = lazy_input_type()
+
+    return input_type
+
+
+def build_lazy_input_types():
+    """Builds all lazy input types which have not been built yet."""
+    with _build_lock:
+        for lazy_input_type in list(_lazy_input_types.values()):
+            lazy_input_type()
+
+
+def warm_up():
+    """
+    Imports the schema of the `GRAPHENE["SCHEMA"]` setting, which creates the mutations and builds the schema, and
+    builds all lazy input types which have not been built yet, so that the first request of a worker does not.
+
+    Called on startup with the `GRAPHENE_DJANGO_CUD_WARM_UP_ON_READY` setting. Errors are logged instead of raised,
+    and left to the `graphene_django_cud` system check to report.
+    """
+    schema = getattr(settings, "GRAPHENE", {}).get("SCHEMA")
+    if schema:
+        try:
+            import_string(schema)
+        except Exception as e:
+            logger.warning("Could not import the schema %s to warm it up: %s", schema, e)
+
+    try:
+        build_lazy_input_types()
+    except Exception as e:
+        logger.warning("Could not build the lazy input types: %s", e)
+
+
+def register_input_type_reference(name):
+    """Registers that a dynamic field references the input type `name`, which is checked by `graphene_django_cud`."""
+    _input_type_references.add(name)
+
+
+def get_unresolved_input_type_references():
+    """
+    Builds all lazy input types, and returns the names of the input types referenced by dynamic fields which do not
+    exist, sorted.
+    """
+    build_lazy_input_types()
+    return sorted(name for name in list(_input_type_references) if get_input_type(name) is None)
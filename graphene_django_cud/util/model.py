@@ -4,21 +4,19 @@ from collections import OrderedDict
 from typing import Union, List, Optional
 
 import graphene
-from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.db import models
-from graphene import InputObjectType
 from graphene.utils.str_converters import to_camel_case
 from graphene_django.registry import get_global_registry
 from graphene_django.utils import get_model_fields
 from graphql import GraphQLError
 from graphql_relay import from_global_id
 
-from graphene_django_cud.converter import (
-    convert_django_field_with_choices,
-    convert_many_to_many_field,
-    is_required,
-)
+# The converter imports `graphene_django_cud.util`, so it is imported as a module to avoid a circular import.
+from graphene_django_cud import converter
 from graphene_django_cud.registry import get_type_meta_registry
+from graphene_django_cud.util.fingerprint import create_input_object_type
+from graphene_django_cud.util.lazy import get_input_type
 
 
 def disambiguate_id(ambiguous_id: Union[int, float, str, uuid.UUID]):
@@ -102,6 +100,23 @@ def apply_field_name_mappings(model_fields, use_id_suffixes_for_fk, use_id_suffi
     return field_name_mappings
 
 
+def register_nested_input_type(type_name, input_fields, meta, reuse_input_types=None, field=None, model=None):
+    """
+    Creates the nested input type `type_name` for `model`, and registers it with its type meta (and for `field`, if
+    given).
+    """
+    InputType = create_input_object_type(type_name, input_fields, reuse_input_types, model)
+
+    registry = get_global_registry()
+    registry.register_converted_field(type_name, InputType)
+    if field is not None:
+        registry.register_converted_field(field, InputType)
+
+    get_type_meta_registry().register(type_name, meta)
+
+    return InputType
+
+
 def get_input_fields_for_model(
     model,
     fields,
@@ -117,6 +132,7 @@ def get_input_fields_for_model(
     ignore_primary_key=True,
     field_name_mappings=None,
     force_optional_primary_key=False,
+    reuse_input_types=None,
 ) -> OrderedDict:
     registry = get_global_registry()
     meta_registry = get_type_meta_registry()
@@ -177,7 +193,7 @@ def get_input_fields_for_model(
         if is_primary_key and force_optional_primary_key:
             required = False
 
-        converted = convert_django_field_with_choices(
+        converted = converter.convert_django_field_with_choices(
             field,
             registry,
             required,
@@ -227,11 +243,12 @@ def get_input_fields_for_model(
             parent_type_name=type_name,
             field_types=data.get("field_types"),
             field_name_mappings=data.get("field_name_mappings"),
+            reuse_input_types=reuse_input_types,
         )
 
-        InputType = type(type_name, (InputObjectType,), foreign_key_converted_fields)
-        registry.register_converted_field(type_name, InputType)
-        meta_registry.register(type_name, data)
+        register_nested_input_type(
+            type_name, foreign_key_converted_fields, data, reuse_input_types, model=field.related_model
+        )
 
     # Create the one to one field types here.
     for name, data in one_to_one_extras.items():
@@ -263,11 +280,12 @@ def get_input_fields_for_model(
             parent_type_name=type_name,
             field_types=data.get("field_types"),
             field_name_mappings=data.get("field_name_mappings"),
+            reuse_input_types=reuse_input_types,
         )
 
-        InputType = type(type_name, (InputObjectType,), one_to_one_converted_fields)
-        registry.register_converted_field(type_name, InputType)
-        meta_registry.register(type_name, data)
+        register_nested_input_type(
+            type_name, one_to_one_converted_fields, data, reuse_input_types, model=field.related_model
+        )
 
     # Create extra many_to_many_fields
     for name, extras in many_to_many_extras.items():
@@ -283,7 +301,7 @@ def get_input_fields_for_model(
                 argument_name = name
 
             converted_input_fields[argument_name] = convert_many_to_many_like_field(
-                data, name, extra_name, parent_type_name, field, registry, meta_registry
+                data, name, extra_name, parent_type_name, field, registry, meta_registry, reuse_input_types
             )
 
     for name, extras in many_to_one_extras.items():
@@ -299,13 +317,15 @@ def get_input_fields_for_model(
                 argument_name = name
 
             converted_input_fields[argument_name] = convert_many_to_many_like_field(
-                data, name, extra_name, parent_type_name, field, registry, meta_registry
+                data, name, extra_name, parent_type_name, field, registry, meta_registry, reuse_input_types
             )
 
     return converted_input_fields
 
 
-def convert_many_to_many_like_field(data, name, extra_name, parent_type_name, field, registry, meta_registry):
+def convert_many_to_many_like_field(
+    data, name, extra_name, parent_type_name, field, registry, meta_registry, reuse_input_types=None
+):
     if isinstance(data, bool):
         data = {"type": "ID"}
 
@@ -313,7 +333,7 @@ def convert_many_to_many_like_field(data, name, extra_name, parent_type_name, fi
 
     if type_name and type_name != "ID":
         # Check if type already exists
-        existing_type = registry.get_converted_field(type_name)
+        existing_type = get_input_type(type_name)
 
         if existing_type:
             return graphene.List(existing_type, required=False)
@@ -344,11 +364,11 @@ def convert_many_to_many_like_field(data, name, extra_name, parent_type_name, fi
             # Don't ignore the primary key on updates
             ignore_primary_key=operation_name != "update" and operation_name != "exact",
             force_optional_primary_key=operation_name == "exact",
+            reuse_input_types=reuse_input_types,
         )
-        InputType = type(type_name, (InputObjectType,), converted_fields)
-        registry.register_converted_field(field, InputType)
-        meta_registry.register(
+        InputType = register_nested_input_type(
             type_name,
+            converted_fields,
             {
                 "auto_context_fields": data.get("auto_context_fields", {}),
                 "optional_fields": data.get("optional_fields", ()),
@@ -359,14 +379,16 @@ def convert_many_to_many_like_field(data, name, extra_name, parent_type_name, fi
                 "one_to_one_extras": data.get("one_to_one_extras", {}),
                 "field_types": data.get("field_types", {}),
             },
+            reuse_input_types,
+            field,
+            field.related_model,
         )
-        registry.register_converted_field(type_name, InputType)
         _field = graphene.List(
             InputType,
             required=False,
         )
     else:
-        _field = convert_many_to_many_field(field, registry, False, data, None)
+        _field = converter.convert_many_to_many_field(field, registry, False, data, None)
 
     return _field
 
@@ -439,7 +461,7 @@ def _convert_filter_field(filter_field, model):
                 model_field.related_model,  # This fails only on bad input
             )
 
-    field_type = convert_django_field_with_choices(model_field, required=False)
+    field_type = converter.convert_django_field_with_choices(model_field, required=False)
 
     # Handle this case by "deconstructing" the field type class, and pass it as an argument to
     # graphene.List
@@ -482,6 +504,40 @@ def get_model_field_or_none(field_name, Model):
         return None
 
 
+def get_field_values(obj):
+    """
+    Returns the values of the concrete fields of a model instance, by field name. Relations are
+    given by the value of their column, e.g. the id of the related object.
+    """
+    return {field.name: getattr(obj, field.attname) for field in obj._meta.concrete_fields}
+
+
+def _to_python(field, value):
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        return value
+
+
+def get_changed_fields(old_values, obj):
+    """
+    Returns the fields of `obj` whose value differs from `old_values`, as returned by `get_field_values`,
+    as a dictionary of field name to (old value, new value). Values are compared after conversion with
+    the `to_python` method of the field, as values assigned from the input may not have been converted.
+    """
+    changed_fields = {}
+    for field in obj._meta.concrete_fields:
+        if field.name not in old_values:
+            continue
+
+        old_value = _to_python(field, old_values[field.name])
+        new_value = _to_python(field, getattr(obj, field.attname))
+        if old_value != new_value:
+            changed_fields[field.name] = (old_value, new_value)
+
+    return changed_fields
+
+
 def get_m2m_all_extras_field_names(extras):
     res = []
     if not extras:
@@ -592,33 +648,14 @@ def resolve_one_to_one_extra_auto_field_names(one_to_one_extras, model, parent_t
 def create_dynamic_list_type(field, type_name, registry, required):
     # Use the Input type node from registry in a dynamic type, and create a union with that
     # and the ID
-    def dynamic_type():
-        _type = registry.get_converted_field(type_name)
-
-        if not _type:
-            raise GraphQLError(f"The type {type_name} does not exist.")
-
-        return graphene.List(
-            _type,
-            description=getattr(field, "help_text", ""),
-            required=is_required(field, required, True),
-        )
-
-    return graphene.Dynamic(dynamic_type)
+    return converter.create_dynamic_reference(
+        type_name, getattr(field, "help_text", ""), converter.is_required(field, required, True), many=True
+    )
 
 
 def create_dynamic_type(field, type_name, registry, required):
     # Use the Input type node from registry in a dynamic type, and create a union with that
     # and the ID
-    def dynamic_type():
-        _type = registry.get_converted_field(type_name)
-
-        if not _type:
-            raise GraphQLError(f"The type {type_name} does not exist.")
-
-        return _type(
-            description=getattr(field, "help_text", ""),
-            required=is_required(field, required, True),
-        )
-
-    return graphene.Dynamic(dynamic_type)
+    return converter.create_dynamic_reference(
+        type_name, getattr(field, "help_text", ""), converter.is_required(field, required, True)
+    )
@@ -0,0 +1,170 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from graphene_django_cud.consts import SUBSCRIPTION_PERMISSION_CACHE_TTL_SETTINGS_KEY
+
+_REQUEST_CACHE_ATTRIBUTE = "_graphene_django_cud_permission_cache"
+
+
+class _RequestPermissionCache:
+    __slots__ = ("user", "results")
+
+    def __init__(self, user):
+        self.user = user
+        self.results = {}
+
+
+def user_has_perms(context, permissions):
+    """
+    Returns whether the user of the request has all of `permissions`. The result is cached on the
+    context, so the permissions of a user are only resolved once per request.
+    """
+    user = context.user
+    cache = getattr(context, _REQUEST_CACHE_ATTRIBUTE, None)
+
+    if not isinstance(cache, _RequestPermissionCache) or cache.user is not user:
+        cache = _RequestPermissionCache(user)
+
+        try:
+            setattr(context, _REQUEST_CACHE_ATTRIBUTE, cache)
+        except (AttributeError, TypeError):
+            # The context does not support attributes, e.g. a plain dictionary, so nothing is cached.
+            pass
+
+    key = frozenset(permissions)
+    result = cache.results.get(key)
+    if result is None:
+        result = cache.results[key] = bool(user.has_perms(permissions))
+
+    return result
+
+
+class UserPermissionCache:
+    """
+    Caches the results of permission checks by user for `ttl` seconds, across requests. The entries of
+    a user are invalidated when its permissions, groups or the user itself change, and all entries when
+    the permissions of a group change. Changes made by other processes are only seen once the entries
+    expire.
+    """
+
+    def __init__(self, ttl, max_users=10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def has_perms(self, user, permissions):
+        pk = getattr(user, "pk", None)
+        if pk is None:
+            return bool(user.has_perms(permissions))
+
+        key = frozenset(permissions)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(pk, {}).get(key)
+
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        result = bool(user.has_perms(permissions))
+
+        with self.lock:
+            if pk not in self.entries and len(self.entries) >= self.max_users:
+                # Drop the user which was cached first
+                del self.entries[next(iter(self.entries))]
+
+            self.entries.setdefault(pk, {})[key] = (now + self.ttl, result)
+
+        return result
+
+    def invalidate(self, pk=None):
+        """Drops the entries of the user with the given primary key, or all entries."""
+        with self.lock:
+            if pk is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(pk, None)
+
+
+_user_permission_cache = None
+_user_permission_cache_lock = threading.Lock()
+_receivers_connected = False
+
+
+def _handle_user_saved(sender, instance, **kwargs):
+    if _user_permission_cache is not None:
+        _user_permission_cache.invalidate(instance.pk)
+
+
+def _handle_user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if _user_permission_cache is None or not action.startswith("post_"):
+        return
+
+    if not reverse:
+        _user_permission_cache.invalidate(instance.pk)
+    elif pk_set is None:
+        _user_permission_cache.invalidate()
+    else:
+        for pk in pk_set:
+            _user_permission_cache.invalidate(pk)
+
+
+def _handle_group_permissions_changed(sender, action, **kwargs):
+    if _user_permission_cache is not None and action.startswith("post_"):
+        _user_permission_cache.invalidate()
+
+
+def _connect_receivers():
+    global _receivers_connected
+
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group
+    from django.db.models.signals import m2m_changed, post_save
+
+    User = get_user_model()
+    post_save.connect(_handle_user_saved, sender=User)
+
+    for field_name in ("user_permissions", "groups"):
+        field = getattr(User, field_name, None)
+        if field is not None:
+            m2m_changed.connect(_handle_user_relations_changed, sender=field.through)
+
+    m2m_changed.connect(_handle_group_permissions_changed, sender=Group.permissions.through)
+    _receivers_connected = True
+
+
+def get_user_permission_cache():
+    """
+    Returns the permission cache of subscriptions, or None if it is disabled. It is enabled by the
+    `GRAPHENE_DJANGO_CUD_SUBSCRIPTION_PERMISSION_CACHE_TTL` setting, in seconds.
+    """
+    global _user_permission_cache
+
+    ttl = getattr(settings, SUBSCRIPTION_PERMISSION_CACHE_TTL_SETTINGS_KEY, None)
+    if not ttl:
+        return None
+
+    if _user_permission_cache is not None:
+        return _user_permission_cache
+
+    with _user_permission_cache_lock:
+        if not _receivers_connected:
+            _connect_receivers()
+
+        if _user_permission_cache is None:
+            _user_permission_cache = UserPermissionCache(ttl)
+
+    return _user_permission_cache
+
+
+@receiver(setting_changed)
+def _reset_user_permission_cache_on_setting_changed(setting, **kwargs):
+    global _user_permission_cache
+
+    if setting == SUBSCRIPTION_PERMISSION_CACHE_TTL_SETTINGS_KEY:
+        _user_permission_cache = None
@@ -0,0 +1,101 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from graphene_django_cud.consts import (
+    TRANSACTION_MAX_ATTEMPTS_SETTINGS_KEY,
+    TRANSACTION_RETRY_BASE_DELAY_SETTINGS_KEY,
+    TRANSACTION_RETRY_MAX_DELAY_SETTINGS_KEY,
+)
+
+RETRY_SAFE_ATTRIBUTE = "_graphene_django_cud_retry_safe"
+
+# Postgres: serialization_failure, deadlock_detected
+TRANSIENT_SQLSTATES = ("40001", "40P01")
+
+# MySQL: ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK
+TRANSIENT_MYSQL_ERROR_CODES = (1205, 1213)
+
+TRANSIENT_ERROR_MESSAGES = (
+    "deadlock detected",
+    "deadlock found",
+    "could not serialize",
+    "database is locked",
+    "database table is locked",
+    "lock wait timeout",
+)
+
+
+def is_transient_database_error(error):
+    """
+    Returns True if the error is a deadlock, a serialization failure or a lock timeout, i.e. an error
+    where re-running the transaction from the start is expected to succeed.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+
+    cause = error.__cause__ or error
+    sqlstate = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return True
+
+    args = getattr(cause, "args", ())
+    if args and args[0] in TRANSIENT_MYSQL_ERROR_CODES:
+        return True
+
+    message = str(error).lower()
+    return any(transient_message in message for transient_message in TRANSIENT_ERROR_MESSAGES)
+
+
+def get_retry_delay(attempt, base_delay=None, max_delay=None):
+    """Exponential backoff with full jitter, in seconds. `attempt` is 1 for the first retry."""
+    if base_delay is None:
+        base_delay = getattr(settings, TRANSACTION_RETRY_BASE_DELAY_SETTINGS_KEY, 0.05)
+    if max_delay is None:
+        max_delay = getattr(settings, TRANSACTION_RETRY_MAX_DELAY_SETTINGS_KEY, 1.0)
+
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+def run_in_transaction(func, max_attempts=None, using=None):
+    """
+    Runs `func` inside `transaction.atomic()`, re-running it when the transaction fails with a
+    transient database error, at most `max_attempts` times in total.
+
+    Retries are only possible when this is the outermost atomic block: inside an outer transaction,
+    the error is re-raised immediately so that the outer transaction can be retried as a whole.
+    """
+    if max_attempts is None:
+        max_attempts = getattr(settings, TRANSACTION_MAX_ATTEMPTS_SETTINGS_KEY, 1)
+
+    if connections[using or DEFAULT_DB_ALIAS].in_atomic_block:
+        max_attempts = 1
+
+    attempt = 1
+    while True:
+        try:
+            with transaction.atomic(using=using):
+                return func()
+        except OperationalError as e:
+            if attempt >= max_attempts or not is_transient_database_error(e):
+                raise
+
+        time.sleep(get_retry_delay(attempt))
+        attempt += 1
+
+
+def retry_safe(func):
+    """
+    Marks a mutation hook as safe to re-run when the mutation transaction is retried, i.e. it has no
+    side effects outside the database transaction. Can be applied above or below `@classmethod`.
+    """
+    target = func.__func__ if isinstance(func, (classmethod, staticmethod)) else func
+    setattr(target, RETRY_SAFE_ATTRIBUTE, True)
+    return func
+
+
+def is_retry_safe(func):
+    target = func.__func__ if isinstance(func, (classmethod, staticmethod)) else func
+    return getattr(target, RETRY_SAFE_ATTRIBUTE, False)